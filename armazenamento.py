@@ -0,0 +1,326 @@
+import os  # caminhos e tamanhos
+import json  # cabeçalho
+import struct  # tamanho do cabeçalho
+import secrets  # sufixo aleatório do arquivo temporário
+import argparse  # linha de comando
+import numpy as np  # blocos e memmap
+from precisao import decodificar  # canais float16 / uint16 em ponto fixo
+
+# CANAIS FLOAT EM DISCO: CONTÊINER EM BLOCOS (.pdif)
+#
+# O d4 salvava o HSI float com cv2.imwrite(".tiff"), que dependendo do build do
+# OpenCV converte para 8U sem avisar. Aqui os canais float (H, S, I; Y, U, V com
+# sinal; qualquer dtype do NumPy) vão para um formato simples e previsível:
+#
+#   [8 bytes]  assinatura b"PDIF\0\1\r\n"
+#   [8 bytes]  tamanho do cabeçalho JSON (uint64 little-endian)
+#   [JSON]     forma, dtype, nomes dos canais, bloco, compressão, deslocamentos, atributos
+#   [índice]   (só comprimido) deslocamento e tamanho de cada bloco, uint64
+#   [dados]    alinhados em 64 bytes
+#
+# Os canais ficam separados (planar: canal, linha, coluna), então ler só o H não
+# passa pelos bytes de S e I.
+# - compressao="nenhuma": os dados são a matriz (canais, altura, largura) inteira,
+#   abrível com memmap (ArquivoCanais.memmap): ler uma região só toca nas páginas dela;
+# - compressao="zlib" (deflate), "lzma", "zstd" (pacote zstandard) ou "lz4" (pacote
+#   lz4): cada bloco (canais, bloco, bloco) é comprimido separado e o índice permite
+#   ler qualquer bloco/região sem descomprimir o arquivo todo. Com embaralhar=True os
+#   bytes de cada float são agrupados por posição (todos os 1ºs bytes, depois os
+#   2ºs...) antes de comprimir, o que costuma reduzir bem o tamanho de canais float.
+#
+# A escrita também é bloco a bloco: só um bloco de cada vez existe em memória.
+#
+# Canais compactos (precisao.py: float16 ou uint16 em ponto fixo) levam a
+# codificação de cada canal no cabeçalho; ler_regiao/ler_canal devolvem os valores
+# já decodificados em float32 (decodificar=False devolve o que está gravado).
+
+ASSINATURA = b"PDIF\x00\x01\r\n"
+VERSAO_FORMATO = 1
+EXTENSAO = ".pdif"
+ALINHAMENTO = 64
+COMPRESSOES = ("nenhuma", "zlib", "lzma", "zstd", "lz4")
+
+
+def _compressor(nome, nivel=None):
+    # (comprimir, descomprimir) da compressão pedida; zstd e lz4 são dependências opcionais
+    if nome == "zlib":
+        import zlib
+        return (lambda dados: zlib.compress(dados, 6 if nivel is None else nivel)), zlib.decompress
+    if nome == "lzma":
+        import lzma
+        return (lambda dados: lzma.compress(dados, preset=6 if nivel is None else nivel)), lzma.decompress
+    if nome == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Compressão zstd precisa do pacote zstandard (pip install zstandard)") from None
+        return (zstandard.ZstdCompressor(level=3 if nivel is None else nivel).compress,
+                zstandard.ZstdDecompressor().decompress)
+    if nome == "lz4":
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ValueError("Compressão lz4 precisa do pacote lz4 (pip install lz4)") from None
+        return (lambda dados: lz4.frame.compress(dados, compression_level=0 if nivel is None else nivel)), \
+            lz4.frame.decompress
+    raise ValueError(f"Compressão desconhecida: {nome} (opções: {', '.join(COMPRESSOES)})")
+
+
+def compressoes_disponiveis():
+    disponiveis = ["nenhuma"]
+    for nome in COMPRESSOES[1:]:
+        try:
+            _compressor(nome)
+            disponiveis.append(nome)
+        except ValueError:
+            pass
+    return disponiveis
+
+
+def _alinhar(posicao):
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+
+def _embaralhar(bloco):
+    # (n, itemsize) -> (itemsize, n): todos os 1ºs bytes, depois os 2ºs...
+    return np.ascontiguousarray(bloco.reshape(-1).view(np.uint8).reshape(-1, bloco.itemsize).T).tobytes()
+
+
+def _desembaralhar(dados, dtype, forma):
+    dtype = np.dtype(dtype)
+    bytes_ = np.frombuffer(dados, dtype=np.uint8).reshape(dtype.itemsize, -1)
+    return np.ascontiguousarray(bytes_.T).view(dtype).reshape(forma)
+
+
+def salvar_canais(caminho, canais, nomes=None, compressao="zlib", bloco=256, nivel=None, embaralhar=True,
+                  atributos=None, codificacao=None):
+    # canais: sequência de matrizes 2D de mesma forma e dtype (views servem) ou matriz (canais, altura, largura)
+    # codificacao: {nome: {"precisao", "faixa"}} dos canais compactos (precisao.codificacao_canais)
+    canais = list(canais)
+    if not canais:
+        raise ValueError("Nenhum canal para salvar")
+    altura, largura = canais[0].shape
+    dtype = canais[0].dtype
+    for canal in canais:
+        if canal.shape != (altura, largura) or canal.dtype != dtype:
+            raise ValueError(f"Canais com forma/dtype diferentes: {canal.shape} {canal.dtype} x {(altura, largura)} {dtype}")
+    nomes = list(nomes) if nomes is not None else [str(i) for i in range(len(canais))]
+    if len(nomes) != len(canais):
+        raise ValueError(f"{len(nomes)} nomes para {len(canais)} canais")
+    if bloco <= 0:
+        raise ValueError(f"Tamanho de bloco inválido: {bloco}")
+    comprimir = _compressor(compressao, nivel)[0] if compressao != "nenhuma" else None
+
+    blocos_y, blocos_x = -(-altura // bloco), -(-largura // bloco)
+    cabecalho = {
+        "versao": VERSAO_FORMATO,
+        "forma": [len(canais), altura, largura],
+        "dtype": dtype.str,
+        "canais": nomes,
+        "bloco": bloco,
+        "compressao": compressao,
+        "embaralhar": bool(embaralhar and comprimir is not None and dtype.itemsize > 1),
+        "atributos": atributos or {},
+        "codificacao": codificacao or {},
+        "indice": 0,
+        "dados": 0,
+    }
+
+    # Os deslocamentos dependem do tamanho do próprio JSON: recalcula até estabilizar
+    while True:
+        texto = json.dumps(cabecalho, ensure_ascii=False).encode("utf-8")
+        fim_cabecalho = len(ASSINATURA) + 8 + len(texto)
+        indice = _alinhar(fim_cabecalho) if comprimir else 0
+        dados = _alinhar(indice + blocos_y * blocos_x * 16) if comprimir else _alinhar(fim_cabecalho)
+        if (indice, dados) == (cabecalho["indice"], cabecalho["dados"]):
+            break
+        cabecalho["indice"], cabecalho["dados"] = indice, dados
+
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    # Só aparece com o nome final quando estiver completo. O temporário é único por processo e por
+    # chamada (pid + sufixo aleatório), na mesma pasta: escritores em paralelo (lote, escrita.py)
+    # gravando o mesmo caminho não escrevem um no temporário do outro
+    temporario = f"{caminho}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(ASSINATURA)
+        f.write(struct.pack("<Q", len(texto)))
+        f.write(texto)
+
+        if comprimir is None:
+            f.truncate(dados + len(canais) * altura * largura * dtype.itemsize)
+        else:
+            posicoes = np.zeros((blocos_y * blocos_x, 2), dtype="<u8")
+            f.seek(dados)
+            for i, y0 in enumerate(range(0, altura, bloco)):
+                for j, x0 in enumerate(range(0, largura, bloco)):
+                    regiao = (slice(y0, y0 + bloco), slice(x0, x0 + bloco))
+                    pedaco = np.stack([canal[regiao] for canal in canais])  # (canais, bloco, bloco), só este bloco
+                    bruto = _embaralhar(pedaco) if cabecalho["embaralhar"] else pedaco.tobytes()
+                    comprimido = comprimir(bruto)
+                    posicoes[i * blocos_x + j] = (f.tell(), len(comprimido))
+                    f.write(comprimido)
+            f.seek(indice)
+            f.write(posicoes.tobytes())
+
+    if comprimir is None:  # sem compressão: escreve canal a canal, por faixas, no memmap
+        destino = np.memmap(temporario, dtype=dtype, mode="r+", offset=dados, shape=(len(canais), altura, largura))
+        for k, canal in enumerate(canais):
+            for y0 in range(0, altura, bloco):
+                destino[k, y0:y0 + bloco] = canal[y0:y0 + bloco]
+        destino.flush()
+        del destino
+
+    os.replace(temporario, caminho)
+    return caminho
+
+
+class ArquivoCanais:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arquivo = open(caminho, "rb")
+        assinatura = self._arquivo.read(len(ASSINATURA))
+        if assinatura != ASSINATURA:
+            self._arquivo.close()
+            raise ValueError(f"Não é um arquivo {EXTENSAO}: {caminho}")
+        (tamanho,) = struct.unpack("<Q", self._arquivo.read(8))
+        self.cabecalho = json.loads(self._arquivo.read(tamanho).decode("utf-8"))
+        if self.cabecalho["versao"] > VERSAO_FORMATO:
+            self._arquivo.close()
+            raise ValueError(f"Versão do formato não suportada: {self.cabecalho['versao']}")
+
+        self.n_canais, self.altura, self.largura = self.cabecalho["forma"]
+        self.dtype = np.dtype(self.cabecalho["dtype"])
+        self.nomes = self.cabecalho["canais"]
+        self.bloco = self.cabecalho["bloco"]
+        self.compressao = self.cabecalho["compressao"]
+        self.atributos = self.cabecalho["atributos"]
+        self.codificacao = self.cabecalho.get("codificacao", {})  # arquivos antigos não têm
+        self.blocos_y = -(-self.altura // self.bloco)
+        self.blocos_x = -(-self.largura // self.bloco)
+
+        self._memmap = None
+        self._indice = None
+        if self.compressao == "nenhuma":
+            self._memmap = np.memmap(caminho, dtype=self.dtype, mode="r", offset=self.cabecalho["dados"],
+                                     shape=(self.n_canais, self.altura, self.largura))
+        else:
+            self._descomprimir = _compressor(self.compressao)[1]
+            self._arquivo.seek(self.cabecalho["indice"])
+            self._indice = np.frombuffer(self._arquivo.read(self.blocos_y * self.blocos_x * 16), dtype="<u8") \
+                .reshape(-1, 2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    def fechar(self):
+        self._memmap = None
+        self._arquivo.close()
+
+    def memmap(self):
+        # (canais, altura, largura) direto do disco; só existe sem compressão
+        if self._memmap is None:
+            raise ValueError(f"Arquivo comprimido ({self.compressao}) não pode ser aberto como memmap")
+        return self._memmap
+
+    def indice_do_canal(self, canal):
+        return self.nomes.index(canal) if isinstance(canal, str) else canal
+
+    def ler_bloco(self, by, bx):
+        # Bloco (by, bx) -> (canais, linhas, colunas); nos blocos da borda a forma é menor
+        y0, x0 = by * self.bloco, bx * self.bloco
+        forma = (self.n_canais, min(self.bloco, self.altura - y0), min(self.bloco, self.largura - x0))
+        if not (0 <= by < self.blocos_y and 0 <= bx < self.blocos_x):
+            raise IndexError(f"Bloco fora do arquivo: ({by}, {bx}) de ({self.blocos_y}, {self.blocos_x})")
+        if self._memmap is not None:
+            return np.array(self._memmap[:, y0:y0 + forma[1], x0:x0 + forma[2]])
+
+        posicao, tamanho = self._indice[by * self.blocos_x + bx]
+        self._arquivo.seek(int(posicao))
+        bruto = self._descomprimir(self._arquivo.read(int(tamanho)))
+        if self.cabecalho["embaralhar"]:
+            return _desembaralhar(bruto, self.dtype, forma)
+        return np.frombuffer(bruto, dtype=self.dtype).reshape(forma).copy()
+
+    def ler_regiao(self, linhas, colunas, canais=None, decodificar=True):
+        # linhas, colunas: slices (passo 1). Retorna (canais, linhas, colunas) lendo só os blocos necessários
+        y0, y1, _ = linhas.indices(self.altura)
+        x0, x1, _ = colunas.indices(self.largura)
+        escolhidos = [self.indice_do_canal(c) for c in canais] if canais is not None else list(range(self.n_canais))
+        if self._memmap is not None:
+            return self._decodificar(np.array(self._memmap[escolhidos, y0:y1, x0:x1]), escolhidos, decodificar)
+
+        saida = np.empty((len(escolhidos), max(0, y1 - y0), max(0, x1 - x0)), dtype=self.dtype)
+        for by in range(y0 // self.bloco, -(-y1 // self.bloco)):
+            for bx in range(x0 // self.bloco, -(-x1 // self.bloco)):
+                pedaco = self.ler_bloco(by, bx)
+                by0, bx0 = by * self.bloco, bx * self.bloco
+                a0, a1 = max(y0, by0), min(y1, by0 + pedaco.shape[1])  # interseção em linhas
+                b0, b1 = max(x0, bx0), min(x1, bx0 + pedaco.shape[2])  # interseção em colunas
+                saida[:, a0 - y0:a1 - y0, b0 - x0:b1 - x0] = pedaco[escolhidos, a0 - by0:a1 - by0, b0 - bx0:b1 - bx0]
+        return self._decodificar(saida, escolhidos, decodificar)
+
+    def _decodificar(self, regiao, escolhidos, decodificar_canais):
+        # Canais compactos -> float32; o resto volta como está
+        if not decodificar_canais or not self.codificacao:
+            return regiao
+        return np.stack([decodificar(canal, self.codificacao.get(self.nomes[k]))
+                         for canal, k in zip(regiao, escolhidos)])
+
+    def ler_canal(self, canal, decodificar=True):
+        return self.ler_regiao(slice(None), slice(None), [canal], decodificar)[0]
+
+
+def abrir_canais(caminho):
+    return ArquivoCanais(caminho)
+
+
+if __name__ == "__main__":
+    import time  # tempos de escrita e leitura
+    import cv2  # leitura da imagem de teste
+    from conversoes import bgr_para_hsi_vetorizado
+
+    parser = argparse.ArgumentParser(description=f"Contêiner {EXTENSAO} de canais float: informações de um "
+                                                 "arquivo ou comparação das compressões numa imagem.")
+    parser.add_argument("entrada", nargs="?", default="lena-Color.png", help=f"arquivo {EXTENSAO} ou imagem de teste")
+    parser.add_argument("--bloco", type=int, default=256, help="tamanho do bloco (pixels)")
+    parser.add_argument("--saida", default="resultados", help="pasta dos arquivos de teste")
+    args = parser.parse_args()
+
+    if args.entrada.endswith(EXTENSAO):
+        with abrir_canais(args.entrada) as arquivo:
+            print(f"{args.entrada}: {arquivo.n_canais} canais {arquivo.nomes}, {arquivo.largura}x{arquivo.altura}, "
+                  f"{arquivo.dtype}, blocos de {arquivo.bloco}, compressão {arquivo.compressao}")
+            for k, nome in enumerate(arquivo.nomes):
+                canal = arquivo.ler_canal(k)
+                print(f"- {nome}: min {canal.min():.6g}, max {canal.max():.6g}, média {canal.mean():.6g}")
+            if arquivo.atributos:
+                print(f"Atributos: {arquivo.atributos}")
+    else:
+        img_bgr = cv2.imread(args.entrada, cv2.IMREAD_COLOR)
+        if img_bgr is None:
+            raise FileNotFoundError(f"Não foi possível ler a imagem: {args.entrada}")
+        H, S, I = bgr_para_hsi_vetorizado(img_bgr)
+        nome = os.path.splitext(os.path.basename(args.entrada))[0]
+        print(f"HSI float32 de {args.entrada}: {3 * H.nbytes} bytes sem compressão")
+
+        for compressao in compressoes_disponiveis():
+            caminho = os.path.join(args.saida, f"{nome}_HSI_float_{compressao}{EXTENSAO}")
+            inicio = time.perf_counter()
+            salvar_canais(caminho, (H, S, I), ("H", "S", "I"), compressao, args.bloco)
+            t_escrita = time.perf_counter() - inicio
+
+            with abrir_canais(caminho) as arquivo:
+                inicio = time.perf_counter()
+                regiao = arquivo.ler_regiao(slice(100, 164), slice(200, 264))  # região pequena no meio
+                t_regiao = time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                tudo = arquivo.ler_regiao(slice(None), slice(None))
+                t_tudo = time.perf_counter() - inicio
+
+            assert np.array_equal(tudo, np.stack((H, S, I))), "leitura não confere com o original"
+            assert np.array_equal(regiao, np.stack((H, S, I))[:, 100:164, 200:264])
+            print(f"{compressao}: {os.path.getsize(caminho)} bytes, escrita {t_escrita * 1000:.1f} ms, "
+                  f"região 64x64 {t_regiao * 1000:.2f} ms, tudo {t_tudo * 1000:.1f} ms")
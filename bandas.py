@@ -0,0 +1,214 @@
+import csv  # estatísticas
+import argparse  # linha de comando
+import cv2  # leitura com todas as bandas
+import numpy as np  # estatísticas e índices
+
+# IMAGENS MULTIBANDA (IR-R-G, RGB, N bandas) E ÍNDICES ESPECTRAIS
+#
+# O mosaico do Vaihingen (top_mosaic_09cm_*.tif) não é RGB verdadeiro: as bandas do
+# arquivo são IR, R, G. Os scripts leem com IMREAD_COLOR e chamam a banda 1 de "R",
+# a 2 de "G" e a 3 de "B", e bandas além da terceira se perdem. Aqui:
+# - a ordem das bandas do arquivo é configurável (ORDENS_BANDAS ou "IR,R,G,..." livre);
+# - a leitura usa IMREAD_UNCHANGED (todas as bandas, tipo original: uint8 ou uint16);
+# - cada banda é uma view da matriz lida, com o nome certo (mapear_bandas);
+# - para as conversões de cor (que esperam BGR 8-bit), composicao_bgr monta a
+#   imagem a partir das bandas escolhidas (sem cópia quando as bandas já estão na ordem);
+# - EstatisticasBandas acumula mínimo, máximo, média e desvio por banda e por índice,
+#   bloco a bloco (soma e soma dos quadrados em float64), e os índices (NDVI, NDWI)
+#   são calculados no mesmo bloco: blocos.processar_em_blocos faz tudo numa passada,
+#   junto com as conversões de cor.
+#
+# Ordem do OpenCV: em imagens de 3 ou 4 bandas, o imread inverte as 3 primeiras
+# (RGB do arquivo -> BGR na matriz); com 1, 2 ou mais de 4 bandas a ordem é a do arquivo.
+#
+# Ex.: python bandas.py top_mosaic_09cm_area35.tif --ordem IRRG
+
+ORDENS_BANDAS = {
+    # nome -> bandas na ordem do ARQUIVO
+    "RGB": ("R", "G", "B"),
+    "RGBA": ("R", "G", "B", "A"),
+    "IRRG": ("IR", "R", "G"),  # Vaihingen / Potsdam IRRG
+    "RGBIR": ("R", "G", "B", "IR"),
+}
+
+INDICES = {
+    # nome -> (banda a, banda b): índice = (a - b) / (a + b), em [-1, 1]
+    "NDVI": ("IR", "R"),  # vegetação
+    "NDWI": ("G", "IR"),  # água (McFeeters)
+}
+
+
+def ordem_bandas(ordem):
+    # "IRRG" -> ("IR", "R", "G"); também aceita lista separada por vírgula ("IR,R,G,DSM")
+    if isinstance(ordem, (tuple, list)):
+        return tuple(ordem)
+    if ordem in ORDENS_BANDAS:
+        return ORDENS_BANDAS[ordem]
+    if "," in ordem:
+        return tuple(b.strip() for b in ordem.split(",") if b.strip())
+    raise ValueError(f"Ordem de bandas desconhecida: {ordem} (opções: {', '.join(ORDENS_BANDAS)} ou lista com vírgulas)")
+
+
+def indice_na_matriz(banda_arquivo, n_bandas):
+    # Posição na matriz do OpenCV da banda k do arquivo
+    if n_bandas in (3, 4) and banda_arquivo < 3:
+        return 2 - banda_arquivo
+    return banda_arquivo
+
+
+def mapear_bandas(img, ordem):
+    # {nome: view 2D da banda} (nenhuma cópia)
+    ordem = ordem_bandas(ordem)
+    n_bandas = 1 if img.ndim == 2 else img.shape[2]
+    if n_bandas != len(ordem):
+        raise ValueError(f"A imagem tem {n_bandas} banda(s), mas a ordem {','.join(ordem)} tem {len(ordem)}")
+    if img.ndim == 2:
+        return {ordem[0]: img}
+    return {nome: img[:, :, indice_na_matriz(k, n_bandas)] for k, nome in enumerate(ordem)}
+
+
+def ler_bandas(caminho, ordem):
+    # (matriz com todas as bandas, {nome: view}); leitura pelo cache de rasters
+    from cache_raster import ler_imagem
+    img = ler_imagem(caminho, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho}")
+    return img, mapear_bandas(img, ordem)
+
+
+def bandas_da_composicao(ordem):
+    # Bandas que fazem o papel de R, G, B nas conversões de cor: as verdadeiras, se
+    # existirem; senão as 3 primeiras do arquivo (falsa cor, o que o IMREAD_COLOR já fazia)
+    ordem = ordem_bandas(ordem)
+    if all(b in ordem for b in "RGB"):
+        return ("R", "G", "B")
+    if len(ordem) < 3:
+        raise ValueError(f"São precisas 3 bandas para as conversões de cor (ordem: {','.join(ordem)})")
+    return ordem[:3]
+
+
+def composicao_bgr(img, ordem, rgb=None):
+    # Imagem (h, w, 3) na ordem B, G, R para conversoes.py; view se as bandas já
+    # estiverem em posições consecutivas da matriz, senão uma cópia
+    if img.dtype != np.uint8:
+        raise ValueError(f"As conversões de cor precisam de bandas 8-bit (recebido {img.dtype})")
+    ordem = ordem_bandas(ordem)
+    rgb = rgb or bandas_da_composicao(ordem)
+    n_bandas = img.shape[2]
+    posicoes = [indice_na_matriz(ordem.index(nome), n_bandas) for nome in rgb[::-1]]  # B, G, R
+    passo = posicoes[1] - posicoes[0]
+    if passo in (1, -1) and posicoes[2] - posicoes[1] == passo:
+        fim = posicoes[2] + passo
+        return img[:, :, posicoes[0]:(fim if fim >= 0 else None):passo]
+    return img[:, :, posicoes]
+
+
+def indices_possiveis(ordem):
+    ordem = ordem_bandas(ordem)
+    return tuple(nome for nome, (a, b) in INDICES.items() if a in ordem and b in ordem)
+
+
+def calcular_indice(nome, bandas, saida=None):
+    # (a - b) / (a + b) em float32; 0 onde a + b == 0
+    if nome not in INDICES:
+        raise ValueError(f"Índice desconhecido: {nome} (opções: {', '.join(INDICES)})")
+    a, b = (bandas[banda] for banda in INDICES[nome])
+    if saida is None:
+        saida = np.empty(a.shape, dtype=np.float32)
+    soma = np.add(a, b, dtype=np.float32)
+    np.subtract(a, b, out=saida, dtype=np.float32)
+    saida[soma == 0] = 0.0
+    np.divide(saida, soma, out=saida, where=soma != 0)
+    return saida
+
+
+def indice_para_8bit(indice, saida=None):
+    # [-1, 1] -> [0, 255] (0 = -1, 128 ≈ 0, 255 = 1), para PNG
+    if saida is None:
+        saida = np.empty(indice.shape, dtype=np.uint8)
+    escala = np.add(indice, 1.0, dtype=np.float32)
+    escala *= 127.5
+    escala += 0.5
+    np.clip(escala, 0, 255, out=escala)
+    saida[...] = escala
+    return saida
+
+
+class EstatisticasBandas:
+    def __init__(self, nomes):
+        self.nomes = tuple(nomes)
+        self.n = 0
+        self.minimo = {nome: np.inf for nome in self.nomes}
+        self.maximo = {nome: -np.inf for nome in self.nomes}
+        self.soma = {nome: 0.0 for nome in self.nomes}
+        self.soma_quadrados = {nome: 0.0 for nome in self.nomes}
+
+    def adicionar(self, canais):
+        # canais: {nome: array 2D do bloco}; todos do mesmo tamanho
+        for nome in self.nomes:
+            canal = canais[nome]
+            self.minimo[nome] = min(self.minimo[nome], float(canal.min()))
+            self.maximo[nome] = max(self.maximo[nome], float(canal.max()))
+            self.soma[nome] += float(np.sum(canal, dtype=np.float64))
+            valores = canal.astype(np.float64, copy=False)
+            self.soma_quadrados[nome] += float(np.einsum("ij,ij->", valores, valores))
+        self.n += next(iter(canais.values())).size if canais else 0
+        return self
+
+    def somar(self, outro):
+        for nome in self.nomes:
+            self.minimo[nome] = min(self.minimo[nome], outro.minimo[nome])
+            self.maximo[nome] = max(self.maximo[nome], outro.maximo[nome])
+            self.soma[nome] += outro.soma[nome]
+            self.soma_quadrados[nome] += outro.soma_quadrados[nome]
+        self.n += outro.n
+        return self
+
+    def resultado(self):
+        # {nome: {minimo, maximo, media, desvio}}
+        saida = {}
+        for nome in self.nomes:
+            media = self.soma[nome] / self.n if self.n else 0.0
+            variancia = self.soma_quadrados[nome] / self.n - media * media if self.n else 0.0
+            saida[nome] = {"minimo": self.minimo[nome], "maximo": self.maximo[nome], "media": media,
+                           "desvio": float(np.sqrt(max(variancia, 0.0)))}
+        return saida
+
+    def exportar_csv(self, caminho):
+        with open(caminho, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["banda", "pixels", "minimo", "maximo", "media", "desvio"])
+            for nome, valores in self.resultado().items():
+                escritor.writerow([nome, self.n, valores["minimo"], valores["maximo"],
+                                   f"{valores['media']:.6f}", f"{valores['desvio']:.6f}"])
+        return caminho
+
+
+def estatisticas_imagem(img, ordem, indices=(), linhas_por_faixa=512):
+    # Estatísticas das bandas e dos índices numa passada em faixas (sem o índice inteiro em memória)
+    estatisticas = EstatisticasBandas(ordem_bandas(ordem) + tuple(indices))
+    for y0 in range(0, img.shape[0], linhas_por_faixa):
+        bandas = mapear_bandas(img[y0:y0 + linhas_por_faixa], ordem)
+        for nome in indices:
+            bandas[nome] = calcular_indice(nome, bandas)
+        estatisticas.adicionar(bandas)
+    return estatisticas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandas de uma imagem multibanda: estatísticas e índices (NDVI, NDWI).")
+    parser.add_argument("imagem", nargs="?", default="top_mosaic_09cm_area35.tif", help="imagem de entrada")
+    parser.add_argument("--ordem", default="IRRG", help=f"ordem das bandas no arquivo ({', '.join(ORDENS_BANDAS)} ou 'IR,R,G,...')")
+    parser.add_argument("--indices", help="índices separados por vírgula (padrão: todos os possíveis com a ordem)")
+    parser.add_argument("--csv", help="grava as estatísticas em CSV")
+    args = parser.parse_args()
+
+    img, bandas = ler_bandas(args.imagem, args.ordem)
+    indices = tuple(i for i in args.indices.split(",") if i) if args.indices else indices_possiveis(args.ordem)
+    print(f"{args.imagem}: {img.shape[1]}x{img.shape[0]}, {len(bandas)} banda(s) {','.join(bandas)} ({img.dtype})")
+    estatisticas = estatisticas_imagem(img, args.ordem, indices)
+    for nome, valores in estatisticas.resultado().items():
+        print(f"{nome:<6} min {valores['minimo']:10.4f}  max {valores['maximo']:10.4f}  "
+              f"média {valores['media']:10.4f}  desvio {valores['desvio']:10.4f}")
+    if args.csv:
+        print(f"Estatísticas salvas em: {estatisticas.exportar_csv(args.csv)}")
@@ -0,0 +1,226 @@
+import os  # caminhos
+import sys  # código de saída
+import json  # resultados
+import time  # cronômetro
+import platform  # descrição da máquina
+import argparse  # linha de comando
+import statistics  # mediana
+import cv2  # leitura, versão e codificação
+import numpy as np  # imagens sintéticas
+from canais import canais_rgb, alocar_canais, bgr_para_cmy_em, medir_pico
+from conversoes import bgr_para_hsi_vetorizado, hsi_para_8bit, bgr_para_yuv
+from histogramas import AcumuladorHistogramas
+from verificacao import comparar_com_canais
+
+# BENCHMARK DOS ESTÁGIOS (d1..d5) EM VÁRIOS TAMANHOS
+#
+# Mede cada estágio em imagens sintéticas (512² até 10k²) e nas duas entradas reais
+# (lena e area35, se existirem na pasta):
+#   split        -> canais R, G, B copiados para planos contíguos (o que o PNG de cada canal precisa)
+#   CMY          -> 255 - R, G, B numa saída pré-alocada
+#   recomposicao -> recompõe e compara com a original (verificacao.py)
+#   HSI          -> H, S, I float + versões 8-bit (HSI_atan2 / HSI_polinomio: matiz aproximado, ver matiz.py)
+#   YUV          -> Y, U, V 8-bit (BT.601)
+#   histograma   -> 256 níveis de RGB, CMY, HSI e YUV
+#   codificacao  -> PNG dos 3 canais RGB (em memória, sem disco)
+# Para cada estágio: melhor tempo e mediana de N repetições, vazão em megapixels/s
+# (pelo melhor tempo) e pico de memória (tracemalloc, numa execução à parte para
+# não pesar no tempo).
+#
+# O resultado vai para um JSON. Com --comparar base.json, cada (imagem, estágio) é
+# comparado com a base: se ficar mais lento (ou usar mais memória) que a base além do
+# limite (--limite, padrão 10%), é regressão e o programa sai com código 1.
+#
+# Ex.: python benchmark.py --saida resultados/benchmark.json
+#      python benchmark.py --tamanhos 512,1024 --comparar base.json --limite 0.15
+
+TAMANHOS = (512, 1024, 2048, 4096, 8192, 10000)  # lado das imagens sintéticas
+TAMANHOS_PADRAO = (512, 1024, 2048, 4096)  # --completo usa todos
+ENTRADAS_REAIS = {"lena": "lena-Color.png", "area35": "top_mosaic_09cm_area35.tif"}
+VERSAO_BENCHMARK = 1
+
+
+def imagem_sintetica(lado, semente=0):
+    # Gradientes suaves + ruído (conteúdo parecido com foto: o PNG não fica trivial nem impossível)
+    rng = np.random.default_rng(semente)
+    img = np.empty((lado, lado, 3), dtype=np.uint8)
+    eixo = np.linspace(0, 255, lado, dtype=np.float32)
+    for k, (fy, fx) in enumerate(((1.0, 0.0), (0.0, 1.0), (0.5, 0.5))):
+        for y0 in range(0, lado, 1024):  # em faixas: só a faixa atual em float
+            faixa = fy * eixo[y0:y0 + 1024, np.newaxis] + fx * eixo[np.newaxis, :]
+            faixa += rng.normal(0.0, 12.0, faixa.shape).astype(np.float32)
+            np.clip(faixa, 0, 255, out=faixa)
+            img[y0:y0 + 1024, :, k] = faixa
+    return img
+
+
+def _split(img_bgr):
+    planos, canais = alocar_canais(*img_bgr.shape[:2], planar=True)
+    for destino, canal in zip(canais, canais_rgb(img_bgr)):
+        destino[...] = canal
+    return planos
+
+
+def _recomposicao(img_bgr):
+    r, g, b = canais_rgb(img_bgr)
+    return comparar_com_canais(img_bgr, r, g, b)
+
+
+def _hsi(img_bgr):
+    H, S, I = bgr_para_hsi_vetorizado(img_bgr)
+    return hsi_para_8bit(H, S, I)
+
+
+def _hsi_metodo(metodo_matiz):
+    def converter(img_bgr):
+        H, S, I = bgr_para_hsi_vetorizado(img_bgr, metodo_matiz=metodo_matiz)
+        return hsi_para_8bit(H, S, I)
+    return converter
+
+
+def _histograma(img_bgr):
+    return AcumuladorHistogramas(("RGB", "CMY", "HSI", "YUV")).adicionar(img_bgr)
+
+
+def _codificacao(img_bgr):
+    return [cv2.imencode(".png", canal)[1].size for canal in canais_rgb(img_bgr)]
+
+
+ESTAGIOS_BENCHMARK = {
+    "split": _split,
+    "CMY": lambda img: bgr_para_cmy_em(img)[0],
+    "recomposicao": _recomposicao,
+    "HSI": _hsi,
+    "HSI_atan2": _hsi_metodo("atan2"),
+    "HSI_polinomio": _hsi_metodo("polinomio"),
+    "YUV": bgr_para_yuv,
+    "histograma": _histograma,
+    "codificacao": _codificacao,
+}
+
+
+def medir_estagio(funcao, img_bgr, repeticoes=3, medir_memoria=True):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(img_bgr)
+        tempos.append(time.perf_counter() - inicio)
+        del resultado
+    pico = medir_pico(funcao, img_bgr)[1] if medir_memoria else None
+    megapixels = img_bgr.shape[0] * img_bgr.shape[1] / 1e6
+    return {
+        "segundos_min": min(tempos),
+        "segundos_mediana": statistics.median(tempos),
+        "mp_por_s": megapixels / min(tempos) if min(tempos) > 0 else None,
+        "pico_mb": pico / 2 ** 20 if pico is not None else None,
+    }
+
+
+def descrever_maquina():
+    return {
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+
+def executar_benchmark(tamanhos=TAMANHOS_PADRAO, entradas_reais=ENTRADAS_REAIS, estagios=tuple(ESTAGIOS_BENCHMARK),
+                       repeticoes=3, medir_memoria=True, ao_medir=None):
+    # ao_medir(registro) é chamado a cada estágio medido (para mostrar o progresso)
+    imagens = [(f"sintetica_{lado}", lambda lado=lado: imagem_sintetica(lado)) for lado in tamanhos]
+    for nome, caminho in entradas_reais.items():
+        if os.path.exists(caminho):
+            imagens.append((nome, lambda caminho=caminho: cv2.imread(caminho, cv2.IMREAD_COLOR)))
+
+    resultados = []
+    for nome, gerar in imagens:
+        img_bgr = gerar()
+        if img_bgr is None:
+            continue
+        for estagio in estagios:
+            registro = {"imagem": nome, "altura": img_bgr.shape[0], "largura": img_bgr.shape[1], "estagio": estagio}
+            registro.update(medir_estagio(ESTAGIOS_BENCHMARK[estagio], img_bgr, repeticoes, medir_memoria))
+            resultados.append(registro)
+            if ao_medir:
+                ao_medir(registro)
+        del img_bgr
+
+    return {"versao": VERSAO_BENCHMARK, "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "maquina": descrever_maquina(), "repeticoes": repeticoes, "resultados": resultados}
+
+
+def comparar_com_base(atual, base, limite=0.10, memoria_minima_mb=1.0):
+    # Lista de regressões: (imagem, estágio, métrica, valor da base, valor atual, razão)
+    indice_base = {(r["imagem"], r["estagio"]): r for r in base["resultados"]}
+    regressoes = []
+    comparados = 0
+    for registro in atual["resultados"]:
+        anterior = indice_base.get((registro["imagem"], registro["estagio"]))
+        if anterior is None:
+            continue
+        comparados += 1
+        razao = registro["segundos_min"] / anterior["segundos_min"] if anterior["segundos_min"] > 0 else 1.0
+        if razao > 1.0 + limite:
+            regressoes.append((registro["imagem"], registro["estagio"], "tempo", anterior["segundos_min"],
+                               registro["segundos_min"], razao))
+        if registro.get("pico_mb") is not None and anterior.get("pico_mb") is not None \
+                and anterior["pico_mb"] >= memoria_minima_mb:  # picos muito pequenos variam à toa
+            razao = registro["pico_mb"] / anterior["pico_mb"]
+            if razao > 1.0 + limite:
+                regressoes.append((registro["imagem"], registro["estagio"], "memoria", anterior["pico_mb"],
+                                   registro["pico_mb"], razao))
+    return comparados, regressoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos estágios d1..d5 (tempo, MP/s, pico de memória).")
+    parser.add_argument("--tamanhos", help=f"lados das imagens sintéticas (padrão: {','.join(map(str, TAMANHOS_PADRAO))})")
+    parser.add_argument("--completo", action="store_true", help=f"todos os tamanhos ({','.join(map(str, TAMANHOS))})")
+    parser.add_argument("--estagios", default=",".join(ESTAGIOS_BENCHMARK), help="estágios separados por vírgula")
+    parser.add_argument("--sem-reais", action="store_true", help="não usa lena/area35")
+    parser.add_argument("--repeticoes", type=int, default=3, help="repetições por estágio (vale o melhor tempo)")
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória")
+    parser.add_argument("--saida", default="resultados/benchmark.json", help="JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de base para detectar regressões")
+    parser.add_argument("--limite", type=float, default=0.10, help="piora máxima aceita em relação à base (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.completo:
+        tamanhos = TAMANHOS
+    elif args.tamanhos:
+        tamanhos = tuple(int(t) for t in args.tamanhos.split(",") if t)
+    else:
+        tamanhos = TAMANHOS_PADRAO
+    estagios = tuple(e for e in args.estagios.split(",") if e)
+    for estagio in estagios:
+        if estagio not in ESTAGIOS_BENCHMARK:
+            raise ValueError(f"Estágio desconhecido: {estagio} (opções: {', '.join(ESTAGIOS_BENCHMARK)})")
+
+    def mostrar(registro):
+        pico = f"{registro['pico_mb']:9.1f} MB" if registro["pico_mb"] is not None else ""
+        print(f"{registro['imagem']:<16} {registro['estagio']:<13} {registro['segundos_min'] * 1000:10.1f} ms "
+              f"{registro['mp_por_s'] or 0:9.1f} MP/s {pico}")
+
+    resultado = executar_benchmark(tamanhos, {} if args.sem_reais else ENTRADAS_REAIS, estagios, args.repeticoes,
+                                   not args.sem_memoria, mostrar)
+
+    os.makedirs(os.path.dirname(args.saida) or ".", exist_ok=True)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2)
+    print(f"Resultados salvos em: {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        comparados, regressoes = comparar_com_base(resultado, base, args.limite)
+        print(f"Comparação com {args.comparar}: {comparados} medida(s), {len(regressoes)} regressão(ões) "
+              f"acima de {args.limite:.0%}")
+        for imagem, estagio, metrica, antes, depois, razao in regressoes:
+            unidade = "ms" if metrica == "tempo" else "MB"
+            fator = 1000 if metrica == "tempo" else 1
+            print(f"[REGRESSÃO] {imagem} {estagio} {metrica}: {antes * fator:.1f} {unidade} -> "
+                  f"{depois * fator:.1f} {unidade} ({razao:.2f}x)")
+        sys.exit(1 if regressoes else 0)
@@ -0,0 +1,337 @@
+import os  # pastas e caminhos
+import argparse  # linha de comando
+from collections import namedtuple  # descrição de cada bloco
+import cv2  # leitura e escrita
+import numpy as np  # memmaps de saída
+from cache_raster import ler_imagem  # entrada como memmap (.npy do cache) a partir da segunda leitura
+from armazenamento import salvar_canais  # saída em blocos (.pdif), sem a imagem inteira em memória
+from lut import com_lut  # conversões pelas tabelas 256^3 (usar_lut)
+from conversoes import bgr_para_hsi_vetorizado, hsi_para_8bit, bgr_para_yuv, bgr_para_cmy
+from bandas import ordem_bandas, mapear_bandas, composicao_bgr, calcular_indice, indice_para_8bit, EstatisticasBandas
+
+# PROCESSAMENTO EM BLOCOS (tiles) PARA MOSAICOS GRANDES
+#
+# Os scripts area35 leem o GeoTIFF inteiro e fazem várias cópias float32 do
+# tamanho da imagem (astype/255, H, S, I, merge, hsi_float). Aqui cada estágio
+# (RGB, CMY, HSI, YUV) roda bloco a bloco:
+# - os temporários float32 existem só para o bloco atual;
+# - as saídas vão direto para arquivos .npy abertos com memmap (escrita incremental,
+#   o SO descarrega as páginas já escritas), nas pastas canais<Modelo>_<nome>;
+# - no final, opcionalmente, cada canal é codificado em PNG e/ou em .pdif a partir do memmap.
+#
+# Entrada: a imagem vem de cache_raster.ler_imagem. O OpenCV não decodifica só uma
+# região do TIFF, então a PRIMEIRA leitura decodifica a imagem inteira (uma vez) e a
+# guarda no cache; daí em diante (e nos outros scripts area35) a entrada é um memmap
+# do .npy, e cada bloco lê só as suas páginas. A entrada também pode ser uma sequência
+# de 3 planos 2D (B, G, R), ex.: os PNGs de canais do d1 lidos com ler_imagem; o
+# bloco BGR é montado a partir deles.
+#
+# Saídas e memória:
+# - .npy (memmap) e .pdif (armazenamento.salvar_canais, bloco a bloco): limitados ao bloco;
+# - PNG NÃO é limitado ao bloco: o cv2.imwrite codifica o canal inteiro de uma vez. Ele
+#   lê do memmap (páginas do arquivo, que o SO pode descartar, e não uma cópia anônima),
+#   mas percorre a imagem toda. Para saída realmente em blocos use gerar_pdif (--pdif)
+#   e gerar_png=False (--sem-png);
+# - as imagens de 3 canais (compostas, ex.: imagem_HSI_8bit.png, imagem_YUV.png) também
+#   são montadas em memmap, bloco a bloco, sem cv2.merge da imagem inteira;
+# - previas: níveis reduzidos (como piramide.para_exibir) calculados bloco a bloco,
+#   para os gráficos não precisarem reduzir a imagem cheia depois;
+# - manter_npy=False apaga os .npy depois de gerar os PNG/.pdif.
+#
+# A margem (halo) não é usada pelas conversões de cor (pixel a pixel), mas fica
+# disponível para operações de vizinhança: o bloco é lido com a margem e só a
+# parte "interna" é escrita na saída.
+#
+# Imagens multibanda (ex.: IR-R-G do Vaihingen): com ordem, a entrada é a
+# matriz lida com IMREAD_UNCHANGED; as conversões de cor usam a composição de
+# bandas.py e, no mesmo bloco, são acumuladas as estatísticas de cada banda e
+# calculados os índices pedidos (NDVI, NDWI), gravados em indices_<nome>/ (float32
+# e, para o PNG, a versão uint8 quantizada no próprio bloco).
+
+Bloco = namedtuple("Bloco", ["linhas", "colunas", "linhas_leitura", "colunas_leitura", "interno"])
+# linhas, colunas                 -> região do bloco na imagem (sem margem)
+# linhas_leitura, colunas_leitura -> região lida (com margem, recortada na borda)
+# interno                         -> (linhas, colunas) da região sem margem dentro do bloco lido
+
+
+def iterar_blocos(altura, largura, tamanho=1024, margem=0):
+    if tamanho <= 0:
+        raise ValueError(f"Tamanho de bloco inválido: {tamanho}")
+    if margem < 0:
+        raise ValueError(f"Margem inválida: {margem}")
+
+    for y0 in range(0, altura, tamanho):
+        y1 = min(y0 + tamanho, altura)
+        ly0 = max(y0 - margem, 0)
+        ly1 = min(y1 + margem, altura)
+        for x0 in range(0, largura, tamanho):
+            x1 = min(x0 + tamanho, largura)
+            lx0 = max(x0 - margem, 0)
+            lx1 = min(x1 + margem, largura)
+            yield Bloco(
+                slice(y0, y1),
+                slice(x0, x1),
+                slice(ly0, ly1),
+                slice(lx0, lx1),
+                (slice(y0 - ly0, y1 - ly0), slice(x0 - lx0, x1 - lx0)),
+            )
+
+
+# Estágios: modelo -> nomes dos canais (na ordem das funções de conversoes.py)
+CANAIS_POR_MODELO = {
+    "RGB": ("R", "G", "B"),
+    "CMY": ("C", "M", "Y"),
+    "HSI": ("H", "S", "I"),
+    "YUV": ("Y", "U", "V"),
+}
+
+
+# Imagens de 3 canais (dados, não cor), com os canais na ordem de CANAIS_POR_MODELO
+NOMES_COMPOSTA = {
+    "RGB": "imagem_RGB",
+    "CMY": "imagem_CMY",
+    "HSI": "imagem_HSI_8bit",
+    "YUV": "imagem_YUV",
+}
+
+
+def _abrir_saida(caminho, altura, largura, dtype, canais=None):
+    forma = (altura, largura) if canais is None else (altura, largura, canais)
+    return np.lib.format.open_memmap(caminho, mode="w+", dtype=dtype, shape=forma)
+
+
+def fator_previa(altura, largura, lado, tamanho_bloco):
+    # Maior potência de 2 que ainda deixa >= lado pixels no maior lado (como piramide.escolher_nivel),
+    # limitada a divisores do bloco para os blocos caírem alinhados na prévia
+    fator = 1
+    while -(-max(altura, largura) // (fator * 2)) >= lado and tamanho_bloco % (fator * 2) == 0:
+        fator *= 2
+    return fator
+
+
+def _reduzir(canal, forma, fator, media=True):
+    # Bloco -> pedaço da prévia (média de área; amostragem para canais circulares)
+    if fator == 1:
+        return canal
+    if not media:
+        return canal[::fator, ::fator]
+    return cv2.resize(canal, (forma[1], forma[0]), interpolation=cv2.INTER_AREA)
+
+
+def _incluir(opcao, chave):
+    # opcao: True (tudo), False ou coleção de chaves
+    return opcao is True or (bool(opcao) and chave in opcao)
+
+
+def processar_em_blocos(img_bgr, nome, estagios=("RGB", "CMY", "HSI", "YUV"), tamanho_bloco=1024,
+                        margem=0, pasta_base=".", gerar_png=True, ordem=None, indices=(), gerar_pdif=False,
+                        manter_npy=True, compostas=(), previas=None, lado_previa=400, usar_lut=False):
+    # img_bgr: matriz (h, w, 3) BGR (ou todas as bandas, com ordem) ou sequência de 3 planos (B, G, R)
+    # ordem: ordem das bandas do arquivo (bandas.py); None = BGR do IMREAD_COLOR
+    # gerar_pdif: True, False ou as saídas a gravar em .pdif (modelos, "HSI_float", índices)
+    # compostas: modelos que também saem numa imagem de 3 canais (NOMES_COMPOSTA)
+    # previas: dicionário preenchido com {modelo: {canal: prévia uint8}} (lado_previa pixels)
+    # usar_lut: CMY, HSI e YUV de cada bloco pelas tabelas 256^3 (lut.py), com o mesmo resultado
+    planos = None
+    if isinstance(img_bgr, (tuple, list)):
+        planos = tuple(img_bgr)
+        if len(planos) != 3 or any(p.shape != planos[0].shape or p.ndim != 2 for p in planos):
+            raise ValueError("A entrada em planos precisa de 3 matrizes 2D (B, G, R) de mesma forma")
+        if ordem is not None:
+            raise ValueError("Ordem de bandas só vale para a matriz lida com todas as bandas")
+        altura, largura = planos[0].shape
+    else:
+        altura, largura = img_bgr.shape[:2]
+    converter_cmy, converter_hsi, converter_yuv = (com_lut("cmy"), com_lut("hsi"), com_lut("yuv")) if usar_lut \
+        else (bgr_para_cmy, bgr_para_hsi_vetorizado, bgr_para_yuv)
+    saidas = {}  # modelo -> [memmap canal 1, canal 2, canal 3]
+    saidas_compostas = {}  # modelo -> memmap (h, w, 3)
+    gerados = []  # arquivos escritos
+    temporarios = []  # .npy apagados no final (manter_npy=False)
+
+    for modelo in estagios:
+        if modelo not in CANAIS_POR_MODELO:
+            raise ValueError(f"Estágio desconhecido: {modelo} (opções: {', '.join(CANAIS_POR_MODELO)})")
+        pasta = os.path.join(pasta_base, f"canais{modelo}_{nome}")
+        os.makedirs(pasta, exist_ok=True)
+        saidas[modelo] = [
+            _abrir_saida(os.path.join(pasta, f"canal_{canal}.npy"), altura, largura, np.uint8)
+            for canal in CANAIS_POR_MODELO[modelo]
+        ]
+        temporarios += [os.path.join(pasta, f"canal_{canal}.npy") for canal in CANAIS_POR_MODELO[modelo]]
+        if modelo in compostas:
+            caminho_composta = os.path.join(pasta, f"{NOMES_COMPOSTA[modelo]}.npy")
+            saidas_compostas[modelo] = _abrir_saida(caminho_composta, altura, largura, np.uint8, 3)
+            temporarios.append(caminho_composta)
+
+    if "HSI" in saidas:  # HSI também em float32 (H,S,I intercalados, como o TIFF do d4)
+        caminho_float = os.path.join(pasta_base, f"canaisHSI_{nome}", "imagem_HSI_float.npy")
+        hsi_float = _abrir_saida(caminho_float, altura, largura, np.float32, 3)
+        temporarios.append(caminho_float)
+
+    estatisticas = None
+    saidas_indices = {}  # índice -> memmap float32
+    indices_8bit = {}  # índice -> memmap uint8 (quantizado no bloco, para o PNG)
+    if ordem is not None:
+        ordem = ordem_bandas(ordem)
+        pasta_indices = os.path.join(pasta_base, f"indices_{nome}")
+        os.makedirs(pasta_indices, exist_ok=True)
+        estatisticas = EstatisticasBandas(ordem + tuple(indices))
+        for indice in indices:
+            caminho_indice = os.path.join(pasta_indices, f"{indice}.npy")
+            saidas_indices[indice] = _abrir_saida(caminho_indice, altura, largura, np.float32)
+            temporarios.append(caminho_indice)
+            if gerar_png:
+                caminho_8bit = os.path.join(pasta_indices, f"{indice}_8bit.npy")
+                indices_8bit[indice] = _abrir_saida(caminho_8bit, altura, largura, np.uint8)
+                temporarios.append(caminho_8bit)
+    elif indices:
+        raise ValueError("Índices espectrais precisam da ordem das bandas (ordem)")
+
+    fator = 1
+    if previas is not None:
+        fator = fator_previa(altura, largura, lado_previa, tamanho_bloco)
+        forma_previa = (-(-altura // fator), -(-largura // fator))
+        for modelo in saidas:
+            previas[modelo] = {canal: np.empty(forma_previa, dtype=np.uint8) for canal in CANAIS_POR_MODELO[modelo]}
+
+    for bloco in iterar_blocos(altura, largura, tamanho_bloco, margem):
+        if planos is not None:  # monta o bloco BGR a partir dos planos (só o bloco)
+            lido = cv2.merge([p[bloco.linhas_leitura, bloco.colunas_leitura] for p in planos])
+        else:
+            lido = img_bgr[bloco.linhas_leitura, bloco.colunas_leitura]  # view (sem cópia)
+        tile = lido[bloco.interno]  # conversões de cor são pixel a pixel: só a parte interna
+        destino = (bloco.linhas, bloco.colunas)
+
+        if estatisticas is not None:  # bandas e índices no mesmo bloco das conversões
+            bandas_tile = mapear_bandas(tile, ordem)
+            for indice, saida in saidas_indices.items():
+                bandas_tile[indice] = calcular_indice(indice, bandas_tile, saida[destino])
+                if indice in indices_8bit:  # [-1, 1] -> uint8 já no bloco (temporário float32 do tamanho do bloco)
+                    indice_para_8bit(bandas_tile[indice], indices_8bit[indice][destino])
+            estatisticas.adicionar(bandas_tile)
+            if not saidas:
+                continue
+            tile = composicao_bgr(tile, ordem)
+
+        if "RGB" in saidas:
+            R, G, B = saidas["RGB"]
+            R[destino] = tile[:, :, 2]
+            G[destino] = tile[:, :, 1]
+            B[destino] = tile[:, :, 0]
+
+        if "CMY" in saidas:
+            C, M, Y = saidas["CMY"]
+            converter_cmy(tile, C[destino], M[destino], Y[destino])
+
+        if "HSI" in saidas:
+            H, S, I = saidas["HSI"]
+            f = hsi_float[destino]  # view do memmap
+            converter_hsi(tile, f[:, :, 0], f[:, :, 1], f[:, :, 2])
+            hsi_para_8bit(f[:, :, 0], f[:, :, 1], f[:, :, 2], H[destino], S[destino], I[destino])
+
+        if "YUV" in saidas:
+            Y, U, V = saidas["YUV"]
+            converter_yuv(tile, Y[destino], U[destino], V[destino])
+
+        for modelo, composta in saidas_compostas.items():
+            for k, canal in enumerate(saidas[modelo]):
+                composta[destino + (k,)] = canal[destino]
+
+        if previas is not None:  # pedaço da prévia deste bloco (blocos alinhados ao fator)
+            y0, x0 = bloco.linhas.start // fator, bloco.colunas.start // fator
+            y1, x1 = -(-bloco.linhas.stop // fator), -(-bloco.colunas.stop // fator)
+            for modelo, canais in saidas.items():
+                for canal, dados in zip(CANAIS_POR_MODELO[modelo], canais):
+                    previas[modelo][canal][y0:y1, x0:x1] = _reduzir(dados[destino], (y1 - y0, x1 - x0), fator,
+                                                                   media=(modelo, canal) != ("HSI", "H"))
+
+    for canais in saidas.values():
+        for canal in canais:
+            canal.flush()
+    for composta in saidas_compostas.values():
+        composta.flush()
+    if "HSI" in saidas:
+        hsi_float.flush()
+    for saida in saidas_indices.values():
+        saida.flush()
+    for saida in indices_8bit.values():
+        saida.flush()
+
+    if gerar_pdif:  # .pdif comprimido, bloco a bloco a partir dos memmaps (memória limitada ao bloco)
+        for modelo, canais in saidas.items():
+            if not _incluir(gerar_pdif, modelo):
+                continue
+            pasta = os.path.join(pasta_base, f"canais{modelo}_{nome}")
+            gerados.append(salvar_canais(os.path.join(pasta, f"canais_{modelo}.pdif"), canais, CANAIS_POR_MODELO[modelo]))
+        if "HSI" in saidas and _incluir(gerar_pdif, "HSI_float"):
+            gerados.append(salvar_canais(os.path.join(pasta_base, f"canaisHSI_{nome}", "imagem_HSI_float.pdif"),
+                                         (hsi_float[:, :, 0], hsi_float[:, :, 1], hsi_float[:, :, 2]), ("H", "S", "I"),
+                                         atributos={"H": "graus", "S": "0..1", "I": "0..1"}))
+        for indice, dados in saidas_indices.items():
+            if not _incluir(gerar_pdif, indice):
+                continue
+            gerados.append(salvar_canais(os.path.join(pasta_indices, f"{indice}.pdif"), (dados,), (indice,)))
+
+    if gerar_png:  # PNG a partir do memmap: o codificador percorre o canal inteiro (não é limitado ao bloco)
+        for modelo, canais in saidas.items():
+            pasta = os.path.join(pasta_base, f"canais{modelo}_{nome}")
+            for canal, dados in zip(CANAIS_POR_MODELO[modelo], canais):
+                caminho_png = os.path.join(pasta, f"canal_{canal}.png")
+                cv2.imwrite(caminho_png, dados)
+                gerados.append(caminho_png)
+            if modelo in saidas_compostas:
+                caminho_png = os.path.join(pasta, f"{NOMES_COMPOSTA[modelo]}.png")
+                cv2.imwrite(caminho_png, saidas_compostas[modelo])
+                gerados.append(caminho_png)
+        for indice, dados in indices_8bit.items():
+            caminho_png = os.path.join(pasta_indices, f"{indice}.png")
+            cv2.imwrite(caminho_png, dados)
+            gerados.append(caminho_png)
+
+    if estatisticas is not None:
+        gerados.append(estatisticas.exportar_csv(os.path.join(pasta_indices, "estatisticas_bandas.csv")))
+
+    # fecha os memmaps antes de apagar os .npy
+    del saidas, saidas_compostas, saidas_indices, indices_8bit
+    if "HSI" in estagios:
+        del hsi_float
+    if manter_npy:
+        gerados += temporarios
+    else:
+        for caminho in temporarios:
+            os.remove(caminho)
+
+    return gerados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversões de cor bloco a bloco (RGB, CMY, HSI, YUV).")
+    parser.add_argument("imagem", nargs="?", default="top_mosaic_09cm_area35.tif", help="imagem de entrada")
+    parser.add_argument("--nome", default="area35", help="sufixo das pastas canais<Modelo>_<nome>")
+    parser.add_argument("--estagios", default="RGB,CMY,HSI,YUV", help="modelos separados por vírgula")
+    parser.add_argument("--bloco", type=int, default=1024, help="tamanho do bloco em pixels")
+    parser.add_argument("--margem", type=int, default=0, help="margem (halo) em pixels")
+    parser.add_argument("--sem-png", action="store_true", help="não gera os PNGs no final (o PNG percorre o canal inteiro)")
+    parser.add_argument("--pdif", action="store_true", help="gera também .pdif comprimidos, escritos bloco a bloco")
+    parser.add_argument("--sem-npy", action="store_true", help="apaga os .npy depois de gerar os PNG/.pdif")
+    parser.add_argument("--lut", action="store_true", help="CMY, HSI e YUV pelas tabelas 256^3 (lut.py)")
+    parser.add_argument("--bandas", help="ordem das bandas do arquivo (ex.: IRRG, RGBIR, 'IR,R,G'); lê todas as bandas")
+    parser.add_argument("--indices", default="", help="índices espectrais separados por vírgula (ex.: NDVI,NDWI)")
+    args = parser.parse_args()
+
+    # Com --bandas: todas as bandas, tipo original; senão BGR 8-bit como antes (memmap do cache_raster)
+    img_bgr = ler_imagem(args.imagem, cv2.IMREAD_UNCHANGED if args.bandas else cv2.IMREAD_COLOR)
+    if img_bgr is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {args.imagem}")
+
+    gerados = processar_em_blocos(
+        img_bgr, args.nome, tuple(e for e in args.estagios.upper().split(",") if e), args.bloco, args.margem,
+        gerar_png=not args.sem_png, ordem=args.bandas,
+        indices=tuple(i for i in args.indices.upper().split(",") if i),
+        gerar_pdif=args.pdif, manter_npy=not args.sem_npy, usar_lut=args.lut,
+    )
+
+    print(f"Processamento em blocos concluído ({args.nome}, bloco {args.bloco}px):")
+    for caminho in gerados:
+        print(f"- {caminho}")
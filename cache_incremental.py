@@ -0,0 +1,196 @@
+import os  # caminhos e tamanhos de arquivo
+import sys  # módulos carregados (versão do código)
+import json  # manifesto
+import hashlib  # hash do conteúdo
+import cv2  # decodificação (só quando algo precisa ser recalculado)
+from cache_raster import ler_imagem  # decodificação com cache (.npy + memmap)
+from escrita import opcoes_codec
+from pipeline import ARTEFATOS, ARTEFATOS_PADRAO, ESTAGIOS, DEPENDENCIAS, executar_pipeline
+
+# CACHE INCREMENTAL DO PIPELINE (pula o que não mudou)
+#
+# Cada estágio do pipeline recebe uma chave:
+#   chave(estágio) = hash( chave da entrada do estágio, nome do estágio,
+#                          parâmetros do estágio, versão do código )
+# onde a "entrada do estágio" é o hash do arquivo de imagem ou, se o estágio depende
+# de outro (ver pipeline.DEPENDENCIAS), a chave desse outro estágio. Assim, mudar os
+# parâmetros de um estágio muda a chave dele e dos que dependem dele, e só esses são
+# recalculados. A recomposição passa os canais pelo codec da escrita (formato, nível
+# e estratégia PNG), então as opções do codec entram nos parâmetros dela como o
+# pipeline os repassa. A versão do código é o hash de todos os módulos desta pasta que o
+# pipeline importa (direta ou indiretamente: conversoes, precisao, verificacao,
+# georreferencia, piramide...), descobertos pelos imports, sem lista mantida à mão.
+#
+# O manifesto (.manifesto_pipeline.json na pasta base) guarda, por imagem e por
+# artefato, a chave usada e os arquivos gravados (com tamanho), com caminhos
+# relativos à pasta base: rodar de outra pasta não invalida nada. Se todos os
+# artefatos pedidos estão em dia, a imagem nem é decodificada: nada é recalculado
+# nem regravado em PNG/TIFF.
+
+NOME_MANIFESTO = ".manifesto_pipeline.json"
+MODULOS_RAIZ = ("pipeline", "cache_incremental")  # a versão cobre estes e tudo da pasta que eles importam
+
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for pedaco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(pedaco)
+    return h.hexdigest()
+
+
+def _modulo_local(nome, pasta):
+    modulo = sys.modules.get(nome)
+    arquivo = getattr(modulo, "__file__", None)
+    if arquivo and os.path.dirname(os.path.abspath(arquivo)) == pasta:
+        return modulo
+    return None
+
+
+def arquivos_do_codigo(raizes=MODULOS_RAIZ):
+    # Arquivos .py desta pasta alcançáveis pelos imports das raízes (módulos e nomes importados
+    # com "from x import y"); mudou qualquer um deles -> muda a versão
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    vistos = {}
+    pendentes = list(raizes)
+    while pendentes:
+        nome = pendentes.pop()
+        modulo = _modulo_local(nome, pasta)
+        if nome in vistos or modulo is None:
+            continue
+        vistos[nome] = os.path.abspath(modulo.__file__)
+        for valor in vars(modulo).values():
+            origem = valor.__name__ if isinstance(valor, type(sys)) else getattr(valor, "__module__", None)
+            if isinstance(origem, str) and origem not in vistos:
+                pendentes.append(origem)
+    return sorted(vistos.values())
+
+
+def versao_do_codigo(arquivos=None):
+    h = hashlib.sha256()
+    for caminho in arquivos or arquivos_do_codigo():
+        h.update(os.path.basename(caminho).encode("utf-8"))
+        with open(caminho, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def _hash_json(valor):
+    return hashlib.sha256(json.dumps(valor, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def parametros_efetivos(estagio, parametros=None, escrita=None):
+    # Argumentos que o executar_pipeline passa ao estágio (a recomposição recebe também o codec)
+    parametros = (parametros or {}).get(estagio, {})
+    if estagio == "recomposicao":
+        return {**opcoes_codec(escrita), **parametros}
+    return parametros
+
+
+def chaves_dos_estagios(hash_entrada, parametros=None, versao=None, escrita=None):
+    versao = versao or versao_do_codigo()
+    chaves = {}
+    for estagio in ESTAGIOS:  # ESTAGIOS já está em ordem de dependência
+        dependencia = DEPENDENCIAS[estagio]
+        entrada = chaves[dependencia] if dependencia else hash_entrada
+        chaves[estagio] = _hash_json({
+            "entrada": entrada,
+            "estagio": estagio,
+            "parametros": parametros_efetivos(estagio, parametros, escrita),
+            "versao": versao,
+        })
+    return chaves
+
+
+def carregar_manifesto(pasta_base="."):
+    caminho = os.path.join(pasta_base, NOME_MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}  # manifesto corrompido: recalcula tudo
+
+
+def salvar_manifesto(manifesto, pasta_base="."):
+    caminho = os.path.join(pasta_base, NOME_MANIFESTO)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+    os.replace(temporario, caminho)  # troca atômica
+
+
+def _em_dia(registro, chave, pasta_base="."):
+    # Artefato em dia: mesma chave e todos os arquivos ainda existem com o mesmo tamanho
+    if not registro or registro.get("chave") != chave:
+        return False
+    for relativo, tamanho in registro.get("arquivos", {}).items():
+        caminho = os.path.join(pasta_base, relativo)
+        if not os.path.exists(caminho) or os.path.getsize(caminho) != tamanho:
+            return False
+    return True
+
+
+def executar_incremental(caminho_imagem, nome, artefatos=ARTEFATOS_PADRAO, estagios=ESTAGIOS, parametros=None,
+                         pasta_base=".", pasta_resultados="resultados", escrita=None, georreferencia=None,
+                         piramides=False):
+    hash_entrada = hash_arquivo(caminho_imagem)
+    chaves = chaves_dos_estagios(hash_entrada, parametros, escrita=escrita)
+    codec = opcoes_codec(escrita)
+    extras = {"codec": codec} if codec and codec != {"formato": "png"} else {}  # outro codec: outros arquivos
+    if piramides:  # .piramide.npz ao lado das imagens
+        extras["piramides"] = True
+    if extras:  # outra chave por artefato
+        chaves_artefato = {e: _hash_json({"estagio": c, **extras}) for e, c in chaves.items()}
+    else:
+        chaves_artefato = chaves
+
+    manifesto = carregar_manifesto(pasta_base)
+    registro = manifesto.setdefault(nome, {"artefatos": {}})
+    registro.setdefault("artefatos", {})
+
+    # 1) O que está desatualizado?
+    pendentes = [a for a in artefatos
+                 if not _em_dia(registro["artefatos"].get(a), chaves_artefato[ARTEFATOS[a]], pasta_base)]
+    estagios_pendentes = {ARTEFATOS[a] for a in pendentes}
+
+    recomposicao = registro.get("recomposicao")
+    if "recomposicao" in estagios and (not recomposicao or recomposicao.get("chave") != chaves["recomposicao"]):
+        estagios_pendentes.add("recomposicao")
+
+    reaproveitados = [a for a in artefatos if a not in pendentes]
+    if not estagios_pendentes:  # tudo em dia: não decodifica, não calcula, não grava
+        return {
+            "gravados": [],
+            "reaproveitados": reaproveitados,
+            "recomposicao": recomposicao["resumo"] if recomposicao else None,
+        }
+
+    # 2) Decodifica uma vez e roda só os estágios pendentes
+    img_bgr = ler_imagem(caminho_imagem, cv2.IMREAD_COLOR)
+    if img_bgr is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho_imagem}")
+
+    estagios_pendentes = tuple(e for e in ESTAGIOS if e in estagios_pendentes)
+    dados = executar_pipeline(img_bgr, nome, pendentes, estagios_pendentes, pasta_base, pasta_resultados,
+                              parametros, escrita, georreferencia, piramides)
+
+    # 3) Atualiza o manifesto
+    for artefato, arquivos in dados["gravados_por_artefato"].items():
+        registro["artefatos"][artefato] = {
+            "chave": chaves_artefato[ARTEFATOS[artefato]],
+            "arquivos": {os.path.relpath(caminho, pasta_base): os.path.getsize(caminho) for caminho in arquivos},
+        }
+    if "recomposicao" in dados:
+        resumo = {k: v for k, v in dados["recomposicao"].items() if k != "diff_abs"}
+        registro["recomposicao"] = {"chave": chaves["recomposicao"], "resumo": resumo}
+    registro["entrada"] = {"caminho": os.path.relpath(caminho_imagem, pasta_base), "sha256": hash_entrada}
+    salvar_manifesto(manifesto, pasta_base)
+
+    dados["reaproveitados"] = reaproveitados
+    if "recomposicao" in dados:
+        dados["recomposicao"] = registro["recomposicao"]["resumo"]
+    elif recomposicao:
+        dados["recomposicao"] = recomposicao["resumo"]
+    return dados
@@ -0,0 +1,165 @@
+import os  # caminhos, datas e tamanhos
+import glob  # entradas antigas da mesma imagem
+import hashlib  # nome de cada entrada
+import argparse  # linha de comando
+import cv2  # decodificação (só na primeira leitura)
+import numpy as np  # .npy e memmap
+from instrumentacao import obter_instrumentacao
+
+# CACHE DE IMAGENS DECODIFICADAS (.npy + memmap)
+#
+# Cada script area35 decodifica o mesmo GeoTIFF do zero, e os d5 decodificam os três
+# PNGs do d1. ler_imagem(caminho, flags) substitui o cv2.imread:
+# - na primeira vez decodifica normalmente e guarda a matriz decodificada como .npy
+#   sem compressão na pasta do cache;
+# - nas próximas abre o .npy com memmap (modo "c": cópia na escrita), em milissegundos
+#   e sem cópia: só as páginas usadas são lidas do disco, e quem altera a matriz
+#   altera uma cópia privada, nunca o cache.
+# A chave é (caminho absoluto, flags do imread, data de modificação, tamanho): se a
+# imagem mudar, a entrada antiga não vale mais e é apagada na próxima leitura.
+#
+# O cache tem tamanho máximo (LRU): cada leitura "toca" a data do .npy e, ao
+# guardar uma entrada nova, as menos usadas recentemente são apagadas até caber.
+#
+# Variáveis de ambiente:
+#   PDI_CACHE_RASTER=0        -> desliga (ler_imagem vira cv2.imread)
+#   PDI_PASTA_CACHE_RASTER    -> pasta do cache (padrão: cache_raster)
+#   PDI_CACHE_RASTER_MB       -> tamanho máximo em MB (padrão: 4096)
+
+PASTA_CACHE_RASTER = "cache_raster"
+LIMITE_MB_PADRAO = 4096
+
+
+def cache_ativo():
+    return os.environ.get("PDI_CACHE_RASTER", "1").strip().lower() not in ("0", "nao", "não", "false")
+
+
+def pasta_cache():
+    return os.environ.get("PDI_PASTA_CACHE_RASTER", PASTA_CACHE_RASTER)
+
+
+def limite_bytes():
+    return int(float(os.environ.get("PDI_CACHE_RASTER_MB", LIMITE_MB_PADRAO)) * 1024 * 1024)
+
+
+def _prefixo(caminho, flags):
+    # Parte do nome que só depende do arquivo e das flags (identifica versões antigas)
+    origem = f"{os.path.abspath(caminho)}|{flags}".encode("utf-8")
+    base = os.path.splitext(os.path.basename(caminho))[0]
+    return f"{base}_{hashlib.blake2b(origem, digest_size=8).hexdigest()}"
+
+
+def caminho_entrada(caminho, flags=cv2.IMREAD_COLOR, pasta=None):
+    estado = os.stat(caminho)
+    versao = hashlib.blake2b(f"{estado.st_mtime_ns}|{estado.st_size}".encode("utf-8"), digest_size=6).hexdigest()
+    return os.path.join(pasta or pasta_cache(), f"{_prefixo(caminho, flags)}_{versao}.npy")
+
+
+def entradas(pasta=None):
+    # (caminho, tamanho, último uso) de cada entrada, da menos para a mais usada recentemente
+    encontradas = []
+    for caminho in glob.glob(os.path.join(pasta or pasta_cache(), "*.npy")):
+        try:
+            estado = os.stat(caminho)
+        except FileNotFoundError:  # apagada por outro processo
+            continue
+        encontradas.append((caminho, estado.st_size, estado.st_mtime))
+    return sorted(encontradas, key=lambda e: e[2])
+
+
+def liberar_espaco(necessario=0, pasta=None, limite=None, manter=()):
+    # Apaga as entradas menos usadas até o cache + necessario caber no limite
+    limite = limite_bytes() if limite is None else limite
+    lista = entradas(pasta)
+    total = sum(e[1] for e in lista) + necessario
+    apagadas = []
+    for caminho, tamanho, _ in lista:
+        if total <= limite:
+            break
+        if os.path.abspath(caminho) in manter:
+            continue
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+        apagadas.append(caminho)
+    return apagadas
+
+
+def ler_imagem(caminho, flags=cv2.IMREAD_COLOR, pasta=None, limite=None):
+    # Mesmo contrato do cv2.imread: devolve None se não conseguir ler
+    with obter_instrumentacao().etapa("leitura"):
+        return _ler_imagem(caminho, flags, pasta, limite)
+
+
+def _ler_imagem(caminho, flags, pasta, limite):
+    if not cache_ativo() or not os.path.isfile(caminho):
+        return cv2.imread(caminho, flags)
+
+    pasta = pasta or pasta_cache()
+    destino = caminho_entrada(caminho, flags, pasta)
+    if os.path.exists(destino):
+        try:
+            img = np.load(destino, mmap_mode="c")  # sem decodificar e sem copiar
+            os.utime(destino)  # LRU: marca como usada agora
+            return img
+        except (OSError, ValueError):  # entrada corrompida: refaz
+            pass
+
+    img = cv2.imread(caminho, flags)
+    if img is None:
+        return None
+
+    limite = limite_bytes() if limite is None else limite
+    if img.nbytes > limite:  # maior que o cache inteiro: nem tenta guardar
+        return img
+
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        for antiga in glob.glob(os.path.join(pasta, f"{_prefixo(caminho, flags)}_*.npy")):
+            os.remove(antiga)  # versões anteriores do mesmo arquivo
+        liberar_espaco(img.nbytes, pasta, limite)
+        temporario = f"{destino}.{os.getpid()}.tmp.npy"
+        np.save(temporario, img)
+        os.replace(temporario, destino)  # aparece completa ou não aparece
+    except OSError:  # sem espaço/permissão: o cache é só uma otimização
+        pass
+    return img
+
+
+def limpar_cache(pasta=None):
+    apagadas = [e[0] for e in entradas(pasta)]
+    for caminho in apagadas:
+        os.remove(caminho)
+    return apagadas
+
+
+if __name__ == "__main__":
+    import time  # comparar decodificação x cache
+
+    parser = argparse.ArgumentParser(description="Cache de imagens decodificadas (.npy com memmap).")
+    parser.add_argument("imagens", nargs="*", help="imagens para ler (primeira leitura x leitura do cache)")
+    parser.add_argument("--limpar", action="store_true", help="apaga todas as entradas do cache")
+    args = parser.parse_args()
+
+    if args.limpar:
+        print(f"{len(limpar_cache())} entrada(s) apagada(s) de {pasta_cache()}")
+
+    for caminho in args.imagens:
+        inicio = time.perf_counter()
+        direto = cv2.imread(caminho, cv2.IMREAD_COLOR)
+        t_decodificar = time.perf_counter() - inicio
+        if direto is None:
+            print(f"[ERRO] Não foi possível ler a imagem: {caminho}")
+            continue
+        ler_imagem(caminho)  # garante a entrada no cache
+        inicio = time.perf_counter()
+        img = ler_imagem(caminho)
+        t_cache = time.perf_counter() - inicio
+        print(f"{caminho}: decodificar {t_decodificar * 1000:.1f} ms | cache {t_cache * 1000:.2f} ms | "
+              f"idênticas? {np.array_equal(direto, img)}")
+
+    lista = entradas()
+    print(f"Cache {pasta_cache()}: {len(lista)} entrada(s), {sum(e[1] for e in lista) / 2 ** 20:.1f} MB "
+          f"(limite {limite_bytes() / 2 ** 20:.0f} MB)")
@@ -0,0 +1,146 @@
+import argparse  # linha de comando
+import numpy as np  # views e buffers
+
+# ACESSO AOS CANAIS SEM CÓPIAS
+#
+# Os scripts faziam cv2.cvtColor(BGR2RGB) (uma cópia da imagem inteira), depois
+# cv2.split (mais 3 cópias), "255 - r" (mais 3), .astype(np.uint8) em arrays que já
+# eram uint8 (mais 3) e cv2.merge para remontar (mais uma). Aqui:
+# - R, G, B são views com passo da própria matriz BGR lida pelo OpenCV (nenhum byte
+#   copiado); para o matplotlib, img_bgr[:, :, ::-1] também é só uma view;
+# - os kernels escrevem em saídas pré-alocadas, intercaladas (altura, largura, 3) ou
+#   planares (3, altura, largura); os canais de saída são views desse buffer, então
+#   a "imagem de 3 canais" já existe sem cv2.merge;
+# - nada de astype(np.uint8) em canais que já são uint8.
+# O cv2.imwrite aceita as views com passo direto.
+#
+# `python canais.py [imagem]` mede com tracemalloc o pico de memória e o tempo das
+# etapas d1, d2 e d5 no jeito antigo e com estas funções.
+
+
+def canais_rgb(img_bgr):
+    # R, G, B como views da matriz BGR (ordem do OpenCV)
+    return img_bgr[:, :, 2], img_bgr[:, :, 1], img_bgr[:, :, 0]
+
+
+def rgb_para_exibir(img_bgr):
+    # Imagem em ordem RGB para o matplotlib, sem cvtColor (view com passo negativo)
+    return img_bgr[:, :, ::-1]
+
+
+def alocar_canais(altura, largura, dtype=np.uint8, n_canais=3, planar=False):
+    # Buffer único e as views de cada canal dentro dele
+    if planar:
+        buffer = np.empty((n_canais, altura, largura), dtype=dtype)
+        return buffer, tuple(buffer[k] for k in range(n_canais))
+    buffer = np.empty((altura, largura, n_canais), dtype=dtype)
+    return buffer, tuple(buffer[:, :, k] for k in range(n_canais))
+
+
+def bgr_para_cmy_em(img_bgr, saida=None, planar=False):
+    # C, M, Y = 255 - R, G, B numa única operação, escrita direto em saida
+    # (intercalada (h, w, 3) na ordem C, M, Y, ou planar (3, h, w))
+    altura, largura = img_bgr.shape[:2]
+    if saida is None:
+        saida = alocar_canais(altura, largura, planar=planar)[0]
+    rgb = img_bgr[:, :, ::-1]  # view R, G, B
+    if planar:
+        rgb = rgb.transpose(2, 0, 1)  # (3, h, w), ainda view
+    np.subtract(255, rgb, out=saida, dtype=np.uint8)
+    canais = tuple(saida[k] for k in range(3)) if planar else tuple(saida[:, :, k] for k in range(3))
+    return saida, canais
+
+
+def _mesma_view(a, b):
+    return (a.__array_interface__["data"][0] == b.__array_interface__["data"][0]
+            and a.strides == b.strides and a.shape == b.shape)
+
+
+def juntar_canais(canais, saida=None):
+    # Substitui o cv2.merge: copia cada canal para saida (intercalada), mas pula os
+    # canais que já são a view certa de saida (caso dos kernels que escreveram no lugar)
+    altura, largura = canais[0].shape
+    if saida is None:
+        saida = np.empty((altura, largura, len(canais)), dtype=canais[0].dtype)
+    for k, canal in enumerate(canais):
+        destino = saida[:, :, k]
+        if not _mesma_view(canal, destino):
+            destino[...] = canal
+    return saida
+
+
+def medir_pico(funcao, *args):
+    # (resultado, pico de memória em bytes acima do início, segundos) com tracemalloc
+    import time
+    import tracemalloc
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return resultado, pico, segundos
+
+
+if __name__ == "__main__":
+    import os  # caminho da imagem padrão
+    import cv2  # versões antigas (cvtColor, split, merge)
+    from conversoes import canais_para_yuv
+
+    parser = argparse.ArgumentParser(description="Pico de memória (tracemalloc) de d1/d2/d5: antigo x views.")
+    parser.add_argument("imagem", nargs="?", help="imagem de entrada (padrão: area35 se existir, senão lena)")
+    args = parser.parse_args()
+
+    caminho = args.imagem or ("top_mosaic_09cm_area35.tif" if os.path.exists("top_mosaic_09cm_area35.tif")
+                              else "lena-Color.png")
+    img_bgr = cv2.imread(caminho, cv2.IMREAD_COLOR)
+    if img_bgr is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho}")
+
+    def d1_antigo(img):
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        r, g, b = cv2.split(img_rgb)
+        return r.astype(np.uint8), g.astype(np.uint8), b.astype(np.uint8)
+
+    def d1_novo(img):
+        return canais_rgb(img)  # já são uint8: nenhum astype
+
+    def d2_antigo(img):
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        r, g, b = cv2.split(img_rgb)
+        c, m, y = 255 - r, 255 - g, 255 - b
+        return c.astype(np.uint8), m.astype(np.uint8), y.astype(np.uint8)
+
+    def d2_novo(img):
+        return bgr_para_cmy_em(img)[1]
+
+    def d5_antigo(img):
+        R, G, B = (c.astype(np.float32) for c in cv2.split(img)[::-1])  # como os 3 PNGs lidos
+        Y = 0.299 * R + 0.587 * G + 0.114 * B
+        U = -0.14713 * R - 0.28886 * G + 0.436 * B
+        V = 0.615 * R - 0.51499 * G - 0.10001 * B
+        U_digital = U + 128.0
+        V_digital = V + 128.0
+        Y_8bit = np.clip(Y, 0, 255).astype(np.uint8)
+        U_8bit = np.clip(U_digital, 0, 255).astype(np.uint8)
+        V_8bit = np.clip(V_digital, 0, 255).astype(np.uint8)
+        return cv2.merge((Y_8bit, U_8bit, V_8bit))
+
+    def d5_novo(img):
+        imagem_yuv, (Y, U, V) = alocar_canais(*img.shape[:2])
+        canais_para_yuv(*canais_rgb(img), Y, U, V)
+        return juntar_canais((Y, U, V), imagem_yuv)  # nada a copiar: Y, U, V já são views dela
+
+    altura, largura = img_bgr.shape[:2]
+    print(f"{caminho}: {largura}x{altura} ({img_bgr.nbytes / 2 ** 20:.1f} MB em BGR)")
+    for etapa, antigo, novo in (("d1", d1_antigo, d1_novo), ("d2", d2_antigo, d2_novo), ("d5", d5_antigo, d5_novo)):
+        ref, pico_antigo, t_antigo = medir_pico(antigo, img_bgr)
+        res, pico_novo, t_novo = medir_pico(novo, img_bgr)
+        iguais = np.array_equal(np.dstack(ref), np.dstack(res))
+        print(f"{etapa}: pico {pico_antigo / 2 ** 20:7.1f} MB -> {pico_novo / 2 ** 20:7.1f} MB "
+              f"({pico_novo / max(pico_antigo, 1):.0%}), tempo {t_antigo * 1000:6.1f} ms -> {t_novo * 1000:6.1f} ms, "
+              f"iguais? {iguais}")
+        del ref, res
@@ -0,0 +1,352 @@
+import numpy as np  # operações vetorizadas sobre a matriz inteira
+
+# VETORIZADO - RGB/BGR -> HSI
+#
+# Mesmas fórmulas de d4lena_transformarHSI.bgr_para_hsi (com R,G,B em [0,1]):
+#   I = (R + G + B) / 3
+#   S = 1 - (3 * min(R,G,B)) / (R + G + B)
+#   H = arccos( ((R-G)+(R-B)) / (2*sqrt((R-G)^2 + (R-B)(G-B))) )
+#   Se B > G então H = 360 - H
+#
+# Mesmos tratamentos do laço pixel a pixel:
+# - Se (R+G+B) == 0  -> S = 0   (pixel preto)
+# - Se denominador do H == 0 -> H = 0
+# - Clamp do argumento do acos para [-1, 1]
+#
+# Diferença: tudo é feito na matriz inteira de uma vez (NumPy), sem laço em Python.
+# Requisito: os canais 8-bit (hsi_para_8bit, truncamento) idênticos aos do laço.
+# - S: mesma conta do laço, nos canais normalizados em float32 (x / 255) e com a
+#   aritmética em float64 (os floats do Python), em faixas de linhas. Feita em 0..255
+#   ou só em float32, ~0.5% dos valores de S caem um nível abaixo depois do truncamento.
+# - H: o argumento do acos não depende da escala, então a conta é feita direto em
+#   0..255 (diferenças e radicando inteiros exatos em float32); conferido nas 256^3
+#   entradas: H_8bit e I_8bit saem idênticos aos do laço.
+#
+# H, S, I podem ser passados pelo chamador (matrizes float32 já alocadas, por exemplo
+# um recorte de uma matriz maior); se não forem passados, são criados aqui.
+#
+# metodo_matiz escolhe como o H é calculado (S e I não mudam):
+#   exato     -> arccos acima (padrão; é a referência dos scripts d4)
+#   atan2     -> H = atan2(sqrt(3)*(G-B), (R-G)+(R-B)), em graus, +360 se negativo.
+#                É a mesma função: num² + (sqrt(3)(G-B))² = den², e o sinal de G-B
+#                já escolhe o quadrante, então não há sqrt, clamp nem dobra B > G.
+#                Difere do exato só por arredondamento float32 (< 0.001°; contra a
+#                conta em float64 é até mais preciso que o exato).
+#   polinomio -> o mesmo atan2 com atan(z), z = min/max em [0, 1], aproximado por um
+#                polinômio ímpar de grau 5 (minimax) e os octantes por simetria.
+#                Erro máximo de 0.035° em relação ao exato (conferido nos 256³
+#                valores BGR em matiz.py). Só compensa onde o arctan2 do NumPy não é
+#                vetorizado (SIMD); `python matiz.py` mede na máquina atual.
+
+METODOS_MATIZ = ("exato", "atan2", "polinomio")
+
+# atan(z) ≈ z*(c0 + c1 z² + c2 z⁴) em [0, 1], já em graus (ajuste minimax, erro máx. 0.0349°)
+COEFICIENTES_MATIZ = tuple(np.float32(np.degrees(c)) for c in (0.9953586962566726, -0.2886944086780486,
+                                                                  0.07934332788260033))
+ERRO_MAXIMO_MATIZ = {"exato": 0.0, "atan2": 0.001, "polinomio": 0.035}  # graus, em relação ao exato
+
+
+def bgr_para_hsi_vetorizado(img_bgr, H=None, S=None, I=None, metodo_matiz="exato"):
+    if metodo_matiz not in METODOS_MATIZ:
+        raise ValueError(f"Método de matiz desconhecido: {metodo_matiz} (opções: {', '.join(METODOS_MATIZ)})")
+    altura, largura = img_bgr.shape[:2]  # dimensões
+
+    # 1) Buffers de saída (usa os do chamador se existirem)
+    if H is None:
+        H = np.empty((altura, largura), dtype=np.float32)  # H em graus
+    if S is None:
+        S = np.empty((altura, largura), dtype=np.float32)  # S em [0,1]
+    if I is None:
+        I = np.empty((altura, largura), dtype=np.float32)  # I em [0,1]
+
+    # 2) Canais no padrão OpenCV (B,G,R), em float32 e na escala 0..255
+    B = img_bgr[:, :, 0].astype(np.float32)
+    G = img_bgr[:, :, 1].astype(np.float32)
+    R = img_bgr[:, :, 2].astype(np.float32)
+
+    # 3) Intensidade: I = (R+G+B)/3, normalizada para [0,1]
+    soma = R + G + B
+    np.multiply(soma, np.float32(1.0 / (3.0 * 255.0)), out=I)
+
+    # 4) Saturação: S = 1 - (3*min)/(R+G+B), com S = 0 no pixel preto (como o laço)
+    _saturacao(img_bgr, S)
+    minimo = np.empty((altura, largura), dtype=np.float32)  # buffer temporário do H
+
+    # 5) Matiz: reaproveita os buffers temporários (soma, minimo) para num e den
+    rg = R - G  # R - G
+    rb = R - B  # R - B
+    G -= B  # G - B (G não é mais usado depois disso)
+    num = np.add(rg, rb, out=soma)  # (R-G) + (R-B)
+    if metodo_matiz != "exato":
+        G *= np.float32(np.sqrt(3.0))  # sqrt(3)(G-B): seno do ângulo, com a mesma escala de num
+        if metodo_matiz == "atan2":
+            _matiz_atan2(num, G, H)
+        else:
+            _matiz_polinomio(num, G, H, rg, rb, minimo)
+        return H, S, I
+
+    den = np.multiply(rg, rg, out=minimo)  # (R-G)^2
+    rb *= G  # (R-B)(G-B)
+    den += rb
+    np.sqrt(den, out=den)
+    den *= np.float32(2.0)
+
+    definido = den > 0.0  # den == 0 -> H indefinido (tons de cinza)
+    H.fill(0.0)
+    np.divide(num, den, out=H, where=definido)
+    np.clip(H, -1.0, 1.0, out=H)  # clamp do argumento para o domínio do acos
+    np.arccos(H, out=H, where=definido)
+    np.degrees(H, out=H)
+
+    # 6) Ajuste de quadrante: se B > G então H = 360 - H
+    # (G já contém G - B, então B > G equivale a G < 0)
+    dobra = G < 0.0
+    dobra &= definido
+    np.subtract(np.float32(360.0), H, out=H, where=dobra)
+
+    return H, S, I
+
+
+def _saturacao(img_bgr, S, linhas_por_faixa=256):
+    # Mesmas operações do laço: canais / 255 em float32, depois float64 (float do Python);
+    # os temporários float64 têm o tamanho da faixa
+    altura = img_bgr.shape[0]
+    for y0 in range(0, altura, linhas_por_faixa):
+        faixa = slice(y0, y0 + linhas_por_faixa)
+        normalizada = img_bgr[faixa].astype(np.float32)
+        normalizada /= np.float32(255.0)
+        b, g, r = normalizada[:, :, 0], normalizada[:, :, 1], normalizada[:, :, 2]
+        soma = r.astype(np.float64)
+        soma += g
+        soma += b  # (r + g) + b
+        minimo = np.minimum(np.minimum(r, g), b).astype(np.float64)
+        minimo *= 3.0  # 3 * min
+        nao_preto = soma > 0.0
+        np.divide(minimo, soma, out=minimo, where=nao_preto)
+        np.subtract(1.0, minimo, out=minimo)
+        minimo[~nao_preto] = 0.0  # pixel preto
+        S[faixa] = minimo
+
+
+def _matiz_atan2(x, y, H):
+    np.arctan2(y, x, out=H)  # (0, 0) -> 0, como o H indefinido do exato
+    np.degrees(H, out=H)
+    np.add(H, np.float32(360.0), out=H, where=H < 0.0)
+
+
+def _matiz_polinomio(x, y, H, ax, ay, maior):
+    # atan2(y, x) em graus; ax, ay e maior são buffers temporários do tamanho de H
+    np.abs(x, out=ax)
+    np.abs(y, out=ay)
+    troca = ay > ax  # octante acima de 45°: atan(z) = 90 - atan(1/z)
+    np.maximum(ax, ay, out=maior)
+    np.minimum(ax, ay, out=H)
+    np.divide(H, maior, out=H, where=maior > 0.0)  # z em [0, 1]; maior == 0 -> z = 0 -> H = 0
+    z2 = np.multiply(H, H, out=ax)
+    c0, c1, c2 = COEFICIENTES_MATIZ
+    p = np.multiply(z2, c2, out=ay)
+    p += c1
+    p *= z2
+    p += c0
+    H *= p
+    np.subtract(np.float32(90.0), H, out=H, where=troca)
+    np.subtract(np.float32(180.0), H, out=H, where=x < 0.0)  # 2º e 3º quadrantes
+    np.subtract(np.float32(360.0), H, out=H, where=y < 0.0)  # B > G
+
+
+# HSI float -> 8-bit, igual aos scripts d4 (H 0..360 -> 0..255, S e I 0..1 -> 0..255)
+
+
+def hsi_para_8bit(H, S, I, H_8bit=None, S_8bit=None, I_8bit=None):
+    if H_8bit is None:
+        H_8bit = np.empty(H.shape, dtype=np.uint8)
+    if S_8bit is None:
+        S_8bit = np.empty(S.shape, dtype=np.uint8)
+    if I_8bit is None:
+        I_8bit = np.empty(I.shape, dtype=np.uint8)
+
+    H_8bit[...] = H / 360.0 * 255.0  # cast para uint8 (trunca, como astype)
+    S_8bit[...] = S * 255.0
+    I_8bit[...] = I * 255.0
+
+    return H_8bit, S_8bit, I_8bit
+
+
+# VETORIZADO - RGB/BGR -> YUV (BT.601), igual a d5*_transformarYUV
+#   Y =  0.299*R   + 0.587*G   + 0.114*B
+#   U = -0.14713*R - 0.28886*G + 0.436*B    (+128 para caber em 0..255)
+#   V =  0.615*R   - 0.51499*G - 0.10001*B  (+128 para caber em 0..255)
+# Retorna Y, U, V já em 8-bit (clip + uint8), como os canais salvos em PNG.
+
+
+def bgr_para_yuv(img_bgr, Y=None, U=None, V=None):
+    # Canais B, G, R da imagem intercalada são views (sem cópia)
+    return canais_para_yuv(img_bgr[:, :, 2], img_bgr[:, :, 1], img_bgr[:, :, 0], Y, U, V)
+
+
+def canais_para_yuv(R, G, B, Y=None, U=None, V=None, linhas_por_faixa=256):
+    # Mesmo cálculo a partir de 3 canais 8-bit separados (ex.: os PNGs lidos pelo d5).
+    # Feito em faixas de linhas: os temporários float32 têm o tamanho da faixa, não da imagem.
+    altura, largura = R.shape  # dimensões
+    if Y is None:
+        Y = np.empty((altura, largura), dtype=np.uint8)
+    if U is None:
+        U = np.empty((altura, largura), dtype=np.uint8)
+    if V is None:
+        V = np.empty((altura, largura), dtype=np.uint8)
+
+    for y0 in range(0, altura, linhas_por_faixa):
+        faixa = slice(y0, y0 + linhas_por_faixa)
+
+        # float32 para não truncar as contas (mesma ordem de operações do d5)
+        b = B[faixa].astype(np.float32)
+        g = G[faixa].astype(np.float32)
+        r = R[faixa].astype(np.float32)
+
+        canal = 0.299 * r + 0.587 * g + 0.114 * b  # luminância
+        np.clip(canal, 0, 255, out=canal)
+        Y[faixa] = canal  # cast para uint8 (trunca, como astype)
+
+        canal = -0.14713 * r - 0.28886 * g + 0.436 * b  # crominância azul
+        canal += 128.0  # desloca para caber em 0..255
+        np.clip(canal, 0, 255, out=canal)
+        U[faixa] = canal
+
+        canal = 0.615 * r - 0.51499 * g - 0.10001 * b  # crominância vermelha
+        canal += 128.0
+        np.clip(canal, 0, 255, out=canal)
+        V[faixa] = canal
+
+    return Y, U, V
+
+
+# Mesma matriz em forma de tabela (linhas Y, U, V; colunas R, G, B), usada por
+# bgr_para_yuv_float e pela inversa em inversas.py
+
+MATRIZ_YUV = np.array([
+    [0.299, 0.587, 0.114],
+    [-0.14713, -0.28886, 0.436],
+    [0.615, -0.51499, -0.10001],
+], dtype=np.float64)
+
+
+def bgr_para_yuv_float(img_bgr, Y=None, U=None, V=None):
+    # Y em 0..255, U e V com sinal (sem o +128 e sem clip/truncamento): para medir a
+    # perda da quantização 8-bit e para editar em YUV antes de voltar para RGB
+    altura, largura = img_bgr.shape[:2]
+    saidas = []
+    for canal in (Y, U, V):
+        saidas.append(np.empty((altura, largura), dtype=np.float32) if canal is None else canal)
+
+    B = img_bgr[:, :, 0].astype(np.float32)
+    G = img_bgr[:, :, 1].astype(np.float32)
+    R = img_bgr[:, :, 2].astype(np.float32)
+
+    for linha, canal in zip(MATRIZ_YUV.astype(np.float32), saidas):
+        np.multiply(R, linha[0], out=canal)
+        canal += linha[1] * G
+        canal += linha[2] * B
+
+    return tuple(saidas)
+
+
+# INTEIRO (ponto fixo) - RGB/BGR -> YUV (BT.601), sem nenhuma matriz float
+#
+# Os coeficientes de MATRIZ_YUV são multiplicados por 2^16 e arredondados; a conta
+# é feita em int32 e o resultado volta para a escala com um deslocamento (>> 16),
+# que é um piso, como o truncamento do astype(np.uint8) do d5:
+#   Y = (19595 R + 38470 G + 7471 B) >> 16
+#   U = (-9642 R - 18931 G + 28574 B + (128 << 16)) >> 16
+#   V = (40305 R - 33750 G - 6554 B + (128 << 16)) >> 16
+# Os coeficientes do Y somam exatamente 65536: cinza (R=G=B) dá Y igual ao nível.
+# Maior módulo possível da soma: 255 * (40305 + 33750 + 6554) ~ 2^24, sem risco de
+# estouro no int32. Em relação ao caminho float (bgr_para_yuv), alguns poucos
+# pixels podem sair 1 nível diferentes, quando o valor exato cai colado num inteiro
+# (a conferência em yuv_planar.py conta quantos, nas 256^3 entradas).
+
+BITS_YUV_INTEIRO = 16
+COEFICIENTES_YUV_INTEIROS = np.rint(MATRIZ_YUV * (1 << BITS_YUV_INTEIRO)).astype(np.int32)
+
+
+def bgr_para_yuv_inteiro(img_bgr, Y=None, U=None, V=None, linhas_por_faixa=256):
+    # Em faixas de linhas, como canais_para_yuv: os acumuladores int32 (4 bytes/pixel cada)
+    # têm o tamanho da faixa, não da imagem
+    altura, largura = img_bgr.shape[:2]  # dimensões
+    saidas = []
+    for canal in (Y, U, V):
+        saidas.append(np.empty((altura, largura), dtype=np.uint8) if canal is None else canal)
+
+    linhas = min(linhas_por_faixa, altura)
+    soma = np.empty((linhas, largura), dtype=np.int32)  # acumulador
+    produto = np.empty((linhas, largura), dtype=np.int32)
+
+    for y0 in range(0, altura, linhas_por_faixa):
+        faixa = slice(y0, y0 + linhas_por_faixa)
+        B = img_bgr[faixa, :, 0]  # views uint8, sem conversão
+        G = img_bgr[faixa, :, 1]
+        R = img_bgr[faixa, :, 2]
+        n = R.shape[0]  # a última faixa pode ser menor
+        s, p = soma[:n], produto[:n]
+
+        for linha, canal, deslocamento in zip(COEFICIENTES_YUV_INTEIROS, saidas, (0, 128, 128)):
+            np.multiply(R, linha[0], out=s, dtype=np.int32)
+            s += np.multiply(G, linha[1], out=p, dtype=np.int32)
+            s += np.multiply(B, linha[2], out=p, dtype=np.int32)
+            s += deslocamento << BITS_YUV_INTEIRO  # +128 de U e V, ainda na escala 2^16
+            s >>= BITS_YUV_INTEIRO  # piso (deslocamento aritmético)
+            np.clip(s, 0, 255, out=s)
+            canal[faixa] = s
+
+    return tuple(saidas)
+
+
+# CMY: C = 255 - R, M = 255 - G, Y = 255 - B (direto em uint8, sem overflow)
+
+
+def bgr_para_cmy(img_bgr, C=None, M=None, Y=None):
+    altura, largura = img_bgr.shape[:2]  # dimensões
+    if C is None:
+        C = np.empty((altura, largura), dtype=np.uint8)
+    if M is None:
+        M = np.empty((altura, largura), dtype=np.uint8)
+    if Y is None:
+        Y = np.empty((altura, largura), dtype=np.uint8)
+
+    np.subtract(255, img_bgr[:, :, 2], out=C, dtype=np.uint8)  # C = 255 - R
+    np.subtract(255, img_bgr[:, :, 1], out=M, dtype=np.uint8)  # M = 255 - G
+    np.subtract(255, img_bgr[:, :, 0], out=Y, dtype=np.uint8)  # Y = 255 - B
+
+    return C, M, Y
+
+
+if __name__ == "__main__":
+    import argparse  # linha de comando
+    import time  # laço x vetorizado
+    import cv2  # leitura
+    from d4lena_transformarHSI import bgr_para_hsi
+
+    # Relatório: versão vetorizada x laço pixel a pixel de d4lena_transformarHSI numa imagem
+    # (a conferência automática, com os casos de borda, fica em tests/test_conversoes.py)
+    parser = argparse.ArgumentParser(description="HSI vetorizado x laço pixel a pixel (diferenças e tempos).")
+    parser.add_argument("imagem", nargs="?", default="lena-Color.png", help="imagem de entrada")
+    parser.add_argument("--lado", type=int, default=128, help="recorte lado x lado (o laço é lento)")
+    args = parser.parse_args()
+
+    img = cv2.imread(args.imagem, cv2.IMREAD_COLOR)
+    if img is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {args.imagem}")
+    img = img[:args.lado, :args.lado]
+
+    inicio = time.perf_counter()
+    H_ref, S_ref, I_ref = bgr_para_hsi(img)  # laço (referência)
+    t_laco = time.perf_counter() - inicio
+
+    print(f"=== HSI VETORIZADO vs PIXEL A PIXEL ({img.shape[1]}x{img.shape[0]}, laço {t_laco * 1000:.0f} ms) ===")
+    for metodo in METODOS_MATIZ:
+        inicio = time.perf_counter()
+        H_vet, S_vet, I_vet = bgr_para_hsi_vetorizado(img, metodo_matiz=metodo)
+        t_vet = time.perf_counter() - inicio
+        dif_H = np.abs(H_vet - H_ref)
+        dif_H = np.minimum(dif_H, 360.0 - dif_H)  # no círculo
+        print(f"{metodo:<10} {t_vet * 1000:7.2f} ms | máx. H {dif_H.max():.3e}° | "
+              f"S {np.abs(S_vet - S_ref).max():.3e} | I {np.abs(I_vet - I_ref).max():.3e}")
@@ -1,12 +1,14 @@
 import os  # importa funções do sistema operacional (criar pasta, montar caminhos)
-import cv2  # importa OpenCV (ler imagem, separar canais, salvar imagens)
+import cv2  # importa OpenCV (ler imagem e salvar imagens)
 import numpy as np  # importa NumPy (manipulação numérica, não é obrigatório aqui mas é comum em PDI)
-import matplotlib.pyplot as plt  # importa Matplotlib (plotar/exibir imagens)
+from histogramas import histograma_canais  # contagens dos histogramas
+from canais import canais_rgb  # canais R, G, B como views (sem cópias)
+from piramide import para_exibir, lado_exibicao  # nível reduzido que cabe no subplot
+from graficos import graficos_ativos, obter_pyplot, finalizar_figuras  # gráficos (matplotlib só é importado se for plotar)
 
 # d.1) Separar a imagem nos canais RGB
 # - Ler a imagem
-# - Converter BGR -> RGB (porque OpenCV lê em BGR)
-# - Separar canais R, G, B
+# - Separar canais R, G, B (OpenCV lê em BGR: os canais são views da própria matriz)
 # - Plotar os 3 canais
 # - Salvar os 3 canais em uma pasta "resultados"
 
@@ -24,77 +26,56 @@ img_bgr = cv2.imread(caminho_imagem)  # lê a imagem (OpenCV lê em BGR)
 if img_bgr is None:  # se não encontrou o arquivo ou deu erro de leitura
     raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho_imagem}")  # para o programa com erro claro
 
-# 5) Converter BGR -> RGB para interpretação correta
-img_rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)  # converte para RGB (padrão do Matplotlib)
-
-# 6) Separar canais R, G, B
-r, g, b = cv2.split(img_rgb)  # separa em 3 matrizes 2D (cada uma = um canal)
+# 5) e 6) Separar canais R, G, B
+# Em vez de cvtColor (cópia RGB da imagem inteira) + split (mais 3 cópias), cada canal
+# é uma view 2D da matriz BGR lida: nenhum byte é copiado
+r, g, b = canais_rgb(img_bgr)  # 3 matrizes 2D (cada uma = um canal)
 
 # 7) Plotar os canais separados
-plt.figure(figsize=(12, 5))  # cria uma figura com tamanho adequado
-
-plt.subplot(1, 3, 1)         # 1 linha, 3 colunas, posição 1
-plt.imshow(r, cmap="gray")   # mostra o canal R como imagem em tons de cinza
-plt.title("Canal R")         # título do subplot
-plt.axis("off")              # remove eixos
-
-plt.subplot(1, 3, 2)         # posição 2
-plt.imshow(g, cmap="gray")   # mostra canal G
-plt.title("Canal G")
-plt.axis("off")
-
-plt.subplot(1, 3, 3)         # posição 3
-plt.imshow(b, cmap="gray")   # mostra canal B
-plt.title("Canal B")
-plt.axis("off")
-
-plt.tight_layout()           # ajusta espaçamentos automaticamente
-
-# Histograma
-plt.figure(figsize=(8, 5))  # cria nova figura para histograma
-
-plt.hist(
-    r.flatten(),  # transforma matriz 2D em vetor 1D
-    bins=256,  # 256 níveis digitais
-    range=(0, 255),  # intervalo completo 8 bits
-    color="red",  # cor da curva
-    alpha=0.5,  # transparência
-    label="Canal R"  # legenda
-)
-
-plt.hist(
-    g.flatten(),  # vetor 1D
-    bins=256,
-    range=(0, 255),
-    color="green",
-    alpha=0.5,
-    label="Canal G"
-)
-
-plt.hist(
-    b.flatten(),
-    bins=256,
-    range=(0, 255),
-    color="blue",
-    alpha=0.5,
-    label="Canal B"
-)
-
-plt.title("Histograma dos Canais RGB - png")  # título
-plt.xlabel("Nível Digital (0–255)")  # eixo X
-plt.ylabel("Frequência")  # eixo Y
-plt.legend()  # mostra legenda
-plt.grid(alpha=0.3)  # grade leve
-
-plt.tight_layout()  # ajusta layout
-plt.show()  # exibe
+if graficos_ativos():  # PDI_GRAFICOS=nenhum pula os plots (modo em lote)
+    plt = obter_pyplot()
+    plt.figure(figsize=(12, 5))  # cria uma figura com tamanho adequado
+    lado = lado_exibicao((12, 5), 1, 3)  # pixels de cada subplot
 
-# 8) Salvar os canais separados em arquivos
-# Obs: para salvar corretamente, usamos PNG (8-bit), então garantimos dtype uint8
+    plt.subplot(1, 3, 1)         # 1 linha, 3 colunas, posição 1
+    plt.imshow(para_exibir(r, lado), cmap="gray")   # mostra o canal R como imagem em tons de cinza
+    plt.title("Canal R")         # título do subplot
+    plt.axis("off")              # remove eixos
+
+    plt.subplot(1, 3, 2)         # posição 2
+    plt.imshow(para_exibir(g, lado), cmap="gray")   # mostra canal G
+    plt.title("Canal G")
+    plt.axis("off")
+
+    plt.subplot(1, 3, 3)         # posição 3
+    plt.imshow(para_exibir(b, lado), cmap="gray")   # mostra canal B
+    plt.title("Canal B")
+    plt.axis("off")
+
+    plt.tight_layout()           # ajusta espaçamentos automaticamente
+
+    # Histograma
+    plt.figure(figsize=(8, 5))  # cria nova figura para histograma
 
-r_saida = r.astype(np.uint8)  # garante tipo 8-bit
-g_saida = g.astype(np.uint8)  # garante tipo 8-bit
-b_saida = b.astype(np.uint8)  # garante tipo 8-bit
+    contagens = histograma_canais(img_bgr)  # 256 níveis por canal com cv2.calcHist (ordem B, G, R), sem flatten
+    bordas = np.linspace(0, 255, 257)  # 256 níveis digitais no intervalo 0..255
+
+    plt.stairs(contagens[2], bordas, fill=True, color="red", alpha=0.5, label="Canal R")  # R
+    plt.stairs(contagens[1], bordas, fill=True, color="green", alpha=0.5, label="Canal G")  # G
+    plt.stairs(contagens[0], bordas, fill=True, color="blue", alpha=0.5, label="Canal B")  # B
+
+    plt.title("Histograma dos Canais RGB - png")  # título
+    plt.xlabel("Nível Digital (0–255)")  # eixo X
+    plt.ylabel("Frequência")  # eixo Y
+    plt.legend()  # mostra legenda
+    plt.grid(alpha=0.3)  # grade leve
+
+    plt.tight_layout()  # ajusta layout
+    finalizar_figuras(("RGB_lena", "HIST_lena"))
+
+# 8) Salvar os canais separados em arquivos
+# Obs: PNG 8-bit; os canais já são uint8 (vêm direto da imagem lida), então não há
+# astype (que faria mais uma cópia de cada canal sem mudar nada)
 
 # Montar caminhos completos dos arquivos de saída
 caminho_r = os.path.join(pasta_saida, "canal_R.png")  # arquivo do canal R
@@ -102,9 +83,9 @@ caminho_g = os.path.join(pasta_saida, "canal_G.png")  # arquivo do canal G
 caminho_b = os.path.join(pasta_saida, "canal_B.png")  # arquivo do canal B
 
 # Salvar cada canal como uma imagem em escala de cinza
-cv2.imwrite(caminho_r, r_saida)  # salva canal R
-cv2.imwrite(caminho_g, g_saida)  # salva canal G
-cv2.imwrite(caminho_b, b_saida)  # salva canal B
+cv2.imwrite(caminho_r, r)  # salva canal R
+cv2.imwrite(caminho_g, g)  # salva canal G
+cv2.imwrite(caminho_b, b)  # salva canal B
 
 # 9) Mensagem final
 print("d.1 concluído: canais RGB separados, plotados e salvos em 'resultados'.")  # confirma execução
@@ -1,7 +1,8 @@
 import os  # manipulação de pastas
 import cv2  # leitura e salvamento de imagem
-import numpy as np  # operações numéricas
-import matplotlib.pyplot as plt  # visualização
+from canais import bgr_para_cmy_em  # CMY numa operação, canais como views (sem cópias)
+from piramide import para_exibir, lado_exibicao  # nível reduzido que cabe no subplot
+from graficos import graficos_ativos, obter_pyplot, finalizar_figuras  # gráficos (matplotlib só é importado se for plotar)
 
 
 # d.2) Separar a imagem nos canais CMY
@@ -19,55 +20,49 @@ img_bgr = cv2.imread(caminho_imagem)
 if img_bgr is None:
     raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho_imagem}")
 
-# 4) Converter para RGB
-img_rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
-
-# 5) Separar canais RGB
-r, g, b = cv2.split(img_rgb)
-
-# 6) Converter para CMY
+# 4), 5) e 6) Converter para CMY
 # Fórmula do modelo CMY:
 # C = 255 - R
 # M = 255 - G
 # Y = 255 - B
+# Os canais R, G, B são lidos como views da matriz BGR (sem cvtColor + split) e as
+# três subtrações viram uma só, escrita numa única matriz (altura, largura, 3);
+# c, m, y são views dessa matriz
 
-c = 255 - r
-m = 255 - g
-y = 255 - b
+imagem_cmy, (c, m, y) = bgr_para_cmy_em(img_bgr)
 
 # 7) Plotar canais CMY
-plt.figure(figsize=(12, 5))
-
-plt.subplot(1, 3, 1)
-plt.imshow(c, cmap="gray")
-plt.title("Canal C (Ciano)")
-plt.axis("off")
-
-plt.subplot(1, 3, 2)
-plt.imshow(m, cmap="gray")
-plt.title("Canal M (Magenta)")
-plt.axis("off")
-
-plt.subplot(1, 3, 3)
-plt.imshow(y, cmap="gray")
-plt.title("Canal Y (Amarelo)")
-plt.axis("off")
-
-plt.tight_layout()
-plt.show()
-
-# 8) Salvar canais
-c_saida = c.astype(np.uint8)
-m_saida = m.astype(np.uint8)
-y_saida = y.astype(np.uint8)
-
+if graficos_ativos():  # PDI_GRAFICOS=nenhum pula os plots (modo em lote)
+    plt = obter_pyplot()
+    plt.figure(figsize=(12, 5))
+    lado = lado_exibicao((12, 5), 1, 3)
+
+    plt.subplot(1, 3, 1)
+    plt.imshow(para_exibir(c, lado), cmap="gray")
+    plt.title("Canal C (Ciano)")
+    plt.axis("off")
+
+    plt.subplot(1, 3, 2)
+    plt.imshow(para_exibir(m, lado), cmap="gray")
+    plt.title("Canal M (Magenta)")
+    plt.axis("off")
+
+    plt.subplot(1, 3, 3)
+    plt.imshow(para_exibir(y, lado), cmap="gray")
+    plt.title("Canal Y (Amarelo)")
+    plt.axis("off")
+
+    plt.tight_layout()
+    finalizar_figuras(("CMY_lena",))
+
+# 8) Salvar canais (já são uint8: sem astype)
 caminho_c = os.path.join(pasta_saida, "canal_C.png")
 caminho_m = os.path.join(pasta_saida, "canal_M.png")
 caminho_y = os.path.join(pasta_saida, "canal_Y.png")
 
-cv2.imwrite(caminho_c, c_saida)
-cv2.imwrite(caminho_m, m_saida)
-cv2.imwrite(caminho_y, y_saida)
+cv2.imwrite(caminho_c, c)
+cv2.imwrite(caminho_m, m)
+cv2.imwrite(caminho_y, y)
 
 # 9) Confirmação
 print("d.2 concluído: canais CMY separados, plotados e salvos em 'resultados'.")
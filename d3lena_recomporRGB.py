@@ -1,7 +1,9 @@
 import os  # criar pastas e montar caminhos
 import cv2  # ler imagens e fazer conversões
-import numpy as np  # cálculos pixel a pixel
-import matplotlib.pyplot as plt  # plotar lado a lado
+from verificacao import comparar_com_canais  # comparação em faixas (sem cópias int16)
+from canais import rgb_para_exibir, juntar_canais  # RGB por view e junção sem cv2.merge
+from piramide import para_exibir, ler_para_exibir, lado_exibicao  # nível reduzido que cabe no subplot
+from graficos import graficos_ativos, obter_pyplot, finalizar_figuras  # gráficos (matplotlib só é importado se for plotar)
 
 
 # d.3) Comparar imagem original vs imagem recomposta
@@ -23,10 +25,7 @@ img_bgr_original = cv2.imread(caminho_original)  # OpenCV lê em BGR
 if img_bgr_original is None:
     raise FileNotFoundError(f"Não foi possível ler a imagem original: {caminho_original}")
 
-# 3) Converter original para RGB (para comparação e plot no matplotlib)
-img_rgb_original = cv2.cvtColor(img_bgr_original, cv2.COLOR_BGR2RGB)  # agora está em RGB
-
-# 4) Ler os canais salvos (em escala de cinza)
+# 3) Ler os canais salvos (em escala de cinza)
 caminho_r = os.path.join(pasta_canais, "canal_R.png")  # caminho do canal R
 caminho_g = os.path.join(pasta_canais, "canal_G.png")  # caminho do canal G
 caminho_b = os.path.join(pasta_canais, "canal_B.png")  # caminho do canal B
@@ -38,28 +37,19 @@ b = cv2.imread(caminho_b, cv2.IMREAD_GRAYSCALE)
 if r is None or g is None or b is None:
     raise FileNotFoundError("Não foi possível ler um ou mais canais em 'canaisRGB_lena'.")
 
-# 5) Recompôr a imagem RGB a partir dos canais
-img_rgb_recomposta = cv2.merge((r, g, b))  # junta em (R,G,B) -> imagem 3 canais
-
-# 6) Verificar se as dimensões batem
-if img_rgb_recomposta.shape != img_rgb_original.shape:
-    raise ValueError(
-        f"As dimensões não batem!\n"
-        f"Original: {img_rgb_original.shape}\n"
-        f"Recomposta: {img_rgb_recomposta.shape}"
-    )
+# 4) Recompôr a imagem a partir dos canais e comparar com a original
+# A comparação é feita em faixas de linhas (verificacao.py): cada faixa é recomposta,
+# comparada por hash e, só se diferir, por cv2.absdiff em uint8 (sem underflow e sem
+# cópias int16 da imagem inteira). Também checa se as dimensões batem.
+comparacao = comparar_com_canais(img_bgr_original, r, g, b, gerar_diferenca=True)
+diff_abs = comparacao["diff_abs"]  # diferença absoluta em 8-bit (ordem BGR, como o OpenCV salva)
 
-# 7) Calcular diferença pixel a pixel
-# Convertendo para int16 evita problema de underflow (ex: 0 - 255 em uint8 vira número grande).
-diff_int = img_rgb_original.astype(np.int16) - img_rgb_recomposta.astype(np.int16)  # diferença assinada
-diff_abs = np.abs(diff_int).astype(np.uint8)  # diferença absoluta em 8-bit
+# 5) Métricas para "provar" identidade
+max_diff = comparacao["max_diff"]                # maior diferença encontrada (0 se idêntico)
+sum_diff = comparacao["sum_diff"]                # soma de todas as diferenças (0 se idêntico)
+iguais = comparacao["iguais"]                    # True se idêntico pixel a pixel
 
-# 8) Métricas para "provar" identidade
-max_diff = int(np.max(diff_abs))                # maior diferença encontrada (0 se idêntico)
-sum_diff = int(np.sum(diff_abs))                # soma de todas as diferenças (0 se idêntico)
-iguais = np.array_equal(img_rgb_original, img_rgb_recomposta)  # True se idêntico pixel a pixel
-
-# 9) Imprimir relatório numérico
+# 6) Imprimir relatório numérico
 print("=== COMPARAÇÃO ORIGINAL vs RECOMPOSTA ===")
 print(f"Idênticas pixel a pixel? -> {iguais}")
 print(f"Maior diferença absoluta (max) -> {max_diff}")
@@ -67,33 +57,41 @@ print(f"Soma total das diferenças -> {sum_diff}")
 
 # Se não forem idênticas, mostrar quantos pixels diferem (em qualquer canal)
 # Um pixel é considerado diferente se pelo menos 1 canal (R ou G ou B) tiver diferença > 0
-pixels_diferentes = int(np.sum(np.any(diff_abs > 0, axis=2)))
+pixels_diferentes = comparacao["pixels_diferentes"]
 print(f"Número de pixels com alguma diferença -> {pixels_diferentes}")
 
-# 10) Plotar lado a lado (original, recomposta, diferença)
-plt.figure(figsize=(15, 6))
-
-plt.subplot(1, 3, 1)
-plt.imshow(img_rgb_original)
-plt.title("Original (RGB)")
-plt.axis("off")
-
-plt.subplot(1, 3, 2)
-plt.imshow(img_rgb_recomposta)
-plt.title("Recomposta (RGB)")
-plt.axis("off")
-
-plt.subplot(1, 3, 3)
-plt.imshow(diff_abs)  # mostra diferença por canal (RGB)
-plt.title("Diferença |Original - Recomposta|")
-plt.axis("off")
-
-plt.tight_layout()
-plt.show()
-
-# 11) Salvar a imagem de diferença
-# Para salvar com OpenCV, convertemos RGB -> BGR
+# 7) Plotar lado a lado (original, recomposta, diferença)
+if graficos_ativos():  # PDI_GRAFICOS=nenhum pula os plots (modo em lote)
+    plt = obter_pyplot()
+    lado = lado_exibicao((15, 6), 1, 3)  # pixels de cada subplot
+    img_rgb_original = rgb_para_exibir(para_exibir(img_bgr_original, lado))  # RGB para o matplotlib (view)
+    # prévias dos canais pelos .piramide.npz ao lado dos PNGs (reaproveitados enquanto em dia)
+    img_rgb_recomposta = juntar_canais([ler_para_exibir(caminho, lado, cv2.IMREAD_GRAYSCALE)
+                                        for caminho in (caminho_r, caminho_g, caminho_b)])  # junta em (R,G,B)
+    plt.figure(figsize=(15, 6))
+
+    plt.subplot(1, 3, 1)
+    plt.imshow(img_rgb_original)
+    plt.title("Original (RGB)")
+    plt.axis("off")
+
+    plt.subplot(1, 3, 2)
+    plt.imshow(img_rgb_recomposta)
+    plt.title("Recomposta (RGB)")
+    plt.axis("off")
+
+    plt.subplot(1, 3, 3)
+    # máximo de cada bloco: um único pixel diferente continua visível na prévia
+    plt.imshow(rgb_para_exibir(para_exibir(diff_abs, lado, reducao="maximo")))  # mostra diferença por canal (RGB)
+    plt.title("Diferença |Original - Recomposta|")
+    plt.axis("off")
+
+    plt.tight_layout()
+    finalizar_figuras(("comparar_lena_rgbs",))
+
+# 8) Salvar a imagem de diferença
+# diff_abs já está em BGR (ordem do OpenCV)
 caminho_diff = os.path.join(pasta_saida, "diferenca_original_vs_recomposta.png")
-cv2.imwrite(caminho_diff, cv2.cvtColor(diff_abs, cv2.COLOR_RGB2BGR))
+cv2.imwrite(caminho_diff, diff_abs)
 
 print(f"Imagem de diferença salva em: {caminho_diff}")
@@ -1,8 +1,12 @@
 import os  # pastas
 import cv2  # leitura e escrita
+from cache_raster import ler_imagem  # imread com cache da matriz decodificada (.npy + memmap)
 import numpy as np  # arrays
 import math  # acos, sqrt
-import matplotlib.pyplot as plt  # plot
+from georreferencia import ler_georreferencia, propagar_georreferencia  # world file + .aux.xml nas saídas
+from piramide import lado_exibicao  # tamanho do subplot (prévias do tamanho certo)
+from graficos import graficos_ativos, obter_pyplot, finalizar_figuras  # matplotlib só se for plotar
+from blocos import processar_em_blocos  # HSI bloco a bloco em memmap (memória limitada ao bloco)
 
 def bgr_para_hsi_pixel_a_pixel(img_bgr):
     bgr = img_bgr.astype(np.float32) / 255.0  # normaliza para [0,1]
@@ -56,57 +60,52 @@ caminho_imagem = "top_mosaic_09cm_area35.tif"  # entrada
 pasta_saida = "canaisHSI_area35"  # saída
 os.makedirs(pasta_saida, exist_ok=True)  # cria pasta
 
-img_bgr = cv2.imread(caminho_imagem, cv2.IMREAD_COLOR)  # lê imagem
+img_bgr = ler_imagem(caminho_imagem, cv2.IMREAD_COLOR)  # lê imagem
 if img_bgr is None:  # checa leitura
     raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho_imagem}")  # erro
 
-H, S, I = bgr_para_hsi_pixel_a_pixel(img_bgr)  # calcula HSI pixel a pixel
-
-# (opcional) tenta salvar HSI float em TIFF (se o OpenCV não suportar, pode dar warning/fallback)
-hsi_float = cv2.merge((H.astype(np.float32), S.astype(np.float32), I.astype(np.float32)))  # junta float
-cv2.imwrite(os.path.join(pasta_saida, "imagem_HSI_float.tiff"), hsi_float)  # salva (pode cair pra 8U dependendo do build)
-
-H_8bit = (H / 360.0 * 255.0).astype(np.uint8)  # H 0..360 -> 0..255
-S_8bit = (S * 255.0).astype(np.uint8)  # S 0..1 -> 0..255
-I_8bit = (I * 255.0).astype(np.uint8)  # I 0..1 -> 0..255
+# HSI vetorizado (mesmas fórmulas do pixel a pixel acima), bloco a bloco (blocos.py): a entrada
+# é o memmap do cache_raster; H, S, I float32 e 8-bit e a imagem 3 canais vão para memmaps.
+# Saídas:
+# - imagem_HSI_float.pdif: float32 sem perda (o TIFF do cv2.imwrite podia cair pra 8U
+#   dependendo do build), escrito bloco a bloco, com leitura por região;
+# - canal_H/S/I.png (H 0..360 -> 0..255, S e I 0..1 -> 0..255) e imagem_HSI_8bit.png
+#   (dados H,S,I em 8-bit, NÃO é "imagem colorida"); o codificador PNG percorre o canal inteiro.
+previas = {}  # modelo -> canal -> prévia
+processar_em_blocos(img_bgr, "area35", ("HSI",), gerar_pdif=("HSI_float",), manter_npy=False, compostas=("HSI",),
+                    previas=previas, lado_previa=lado_exibicao((12, 4), 1, 3))
 
 caminho_H = os.path.join(pasta_saida, "canal_H.png")  # saída H
 caminho_S = os.path.join(pasta_saida, "canal_S.png")  # saída S
 caminho_I = os.path.join(pasta_saida, "canal_I.png")  # saída I
 
-cv2.imwrite(caminho_H, H_8bit)  # salva H
-cv2.imwrite(caminho_S, S_8bit)  # salva S
-cv2.imwrite(caminho_I, I_8bit)  # salva I
-
-# junta em um PNG 3-canais (dados H,S,I em 8-bit, NÃO é “imagem colorida”)
-hsi_8bit = cv2.merge((H_8bit, S_8bit, I_8bit))  # merge
-cv2.imwrite(os.path.join(pasta_saida, "imagem_HSI_8bit.png"), hsi_8bit)  # salva
+propagar_georreferencia(ler_georreferencia(caminho_imagem),
+                        (caminho_H, caminho_S, caminho_I, os.path.join(pasta_saida, "imagem_HSI_8bit.png")))  # mesma geo do TIF
 
 print("d.4 concluído (area35): canais HSI salvos.")
 print(f"- {caminho_H}\n- {caminho_S}\n- {caminho_I}")
 
-# ler os arquivos salvos e plotar lado a lado (igual você pediu)
-H_lido = cv2.imread(caminho_H, cv2.IMREAD_GRAYSCALE)  # lê H salvo
-S_lido = cv2.imread(caminho_S, cv2.IMREAD_GRAYSCALE)  # lê S salvo
-I_lido = cv2.imread(caminho_I, cv2.IMREAD_GRAYSCALE)  # lê I salvo
-
-plt.figure(figsize=(12, 4))  # figura
-
-plt.subplot(1, 3, 1)  # H (colorido)
-plt.imshow(H, cmap="hsv", vmin=0.0, vmax=360.0)  # mapeia 0..360 no círculo HSV
-plt.title("Canal H")  # título
-plt.axis("off")  # sem eixo
-plt.colorbar(fraction=0.046, pad=0.04)  # barra de cores 
-
-plt.subplot(1, 3, 2)  # S
-plt.imshow(S_lido, cmap="gray")  # mostra S salvo
-plt.title("Canal S")  # título
-plt.axis("off")  # sem eixo
-
-plt.subplot(1, 3, 3)  # I
-plt.imshow(I_lido, cmap="gray")  # mostra I salvo
-plt.title("Canal I")  # título
-plt.axis("off")  # sem eixo
-
-plt.tight_layout()  # ajusta
-plt.show()  # exibe
\ No newline at end of file
+# plotar lado a lado (igual você pediu), a partir das prévias dos canais salvos
+if graficos_ativos():  # PDI_GRAFICOS=nenhum pula os plots
+    plt = obter_pyplot()  # importa o matplotlib só aqui
+    plt.figure(figsize=(12, 4))  # figura
+    H_graus = previas["HSI"]["H"] * np.float32(360.0 / 255.0)  # prévia do H (amostrada, sem média) em graus
+
+    plt.subplot(1, 3, 1)  # H (colorido)
+    plt.imshow(H_graus, cmap="hsv", vmin=0.0, vmax=360.0)  # mapeia 0..360 no círculo HSV
+    plt.title("Canal H")  # título
+    plt.axis("off")  # sem eixo
+    plt.colorbar(fraction=0.046, pad=0.04)  # barra de cores 
+
+    plt.subplot(1, 3, 2)  # S
+    plt.imshow(previas["HSI"]["S"], cmap="gray")  # mostra S
+    plt.title("Canal S")  # título
+    plt.axis("off")  # sem eixo
+
+    plt.subplot(1, 3, 3)  # I
+    plt.imshow(previas["HSI"]["I"], cmap="gray")  # mostra I
+    plt.title("Canal I")  # título
+    plt.axis("off")  # sem eixo
+
+    plt.tight_layout()  # ajusta
+    finalizar_figuras(("HSI_area35",))  # exibe (ou salva, em modo headless)
\ No newline at end of file
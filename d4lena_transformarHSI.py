@@ -2,7 +2,11 @@ import os
 import cv2
 import numpy as np
 import math
-import matplotlib.pyplot as plt
+from piramide import ler_para_exibir, lado_exibicao  # prévia pelo .piramide.npz (sem reduzir o PNG cheio)
+from graficos import graficos_ativos, obter_pyplot, finalizar_figuras
+from conversoes import bgr_para_hsi_vetorizado, hsi_para_8bit
+from canais import alocar_canais  # imagem de 3 canais com H, S, I como views (sem cv2.merge)
+from armazenamento import salvar_canais
 
 # PIXEL A PIXEL - RGB/BGR -> HSI
 #
@@ -98,20 +102,23 @@ if __name__ == "__main__":
     if img_bgr is None:
         raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho_imagem}")
 
-    # 3) Converter BGR -> HSI  (pixel a pixel) e salvar imagem hsi
-    H, S, I = bgr_para_hsi(img_bgr)
+    # 3) Converter BGR -> HSI e salvar imagem hsi
+    # (bgr_para_hsi acima é a versão didática pixel a pixel; aqui usamos a
+    # versão vetorizada de conversoes.py, com as mesmas fórmulas e tratamentos)
+    H, S, I = bgr_para_hsi_vetorizado(img_bgr)
     
-    hsi_img = cv2.merge((H, S, I))
+    # float32 sem perda, em blocos comprimidos (armazenamento.py); o cv2.imwrite em
+    # .tiff podia gravar em 8U dependendo do build do OpenCV
+    salvar_canais(os.path.join(pasta_saida, "imagem_HSI_float.pdif"), (H, S, I), ("H", "S", "I"),
+                  atributos={"H": "graus", "S": "0..1", "I": "0..1"})
 
-    cv2.imwrite("canaisHSI_lena/imagem_HSI.tiff", hsi_img)
-
-    # 4) Preparar para salvar em PNG (8-bit)
+    # 4) Preparar para salvar em PNG (8-bit), truncando como astype(np.uint8)
     # H: 0..360 -> 0..255
     # S: 0..1   -> 0..255
     # I: 0..1   -> 0..255
-    H_8bit = (H / 360.0 * 255.0).astype(np.uint8)
-    S_8bit = (S * 255.0).astype(np.uint8)
-    I_8bit = (I * 255.0).astype(np.uint8)
+    # Os canais 8-bit são views da imagem de 3 canais: escritos no lugar, sem cv2.merge depois
+    hsi_img, (H_8bit, S_8bit, I_8bit) = alocar_canais(H.shape[0], H.shape[1])
+    hsi_para_8bit(H, S, I, H_8bit, S_8bit, I_8bit)
 
     # 5) Salvar canais
     caminho_H = os.path.join(pasta_saida, "canal_H.png")
@@ -122,42 +129,42 @@ if __name__ == "__main__":
     cv2.imwrite(caminho_S, S_8bit)
     cv2.imwrite(caminho_I, I_8bit)
 
-    hsi_img = cv2.merge((H_8bit, S_8bit, I_8bit))
-
     cv2.imwrite("canaisHSI_lena/imagem_8bit_HSI.png", hsi_img)
 
     # 6) Relatório rápido
-    print("HSI (pixel a pixel) concluído e salvo.")
+    print("HSI (vetorizado) concluído e salvo.")
     print(f"- {caminho_H}")
     print(f"- {caminho_S}")
     print(f"- {caminho_I}")
 
-    # Ler imagens em escala de cinza
-    H = cv2.imread(caminho_H, cv2.IMREAD_GRAYSCALE)
-    S = cv2.imread(caminho_S, cv2.IMREAD_GRAYSCALE)
-    I = cv2.imread(caminho_I, cv2.IMREAD_GRAYSCALE)
-
-    if H is None or S is None or I is None:
-        raise FileNotFoundError("Não foi possível carregar um ou mais canais HSI.")
-
-    # Plotar lado a lado
-    plt.figure(figsize=(12,5))
-
-    plt.subplot(1, 3, 1)  # H (colorido)
-    plt.imshow(H, cmap="hsv", vmin=0.0, vmax=360.0)  # mapeia 0..360 no círculo HSV
-    plt.title("Canal H")  # título
-    plt.axis("off")  # sem eixo
-    plt.colorbar(fraction=0.046, pad=0.04)  # barra de cores
-
-    plt.subplot(1,3,2)
-    plt.imshow(S, cmap='gray')
-    plt.title("Canal S")
-    plt.axis("off")
-
-    plt.subplot(1,3,3)
-    plt.imshow(I, cmap='gray')
-    plt.title("Canal I")
-    plt.axis("off")
-
-    plt.tight_layout()
-    plt.show()
+    # Ler imagens em escala de cinza, já no nível que cabe no subplot: a pirâmide de cada
+    # canal (<canal>.piramide.npz, gravada pelo pipeline --piramides ou na primeira leitura)
+    # é reaproveitada enquanto estiver em dia, sem decodificar e reduzir o PNG de novo
+    if graficos_ativos():  # PDI_GRAFICOS=nenhum pula os plots (modo em lote)
+        plt = obter_pyplot()
+        lado = lado_exibicao((12, 5), 1, 3)
+        H = ler_para_exibir(caminho_H, lado, cv2.IMREAD_GRAYSCALE, reducao="amostragem")  # matiz não se soma
+        S = ler_para_exibir(caminho_S, lado, cv2.IMREAD_GRAYSCALE)
+        I = ler_para_exibir(caminho_I, lado, cv2.IMREAD_GRAYSCALE)
+
+        # Plotar lado a lado
+        plt.figure(figsize=(12,5))
+
+        plt.subplot(1, 3, 1)  # H (colorido)
+        plt.imshow(H, cmap="hsv", vmin=0.0, vmax=360.0)  # mapeia 0..360 no círculo HSV
+        plt.title("Canal H")  # título
+        plt.axis("off")  # sem eixo
+        plt.colorbar(fraction=0.046, pad=0.04)  # barra de cores
+
+        plt.subplot(1,3,2)
+        plt.imshow(S, cmap='gray')
+        plt.title("Canal S")
+        plt.axis("off")
+
+        plt.subplot(1,3,3)
+        plt.imshow(I, cmap='gray')
+        plt.title("Canal I")
+        plt.axis("off")
+
+        plt.tight_layout()
+        finalizar_figuras(("HSI_lena",))
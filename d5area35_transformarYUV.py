@@ -1,61 +1,56 @@
 import os  # pastas e caminhos
 import cv2  # ler e salvar
-import numpy as np  # contas
-import matplotlib.pyplot as plt  # plot
+from cache_raster import ler_imagem  # imread com cache da matriz decodificada (.npy + memmap)
+from blocos import processar_em_blocos  # YUV bloco a bloco em memmap (memória limitada ao bloco)
+from georreferencia import ler_georreferencia, propagar_georreferencia  # world file + .aux.xml nas saídas
+from piramide import lado_exibicao  # tamanho do subplot (prévias do tamanho certo)
+from graficos import graficos_ativos, obter_pyplot, finalizar_figuras  # matplotlib só se for plotar
 
 pasta_rgb = "canaisRGB_area35"  # origem dos canais RGB
 pasta_saida = "canaisYUV_area35"  # saída YUV
 os.makedirs(pasta_saida, exist_ok=True)  # cria pasta
 
-R = cv2.imread(os.path.join(pasta_rgb, "canal_R.png"), cv2.IMREAD_GRAYSCALE)  # lê R
-G = cv2.imread(os.path.join(pasta_rgb, "canal_G.png"), cv2.IMREAD_GRAYSCALE)  # lê G
-B = cv2.imread(os.path.join(pasta_rgb, "canal_B.png"), cv2.IMREAD_GRAYSCALE)  # lê B
+R = ler_imagem(os.path.join(pasta_rgb, "canal_R.png"), cv2.IMREAD_GRAYSCALE)  # lê R
+G = ler_imagem(os.path.join(pasta_rgb, "canal_G.png"), cv2.IMREAD_GRAYSCALE)  # lê G
+B = ler_imagem(os.path.join(pasta_rgb, "canal_B.png"), cv2.IMREAD_GRAYSCALE)  # lê B
 
 if R is None or G is None or B is None:  # checa leitura
     raise FileNotFoundError("Não foi possível carregar canal_R.png, canal_G.png ou canal_B.png em canaisRGB_area35.")  # erro
 
-R = R.astype(np.float32)  # float para não truncar
-G = G.astype(np.float32)  # float para não truncar
-B = B.astype(np.float32)  # float para não truncar
-
-# BT.601 (YUV)
-Y = 0.299 * R + 0.587 * G + 0.114 * B  # luminância
-U = -0.14713 * R - 0.28886 * G + 0.436 * B  # crominância azul (pode ser negativa)
-V = 0.615 * R - 0.51499 * G - 0.10001 * B  # crominância vermelha (pode ser negativa)
-
-U_digital = U + 128.0  # desloca para caber em 0..255
-V_digital = V + 128.0  # desloca para caber em 0..255
-
-Y_8bit = np.clip(Y, 0, 255).astype(np.uint8)  # Y em 8-bit
-U_8bit = np.clip(U_digital, 0, 255).astype(np.uint8)  # U em 8-bit
-V_8bit = np.clip(V_digital, 0, 255).astype(np.uint8)  # V em 8-bit
-
-# Montar a imagem YUV 3 canais (Y,U,V)
-imagem_yuv = cv2.merge((Y_8bit, U_8bit, V_8bit))  # merge YUV
-
-cv2.imwrite(os.path.join(pasta_saida, "canal_Y.png"), Y_8bit)  # salva canal Y
-cv2.imwrite(os.path.join(pasta_saida, "canal_U.png"), U_8bit)  # salva canal U
-cv2.imwrite(os.path.join(pasta_saida, "canal_V.png"), V_8bit)  # salva canal V
-cv2.imwrite(os.path.join(pasta_saida, "imagem_YUV.png"), imagem_yuv)  # salva imagem YUV (dados)
+# BT.601 (YUV), em float32 para não truncar (conversoes.bgr_para_yuv, bloco a bloco):
+# Y = 0.299 R + 0.587 G + 0.114 B              (luminância)
+# U = -0.14713 R - 0.28886 G + 0.436 B + 128   (crominância azul, deslocada para 0..255)
+# V = 0.615 R - 0.51499 G - 0.10001 B + 128    (crominância vermelha, deslocada para 0..255)
+# com clip em 0..255 e uint8. blocos.py monta cada bloco BGR a partir dos 3 planos (memmaps
+# do cache_raster), e Y, U, V e a imagem 3 canais vão para memmaps e depois para os PNGs
+# (o codificador PNG ainda percorre o canal inteiro), sem cv2.merge da imagem inteira.
+previas = {}  # modelo -> canal -> prévia
+processar_em_blocos((B, G, R), "area35", ("YUV",), manter_npy=False, compostas=("YUV",),
+                    previas=previas, lado_previa=lado_exibicao((12, 4), 1, 3))
+Y_8bit, U_8bit, V_8bit = (previas["YUV"][canal] for canal in "YUV")  # prévias dos canais
+propagar_georreferencia(ler_georreferencia(os.path.join(pasta_rgb, "canal_R.png")),  # geo que o d1 deixou no canal R
+                        [os.path.join(pasta_saida, f"{nome}.png") for nome in ("canal_Y", "canal_U", "canal_V", "imagem_YUV")])
 
 print("d.5 concluído (area35): canais YUV e imagem YUV 3-canais salvos em canaisYUV_area35.")
 
-plt.figure(figsize=(12, 4))  # figura
+if graficos_ativos():  # PDI_GRAFICOS=nenhum pula os plots
+    plt = obter_pyplot()  # importa o matplotlib só aqui
+    plt.figure(figsize=(12, 4))  # figura
 
-plt.subplot(1, 3, 1)  # Y
-plt.imshow(Y_8bit, cmap="gray")  # mostra Y
-plt.title("Y")  # título
-plt.axis("off")  # sem eixo
+    plt.subplot(1, 3, 1)  # Y
+    plt.imshow(Y_8bit, cmap="gray")  # mostra Y
+    plt.title("Y")  # título
+    plt.axis("off")  # sem eixo
 
-plt.subplot(1, 3, 2)  # U
-plt.imshow(U_8bit, cmap="gray")  # mostra U
-plt.title("U (+128)")  # título
-plt.axis("off")  # sem eixo
+    plt.subplot(1, 3, 2)  # U
+    plt.imshow(U_8bit, cmap="gray")  # mostra U
+    plt.title("U (+128)")  # título
+    plt.axis("off")  # sem eixo
 
-plt.subplot(1, 3, 3)  # V
-plt.imshow(V_8bit, cmap="gray")  # mostra V
-plt.title("V (+128)")  # título
-plt.axis("off")  # sem eixo
+    plt.subplot(1, 3, 3)  # V
+    plt.imshow(V_8bit, cmap="gray")  # mostra V
+    plt.title("V (+128)")  # título
+    plt.axis("off")  # sem eixo
 
-plt.tight_layout()  # ajusta
-plt.show()  # exibe
\ No newline at end of file
+    plt.tight_layout()  # ajusta
+    finalizar_figuras(("YUV_area35",))  # exibe (ou salva, em modo headless)
\ No newline at end of file
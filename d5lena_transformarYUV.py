@@ -1,7 +1,10 @@
 import os
 import cv2
-import numpy as np
-import matplotlib.pyplot as plt
+from cache_raster import ler_imagem
+from canais import alocar_canais
+from conversoes import canais_para_yuv
+from piramide import para_exibir, lado_exibicao  # nível reduzido que cabe no subplot
+from graficos import graficos_ativos, obter_pyplot, finalizar_figuras
 
 # d.5) RGB (canais separados) -> YUV (canais + imagem 3-canais)
 
@@ -10,35 +13,24 @@ pasta_saida = "canaisYUV_lena"
 os.makedirs(pasta_saida, exist_ok=True)
 
 # 1) Ler canais R, G, B salvos (1 canal cada)
-R = cv2.imread(os.path.join(pasta_rgb, "canal_R.png"), cv2.IMREAD_GRAYSCALE)
-G = cv2.imread(os.path.join(pasta_rgb, "canal_G.png"), cv2.IMREAD_GRAYSCALE)
-B = cv2.imread(os.path.join(pasta_rgb, "canal_B.png"), cv2.IMREAD_GRAYSCALE)
+R = ler_imagem(os.path.join(pasta_rgb, "canal_R.png"), cv2.IMREAD_GRAYSCALE)
+G = ler_imagem(os.path.join(pasta_rgb, "canal_G.png"), cv2.IMREAD_GRAYSCALE)
+B = ler_imagem(os.path.join(pasta_rgb, "canal_B.png"), cv2.IMREAD_GRAYSCALE)
 
 if R is None or G is None or B is None:
     raise FileNotFoundError("Não foi possível carregar canal_R.png, canal_G.png ou canal_B.png.")
 
-# 2) Converter para float para não truncar as contas
-R = R.astype(np.float32)
-G = G.astype(np.float32)
-B = B.astype(np.float32)
-
-# 3) Transformação RGB -> YUV (BT.601)
-Y = 0.299 * R + 0.587 * G + 0.114 * B
-U = -0.14713 * R - 0.28886 * G + 0.436 * B
-V = 0.615 * R - 0.51499 * G - 0.10001 * B
-
-# 4) Ajuste "digital" para salvar (U e V centrados em 128)
-U_digital = U + 128.0
-V_digital = V + 128.0
-
-# 5) Clip + uint8 para salvar como PNG (0..255)
-Y_8bit = np.clip(Y, 0, 255).astype(np.uint8)
-U_8bit = np.clip(U_digital, 0, 255).astype(np.uint8)
-V_8bit = np.clip(V_digital, 0, 255).astype(np.uint8)
-
-# 6) Montar a "imagem YUV" (3 canais)
-# Aqui está o que faltava: uma única matriz (H, W, 3) com (Y, U, V)
-imagem_yuv = cv2.merge((Y_8bit, U_8bit, V_8bit))
+# 2) a 6) Transformação RGB -> YUV (BT.601) direto na "imagem YUV" (3 canais)
+# Fórmulas (contas em float32 para não truncar, em conversoes.canais_para_yuv):
+#   Y = 0.299 R + 0.587 G + 0.114 B
+#   U = -0.14713 R - 0.28886 G + 0.436 B
+#   V = 0.615 R - 0.51499 G - 0.10001 B
+# Ajuste "digital" para salvar: U e V centrados em 128, clip + uint8 (0..255).
+# A matriz (H, W, 3) com (Y, U, V) é alocada antes e Y_8bit, U_8bit, V_8bit são views
+# dela: o cálculo escreve no lugar (em faixas de linhas), sem cópias float da imagem
+# inteira e sem cv2.merge no final.
+imagem_yuv, (Y_8bit, U_8bit, V_8bit) = alocar_canais(R.shape[0], R.shape[1])
+canais_para_yuv(R, G, B, Y_8bit, U_8bit, V_8bit)
 
 # 7) Salvar canais e a imagem YUV
 cv2.imwrite(os.path.join(pasta_saida, "canal_Y.png"), Y_8bit)
@@ -51,22 +43,25 @@ cv2.imwrite(os.path.join(pasta_saida, "imagem_YUV.png"), imagem_yuv)
 print("d.5 concluído: canais Y, U, V e imagem_YUV.png (3 canais) salvos em 'canaisYUV_lena'.")
 
 # 8) Plotar os canais (visualmente úteis)
-plt.figure(figsize=(12, 5))
-
-plt.subplot(1, 3, 1)
-plt.imshow(Y_8bit, cmap="gray")
-plt.title("Y")
-plt.axis("off")
-
-plt.subplot(1, 3, 2)
-plt.imshow(U_8bit, cmap="gray")
-plt.title("U (+ 128)")
-plt.axis("off")
-
-plt.subplot(1, 3, 3)
-plt.imshow(V_8bit, cmap="gray")
-plt.title("V (+ 128)")
-plt.axis("off")
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+if graficos_ativos():  # PDI_GRAFICOS=nenhum pula os plots (modo em lote)
+    plt = obter_pyplot()
+    plt.figure(figsize=(12, 5))
+    lado = lado_exibicao((12, 5), 1, 3)
+
+    plt.subplot(1, 3, 1)
+    plt.imshow(para_exibir(Y_8bit, lado), cmap="gray")
+    plt.title("Y")
+    plt.axis("off")
+
+    plt.subplot(1, 3, 2)
+    plt.imshow(para_exibir(U_8bit, lado), cmap="gray")
+    plt.title("U (+ 128)")
+    plt.axis("off")
+
+    plt.subplot(1, 3, 3)
+    plt.imshow(para_exibir(V_8bit, lado), cmap="gray")
+    plt.title("V (+ 128)")
+    plt.axis("off")
+
+    plt.tight_layout()
+    finalizar_figuras(("YUV_lena",))
\ No newline at end of file
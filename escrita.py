@@ -0,0 +1,165 @@
+import os  # pastas, caminhos e tamanhos
+import time  # tempo de cada arquivo
+import argparse  # linha de comando
+from concurrent.futures import ThreadPoolExecutor  # codificação em paralelo
+import cv2  # codificação
+
+# ESCRITA DAS SAÍDAS EM PARALELO, COM CODEC CONFIGURÁVEL
+#
+# Cada estágio grava de 3 a 5 PNGs um depois do outro, com o cv2.imwrite padrão. Na
+# area35 a codificação PNG é boa parte do tempo total. Aqui:
+# - os arquivos são codificados em um pool de threads (o cv2.imwrite libera o GIL,
+#   então as threads codificam de verdade em paralelo);
+# - o codec é escolhido por execução:
+#     png  -> nivel_png 0..9 (0 = sem compressão, rápido e grande; padrão do OpenCV: 1)
+#             e estrategia_png (padrao, filtrada, huffman, rle, fixa)
+#     webp -> WebP sem perdas
+#     tiff -> TIFF sem compressão (mais rápido, maior)
+#   Com formato diferente de png, a extensão .png dos caminhos é trocada pela do formato.
+# - cada arquivo gravado gera um registro (caminho, segundos, bytes) para o relatório,
+#   para comparar espaço em disco x velocidade.
+#
+# Conteúdo que não é imagem (CSV, .pdif, .yuv) é passado como função que grava o
+# arquivo (mesma convenção do pipeline) e também roda no pool.
+
+FORMATOS_ESCRITA = {"png": ".png", "webp": ".webp", "tiff": ".tiff"}
+
+ESTRATEGIAS_PNG = {
+    "padrao": cv2.IMWRITE_PNG_STRATEGY_DEFAULT,
+    "filtrada": cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+    "huffman": cv2.IMWRITE_PNG_STRATEGY_HUFFMAN_ONLY,
+    "rle": cv2.IMWRITE_PNG_STRATEGY_RLE,
+    "fixa": cv2.IMWRITE_PNG_STRATEGY_FIXED,
+}
+
+OPCOES_CODEC = ("formato", "nivel_png", "estrategia_png")  # opções que mudam os arquivos gravados
+
+
+def parametros_codec(formato="png", nivel_png=None, estrategia_png=None):
+    # Lista de parâmetros do cv2.imwrite para o formato escolhido
+    if formato not in FORMATOS_ESCRITA:
+        raise ValueError(f"Formato desconhecido: {formato} (opções: {', '.join(FORMATOS_ESCRITA)})")
+    if formato == "png":
+        parametros = []
+        if nivel_png is not None:
+            if not 0 <= nivel_png <= 9:
+                raise ValueError(f"nivel_png deve estar entre 0 e 9 (recebido {nivel_png})")
+            parametros += [cv2.IMWRITE_PNG_COMPRESSION, int(nivel_png)]
+        if estrategia_png is not None:
+            if estrategia_png not in ESTRATEGIAS_PNG:
+                raise ValueError(f"Estratégia PNG desconhecida: {estrategia_png} (opções: {', '.join(ESTRATEGIAS_PNG)})")
+            parametros += [cv2.IMWRITE_PNG_STRATEGY, ESTRATEGIAS_PNG[estrategia_png]]
+        return parametros
+    if formato == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, 101]  # qualidade > 100 = sem perdas
+    return [cv2.IMWRITE_TIFF_COMPRESSION, 1]  # 1 = sem compressão
+
+
+def opcoes_codec(escrita):
+    # Só as opções que mudam o conteúdo dos arquivos (para chaves de cache)
+    return {k: v for k, v in (escrita or {}).items() if k in OPCOES_CODEC and v is not None}
+
+
+def trocar_extensao(caminho, formato):
+    base, extensao = os.path.splitext(caminho)
+    if extensao.lower() == ".png" and formato != "png":
+        return base + FORMATOS_ESCRITA[formato]
+    return caminho
+
+
+class EscritorParalelo:
+    def __init__(self, trabalhadores=None, formato="png", nivel_png=None, estrategia_png=None):
+        self.trabalhadores = trabalhadores or min(4, os.cpu_count() or 1)
+        self.formato = formato
+        self.parametros = parametros_codec(formato, nivel_png, estrategia_png)
+        self.registros = []  # (caminho, segundos, bytes), na ordem em que foram pedidos
+        self._pendentes = []
+        self._pool = None
+
+    def __enter__(self):
+        if self.trabalhadores > 1:
+            self._pool = ThreadPoolExecutor(max_workers=self.trabalhadores)
+        return self
+
+    def __exit__(self, *erro):
+        try:
+            if erro[0] is None:
+                self.aguardar()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def _gravar(self, caminho, conteudo):
+        inicio = time.perf_counter()
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        if callable(conteudo):
+            conteudo(caminho)
+        elif not cv2.imwrite(caminho, conteudo, self.parametros):
+            raise IOError(f"Não foi possível salvar: {caminho}")
+        return caminho, time.perf_counter() - inicio, os.path.getsize(caminho)
+
+    def gravar(self, caminho, conteudo):
+        # conteudo: array para o cv2.imwrite ou função que grava o arquivo. Retorna o caminho final.
+        if not callable(conteudo):
+            caminho = trocar_extensao(caminho, self.formato)
+        if self._pool is None:  # 1 trabalhador: grava na hora
+            self.registros.append(self._gravar(caminho, conteudo))
+        else:
+            self._pendentes.append(self._pool.submit(self._gravar, caminho, conteudo))
+        return caminho
+
+    def aguardar(self):
+        # Espera todos os arquivos pedidos; o primeiro erro é relançado
+        pendentes, self._pendentes = self._pendentes, []
+        for futuro in pendentes:
+            self.registros.append(futuro.result())
+        return self.registros
+
+
+def relatorio_escrita(registros, segundos_total=None):
+    linhas = [f"{'arquivo':<60} {'ms':>9} {'KB':>10}"]
+    for caminho, segundos, tamanho in registros:
+        linhas.append(f"{caminho:<60} {segundos * 1000:>9.1f} {tamanho / 1024:>10.1f}")
+    soma_tempo = sum(r[1] for r in registros)
+    soma_bytes = sum(r[2] for r in registros)
+    linhas.append(f"{'total (' + str(len(registros)) + ' arquivos)':<60} {soma_tempo * 1000:>9.1f} {soma_bytes / 1024:>10.1f}")
+    if segundos_total is not None:
+        linhas.append(f"tempo de parede da escrita: {segundos_total * 1000:.1f} ms")
+    return "\n".join(linhas)
+
+
+if __name__ == "__main__":
+    from conversoes import bgr_para_cmy, bgr_para_hsi_vetorizado, hsi_para_8bit, bgr_para_yuv
+
+    parser = argparse.ArgumentParser(description="Compara codecs/níveis na gravação dos canais de uma imagem.")
+    parser.add_argument("imagem", nargs="?", default="lena-Color.png", help="imagem de entrada")
+    parser.add_argument("--saida", default="resultados/escrita", help="pasta dos arquivos de teste")
+    parser.add_argument("--trabalhadores", type=int, default=None, help="threads de escrita")
+    args = parser.parse_args()
+
+    img_bgr = cv2.imread(args.imagem, cv2.IMREAD_COLOR)
+    if img_bgr is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {args.imagem}")
+    canais = {"R": img_bgr[:, :, 2], "G": img_bgr[:, :, 1], "B": img_bgr[:, :, 0]}
+    canais.update(zip("CMY", bgr_para_cmy(img_bgr)))
+    canais.update(zip(("H", "S", "I"), hsi_para_8bit(*bgr_para_hsi_vetorizado(img_bgr))))
+    canais.update(zip(("Yl", "U", "V"), bgr_para_yuv(img_bgr)))
+
+    configuracoes = [
+        ("png padrão, serial", 1, {"formato": "png"}),
+        ("png padrão", args.trabalhadores, {"formato": "png"}),
+        ("png nível 0", args.trabalhadores, {"formato": "png", "nivel_png": 0}),
+        ("png nível 9", args.trabalhadores, {"formato": "png", "nivel_png": 9}),
+        ("png rle", args.trabalhadores, {"formato": "png", "estrategia_png": "rle"}),
+        ("webp sem perdas", args.trabalhadores, {"formato": "webp"}),
+        ("tiff sem compressão", args.trabalhadores, {"formato": "tiff"}),
+    ]
+    for titulo, trabalhadores, opcoes in configuracoes:
+        inicio = time.perf_counter()
+        with EscritorParalelo(trabalhadores, **opcoes) as escritor:
+            for nome, canal in canais.items():
+                escritor.gravar(os.path.join(args.saida, f"canal_{nome}.png"), canal)
+        total = time.perf_counter() - inicio
+        soma_bytes = sum(r[2] for r in escritor.registros)
+        print(f"{titulo:<22} {escritor.trabalhadores} thread(s): {total * 1000:8.1f} ms, {soma_bytes / 1024:8.1f} KB")
@@ -0,0 +1,242 @@
+import os  # caminhos e extensões
+import struct  # tags do TIFF
+import argparse  # linha de comando
+import xml.etree.ElementTree as ET  # .aux.xml (PAM do GDAL)
+
+# GEORREFERÊNCIA DO GEOTIFF PROPAGADA PARA AS SAÍDAS
+#
+# O area35 é um GeoTIFF (com o .aux.xml do GDAL ao lado), mas os canais saem em PNG
+# sem nada de geo, e quem abre no SIG precisa registrar cada canal de novo. Aqui:
+# - as tags GeoTIFF são lidas direto do cabeçalho do TIFF com struct (TIFF clássico e
+#   BigTIFF, II/MM), sem GDAL e sem ler pixels: ModelPixelScale + ModelTiepoint ou
+#   ModelTransformation, e o GeoKeyDirectory (EPSG e PixelIsPoint);
+# - o .aux.xml de origem (SRS/GeoTransform do PAM) tem prioridade, como no GDAL, e um
+#   world file da origem (.tfw) serve de último recurso;
+# - cada raster de saída ganha, ao lado, um world file (.pgw para .png, .tfw para .tif,
+#   etc.) e um .aux.xml com SRS e GeoTransform. Os pixels não são relidos nem
+#   regravados: são dois arquivos de texto por saída, e GDAL/QGIS/servidores de
+#   tiles abrem o PNG já no lugar certo.
+# Saídas com outro tamanho (ex.: níveis reduzidos) usam ajustar_tamanho, que mantém
+# a extensão no terreno e muda o tamanho do pixel.
+#
+# Ex.: python georreferencia.py top_mosaic_09cm_area35.tif
+#      python georreferencia.py top_mosaic_09cm_area35.tif --propagar canaisRGB_area35/*.png
+
+TAG_LARGURA = 256
+TAG_ALTURA = 257
+TAG_ESCALA = 33550  # ModelPixelScaleTag
+TAG_PONTOS = 33922  # ModelTiepointTag
+TAG_TRANSFORMACAO = 34264  # ModelTransformationTag
+TAG_GEOCHAVES = 34735  # GeoKeyDirectoryTag
+TAG_GEODOUBLES = 34736  # GeoDoubleParamsTag
+TAG_GEOASCII = 34737  # GeoAsciiParamsTag
+TAGS_GEO = (TAG_LARGURA, TAG_ALTURA, TAG_ESCALA, TAG_PONTOS, TAG_TRANSFORMACAO, TAG_GEOCHAVES,
+            TAG_GEODOUBLES, TAG_GEOASCII)
+
+CHAVE_TIPO_RASTER = 1025  # GTRasterTypeGeoKey (1 = PixelIsArea, 2 = PixelIsPoint)
+CHAVE_EPSG_GEOGRAFICO = 2048  # GeographicTypeGeoKey
+CHAVE_EPSG_PROJETADO = 3072  # ProjectedCSTypeGeoKey
+
+# tipo TIFF -> (formato struct, bytes)
+TIPOS_TIFF = {
+    1: ("B", 1), 2: ("c", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8), 6: ("b", 1), 7: ("B", 1),
+    8: ("h", 2), 9: ("i", 4), 10: ("ii", 8), 11: ("f", 4), 12: ("d", 8), 16: ("Q", 8), 17: ("q", 8), 18: ("Q", 8),
+}
+
+EXTENSOES_RASTER = (".png", ".tif", ".tiff", ".webp", ".jpg", ".jpeg", ".bmp")
+
+
+def ler_tags_tiff(caminho, tags=TAGS_GEO):
+    # {tag: tupla de valores} do primeiro IFD (só as tags pedidas)
+    with open(caminho, "rb") as f:
+        cabecalho = f.read(16)
+        if cabecalho[:2] not in (b"II", b"MM"):
+            raise ValueError(f"Não é um TIFF: {caminho}")
+        ordem = "<" if cabecalho[:2] == b"II" else ">"
+        versao = struct.unpack(ordem + "H", cabecalho[2:4])[0]
+        if versao == 42:  # TIFF clássico
+            grande = False
+            inicio_ifd = struct.unpack(ordem + "I", cabecalho[4:8])[0]
+        elif versao == 43:  # BigTIFF
+            grande = True
+            inicio_ifd = struct.unpack(ordem + "Q", cabecalho[8:16])[0]
+        else:
+            raise ValueError(f"Versão de TIFF desconhecida ({versao}): {caminho}")
+
+        f.seek(inicio_ifd)
+        if grande:
+            n_entradas = struct.unpack(ordem + "Q", f.read(8))[0]
+            formato_entrada, tamanho_entrada, tamanho_valor = ordem + "HHQ8s", 20, 8
+        else:
+            n_entradas = struct.unpack(ordem + "H", f.read(2))[0]
+            formato_entrada, tamanho_entrada, tamanho_valor = ordem + "HHI4s", 12, 4
+        entradas = f.read(n_entradas * tamanho_entrada)
+
+        valores = {}
+        for k in range(n_entradas):
+            tag, tipo, contagem, bruto = struct.unpack_from(formato_entrada, entradas, k * tamanho_entrada)
+            if tag not in tags or tipo not in TIPOS_TIFF:
+                continue
+            codigo, tamanho = TIPOS_TIFF[tipo]
+            total = contagem * tamanho
+            if total > tamanho_valor:  # não coube na entrada: o campo é um deslocamento
+                f.seek(struct.unpack(ordem + ("Q" if grande else "I"), bruto)[0])
+                bruto = f.read(total)
+            if tipo == 2:
+                valores[tag] = (bruto[:total].split(b"\0")[0].decode("latin-1"),)
+                continue
+            dados = struct.unpack(ordem + codigo[0] * (contagem * len(codigo)), bruto[:total])
+            if tipo in (5, 10):  # racionais: numerador / denominador
+                dados = tuple(n / d if d else 0.0 for n, d in zip(dados[::2], dados[1::2]))
+            valores[tag] = dados
+    return valores
+
+
+def _geochaves(tags):
+    # {chave: valor} do GeoKeyDirectory (valores inline, em GeoDoubleParams ou GeoAsciiParams)
+    diretorio = tags.get(TAG_GEOCHAVES)
+    if not diretorio:
+        return {}
+    chaves = {}
+    for k in range(diretorio[3]):
+        chave, local, contagem, valor = diretorio[4 + 4 * k:8 + 4 * k]
+        if local == 0:
+            chaves[chave] = valor
+        elif local == TAG_GEODOUBLES and TAG_GEODOUBLES in tags:
+            chaves[chave] = tags[TAG_GEODOUBLES][valor:valor + contagem]
+        elif local == TAG_GEOASCII and TAG_GEOASCII in tags:
+            chaves[chave] = tags[TAG_GEOASCII][0][valor:valor + contagem].rstrip("|")
+    return chaves
+
+
+def georreferencia_tiff(caminho):
+    # {"geotransform", "srs", "largura", "altura"} das tags GeoTIFF, ou None
+    tags = ler_tags_tiff(caminho)
+    if TAG_TRANSFORMACAO in tags:
+        m = tags[TAG_TRANSFORMACAO]
+        geotransform = [m[3], m[0], m[1], m[7], m[4], m[5]]
+    elif TAG_PONTOS in tags and TAG_ESCALA in tags:
+        i, j, _, x, y, _ = tags[TAG_PONTOS][:6]
+        sx, sy = tags[TAG_ESCALA][:2]
+        geotransform = [x - i * sx, sx, 0.0, y + j * sy, 0.0, -sy]
+    else:
+        return None
+
+    chaves = _geochaves(tags)
+    if chaves.get(CHAVE_TIPO_RASTER) == 2:  # PixelIsPoint: o ponto é o centro do pixel (o GDAL desloca meio pixel)
+        geotransform[0] -= 0.5 * (geotransform[1] + geotransform[2])
+        geotransform[3] -= 0.5 * (geotransform[4] + geotransform[5])
+    epsg = chaves.get(CHAVE_EPSG_PROJETADO) or chaves.get(CHAVE_EPSG_GEOGRAFICO)
+    return {
+        "geotransform": tuple(geotransform),
+        "srs": f"EPSG:{epsg}" if epsg and epsg != 32767 else None,  # 32767 = definido pelo usuário
+        "largura": tags.get(TAG_LARGURA, (None,))[0],
+        "altura": tags.get(TAG_ALTURA, (None,))[0],
+    }
+
+
+def georreferencia_pam(caminho_aux):
+    # SRS e GeoTransform de um .aux.xml (ou None se ele não tiver GeoTransform)
+    if not os.path.isfile(caminho_aux):
+        return None
+    raiz = ET.parse(caminho_aux).getroot()
+    transformacao = raiz.findtext("GeoTransform")
+    if not transformacao:
+        return None
+    return {"geotransform": tuple(float(v) for v in transformacao.split(",")),
+            "srs": (raiz.findtext("SRS") or "").strip() or None}
+
+
+def _extensao_world_file(caminho):
+    # .png -> .pgw, .tif -> .tfw, .jpeg -> .jgw (primeira e última letras + "w")
+    extensao = os.path.splitext(caminho)[1].lstrip(".").lower()
+    return f".{extensao[0]}{extensao[-1]}w" if extensao else ".wld"
+
+
+def georreferencia_world_file(caminho):
+    for extensao in (_extensao_world_file(caminho), ".wld"):
+        caminho_wf = os.path.splitext(caminho)[0] + extensao
+        if os.path.isfile(caminho_wf):
+            with open(caminho_wf, "r", encoding="utf-8") as f:
+                a, d, b, e, c, f_ = (float(v) for v in f.read().split()[:6])
+            # o world file aponta o centro do pixel (0, 0); o geotransform, o canto
+            return {"geotransform": (c - 0.5 * a - 0.5 * b, a, b, f_ - 0.5 * d - 0.5 * e, d, e), "srs": None}
+    return None
+
+
+def ler_georreferencia(caminho):
+    # Prioridade como no GDAL: .aux.xml (PAM), tags do GeoTIFF, world file
+    geo = georreferencia_pam(caminho + ".aux.xml")
+    interna = None
+    if os.path.splitext(caminho)[1].lower() in (".tif", ".tiff"):
+        try:
+            interna = georreferencia_tiff(caminho)
+        except (OSError, ValueError, struct.error):
+            interna = None
+    geo = geo or interna or georreferencia_world_file(caminho)
+    if geo is None:
+        return None
+    geo = dict(geo)
+    if interna is not None:
+        geo["srs"] = geo.get("srs") or interna["srs"]
+        geo.setdefault("largura", interna["largura"])
+        geo.setdefault("altura", interna["altura"])
+    return geo
+
+
+def ajustar_tamanho(geo, altura, largura):
+    # Mesma extensão no terreno para uma saída de outro tamanho (pixel maior/menor)
+    if not geo.get("largura") or not geo.get("altura") or (geo["largura"], geo["altura"]) == (largura, altura):
+        return geo
+    fx, fy = geo["largura"] / largura, geo["altura"] / altura
+    x0, a, b, y0, d, e = geo["geotransform"]
+    return dict(geo, geotransform=(x0, a * fx, b * fy, y0, d * fx, e * fy), largura=largura, altura=altura)
+
+
+def gravar_world_file(caminho_raster, geo):
+    x0, a, b, y0, d, e = geo["geotransform"]
+    caminho_wf = os.path.splitext(caminho_raster)[0] + _extensao_world_file(caminho_raster)
+    linhas = (a, d, b, e, x0 + 0.5 * a + 0.5 * b, y0 + 0.5 * d + 0.5 * e)  # centro do pixel (0, 0)
+    with open(caminho_wf, "w", encoding="utf-8") as f:
+        f.write("\n".join(f"{v:.12f}" for v in linhas) + "\n")
+    return caminho_wf
+
+
+def gravar_aux_xml(caminho_raster, geo):
+    raiz = ET.Element("PAMDataset")
+    if geo.get("srs"):
+        ET.SubElement(raiz, "SRS").text = geo["srs"]
+    ET.SubElement(raiz, "GeoTransform").text = ", ".join(f"{v:.16g}" for v in geo["geotransform"])
+    caminho_aux = caminho_raster + ".aux.xml"
+    ET.ElementTree(raiz).write(caminho_aux, encoding="utf-8")
+    return caminho_aux
+
+
+def propagar_georreferencia(geo, caminhos, tamanho=None):
+    # World file + .aux.xml ao lado de cada raster de caminhos (os outros são ignorados).
+    # tamanho: (altura, largura) das saídas, se for diferente da origem. Retorna os arquivos gravados.
+    if geo is None:
+        return []
+    if tamanho is not None:
+        geo = ajustar_tamanho(geo, *tamanho)
+    gravados = []
+    for caminho in caminhos:
+        if os.path.splitext(caminho)[1].lower() in EXTENSOES_RASTER:
+            gravados += [gravar_world_file(caminho, geo), gravar_aux_xml(caminho, geo)]
+    return gravados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lê a georreferência de um GeoTIFF e a propaga para outras saídas.")
+    parser.add_argument("imagem", help="GeoTIFF de origem (ou raster com .aux.xml / world file)")
+    parser.add_argument("--propagar", nargs="*", default=[], help="rasters que recebem world file + .aux.xml")
+    args = parser.parse_args()
+
+    geo = ler_georreferencia(args.imagem)
+    if geo is None:
+        print(f"{args.imagem}: sem georreferência (nem tags GeoTIFF, nem .aux.xml com GeoTransform, nem world file)")
+    else:
+        x0, a, b, y0, d, e = geo["geotransform"]
+        print(f"{args.imagem}: origem ({x0:.3f}, {y0:.3f}), pixel {a:.6g} x {e:.6g}, SRS {geo.get('srs') or '-'}")
+        for caminho in propagar_georreferencia(geo, args.propagar):
+            print(f"- {caminho}")
@@ -0,0 +1,64 @@
+import os  # variáveis de ambiente e pastas
+from instrumentacao import obter_instrumentacao
+
+# GRÁFICOS SOB DEMANDA (modo "headless" para rodar em lote)
+#
+# O matplotlib só é importado quando alguma figura vai ser desenhada. O modo é
+# escolhido pela variável de ambiente PDI_GRAFICOS:
+#   janela  -> comportamento original: plt.show() abre as janelas (padrão)
+#   arquivo -> backend Agg (sem janela), cada figura é salva em PNG na pasta
+#              PDI_PASTA_FIGURAS (padrão: resultados) com o nome passado pelo script
+#   nenhum  -> não importa o matplotlib nem desenha nada (mais rápido em lote)
+#
+# Ex.: PDI_GRAFICOS=nenhum python d1lena_separar_em_RGB.py
+
+MODOS_GRAFICOS = ("janela", "arquivo", "nenhum")
+
+_pyplot = None  # matplotlib.pyplot, importado na primeira vez que for pedido
+
+
+def modo_graficos():
+    modo = os.environ.get("PDI_GRAFICOS", "janela").strip().lower()
+    if modo not in MODOS_GRAFICOS:
+        raise ValueError(f"PDI_GRAFICOS inválido: {modo} (opções: {', '.join(MODOS_GRAFICOS)})")
+    return modo
+
+
+def graficos_ativos():
+    return modo_graficos() != "nenhum"
+
+
+def obter_pyplot():
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib  # import tardio: só quem desenha paga o custo
+        if modo_graficos() == "arquivo":
+            matplotlib.use("Agg")  # sem janela, só renderiza para arquivo
+        import matplotlib.pyplot as plt
+        _pyplot = plt
+    return _pyplot
+
+
+def finalizar_figuras(nomes):
+    # Substitui o plt.show() do final de cada bloco de plot.
+    # nomes: um nome de arquivo (sem extensão) por figura aberta, na ordem de criação.
+    if _pyplot is None:  # nada foi desenhado
+        return []
+    with obter_instrumentacao().etapa("graficos"):
+        return _finalizar(_pyplot, nomes)
+
+
+def _finalizar(plt, nomes):
+    if modo_graficos() == "janela":
+        plt.show()
+        return []
+
+    pasta = os.environ.get("PDI_PASTA_FIGURAS", "resultados")
+    os.makedirs(pasta, exist_ok=True)
+    salvos = []
+    for numero, nome in zip(plt.get_fignums(), nomes):
+        caminho = os.path.join(pasta, f"{nome}.png")
+        plt.figure(numero).savefig(caminho, dpi=100)
+        salvos.append(caminho)
+    plt.close("all")  # libera a memória das figuras
+    return salvos
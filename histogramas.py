@@ -0,0 +1,169 @@
+import csv  # exportação
+import argparse  # linha de comando
+import cv2  # calcHist
+import numpy as np  # contagens
+from conversoes import bgr_para_hsi_vetorizado, hsi_para_8bit, bgr_para_yuv
+
+# HISTOGRAMAS DE 256 NÍVEIS PARA TODOS OS MODELOS DE COR
+#
+# O d1 fazia plt.hist(r.flatten(), bins=256, ...) por canal: cada chamada copia o
+# canal inteiro e usa o agrupamento genérico do matplotlib. Aqui:
+# - cv2.calcHist conta direto na imagem intercalada (BGR), canal por canal, sem
+#   flatten nem cópia dos canais;
+# - a imagem é percorrida em faixas de linhas (também serve para blocos de
+#   blocos.py); as contagens de cada faixa são somadas em int64, então o total
+#   continua exato mesmo acima de 2^24 pixels (calcHist devolve float32);
+# - CMY não precisa ser calculado: C = 255 - R, então hist_C[k] = hist_R[255 - k];
+# - HSI e YUV são convertidos faixa a faixa (8-bit, iguais aos PNGs) e contados na hora;
+# - o mesmo acumulador pode receber várias imagens (soma tudo).
+# Plotar é opcional (plotar_histograma usa as contagens prontas).
+
+MODELOS_HISTOGRAMA = {
+    # modelo: nomes dos canais (ordem das linhas da matriz de contagens)
+    "RGB": ("R", "G", "B"),
+    "CMY": ("C", "M", "Y"),
+    "HSI": ("H", "S", "I"),
+    "YUV": ("Y", "U", "V"),
+}
+
+PIXELS_POR_FAIXA = 1 << 22  # ~4M pixels por faixa (contagem float32 do calcHist continua exata)
+
+
+def histograma_canais(img, canais=None):
+    # Contagens de 256 níveis por canal de uma imagem uint8 (2D ou intercalada),
+    # na ordem dos canais da imagem. Retorna int64 (n_canais, 256).
+    if img.dtype != np.uint8:
+        raise ValueError(f"Histograma de 256 níveis precisa de uint8 (recebido {img.dtype})")
+    if img.ndim == 2:
+        img = img[:, :, np.newaxis]
+    if canais is None:
+        canais = range(img.shape[2])
+
+    contagens = np.zeros((len(canais), 256), dtype=np.int64)
+    linhas_por_faixa = max(1, PIXELS_POR_FAIXA // max(1, img.shape[1]))
+    for y0 in range(0, img.shape[0], linhas_por_faixa):
+        faixa = img[y0:y0 + linhas_por_faixa]
+        if not faixa.flags.c_contiguous:  # calcHist exige linhas contíguas
+            faixa = np.ascontiguousarray(faixa)
+        for i, c in enumerate(canais):
+            contagens[i] += cv2.calcHist([faixa], [c], None, [256], [0, 256]).reshape(-1).astype(np.int64)
+    return contagens
+
+
+class AcumuladorHistogramas:
+    def __init__(self, modelos=("RGB", "CMY", "HSI", "YUV")):
+        for modelo in modelos:
+            if modelo not in MODELOS_HISTOGRAMA:
+                raise ValueError(f"Modelo desconhecido: {modelo} (opções: {', '.join(MODELOS_HISTOGRAMA)})")
+        self.modelos = tuple(modelos)
+        self.contagens = {modelo: np.zeros((3, 256), dtype=np.int64) for modelo in self.modelos}
+        self.pixels = 0  # total de pixels acumulados
+        self.imagens = 0  # imagens (ou blocos) acumulados
+
+    def adicionar(self, img_bgr):
+        # Uma passada na imagem (ou bloco) BGR 8-bit, em faixas de linhas
+        altura, largura = img_bgr.shape[:2]
+        linhas_por_faixa = max(1, PIXELS_POR_FAIXA // max(1, largura))
+        precisa_rgb = "RGB" in self.modelos or "CMY" in self.modelos
+
+        for y0 in range(0, altura, linhas_por_faixa):
+            faixa = img_bgr[y0:y0 + linhas_por_faixa]
+            if precisa_rgb:
+                bgr = histograma_canais(faixa)
+                rgb = bgr[::-1]  # B,G,R -> R,G,B
+                if "RGB" in self.modelos:
+                    self.contagens["RGB"] += rgb
+                if "CMY" in self.modelos:
+                    self.contagens["CMY"] += rgb[:, ::-1]  # nível k de C = nível 255-k de R
+            if "HSI" in self.modelos:
+                H, S, I = bgr_para_hsi_vetorizado(faixa)
+                hsi = np.dstack(hsi_para_8bit(H, S, I))
+                self.contagens["HSI"] += histograma_canais(hsi)
+            if "YUV" in self.modelos:
+                self.contagens["YUV"] += histograma_canais(np.dstack(bgr_para_yuv(faixa)))
+
+        self.pixels += altura * largura
+        self.imagens += 1
+        return self
+
+    def adicionar_canais(self, modelo, canais):
+        # Para quem já tem os canais 8-bit calculados (ex.: pipeline): só conta
+        if modelo not in self.contagens:
+            raise ValueError(f"Modelo não acumulado: {modelo}")
+        for i, canal in enumerate(canais):
+            self.contagens[modelo][i] += histograma_canais(canal)[0]
+        return self
+
+    def somar(self, outro):
+        # Junta dois acumuladores (ex.: resultados de processos diferentes)
+        for modelo, contagens in outro.contagens.items():
+            if modelo in self.contagens:
+                self.contagens[modelo] += contagens
+        self.pixels += outro.pixels
+        self.imagens += outro.imagens
+        return self
+
+    def como_tabela(self):
+        # Colunas: nivel, R, G, B, C, M, ... (uma linha por nível digital)
+        cabecalho = ["nivel"]
+        colunas = []
+        for modelo in self.modelos:
+            for i, canal in enumerate(MODELOS_HISTOGRAMA[modelo]):
+                cabecalho.append(f"{modelo}_{canal}")
+                colunas.append(self.contagens[modelo][i])
+        linhas = [[nivel] + [int(c[nivel]) for c in colunas] for nivel in range(256)]
+        return cabecalho, linhas
+
+    def exportar_csv(self, caminho):
+        cabecalho, linhas = self.como_tabela()
+        with open(caminho, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(cabecalho)
+            escritor.writerows(linhas)
+        return caminho
+
+    def exportar_npz(self, caminho):
+        np.savez(caminho, pixels=self.pixels, imagens=self.imagens, **self.contagens)
+        return caminho
+
+
+CORES_CANAIS = {
+    "RGB": ("red", "green", "blue"),
+    "CMY": ("cyan", "magenta", "gold"),
+    "HSI": ("purple", "orange", "gray"),
+    "YUV": ("black", "blue", "red"),
+}
+
+
+def plotar_histograma(contagens, modelo, titulo=None):
+    # Desenha as contagens prontas (mesmo visual do plt.hist do d1)
+    from graficos import obter_pyplot  # matplotlib só se for plotar
+    plt = obter_pyplot()
+
+    bordas = np.linspace(0, 255, 257)  # 256 níveis no intervalo 0..255, como range=(0, 255)
+    plt.figure(figsize=(8, 5))
+    for i, (canal, cor) in enumerate(zip(MODELOS_HISTOGRAMA[modelo], CORES_CANAIS[modelo])):
+        plt.stairs(contagens[i], bordas, fill=True, color=cor, alpha=0.5, label=f"Canal {canal}")
+    plt.title(titulo or f"Histograma dos Canais {modelo}")
+    plt.xlabel("Nível Digital (0–255)")
+    plt.ylabel("Frequência")
+    plt.legend()
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Histogramas de 256 níveis (RGB, CMY, HSI, YUV) de uma ou mais imagens.")
+    parser.add_argument("imagens", nargs="+", help="imagens de entrada (as contagens são somadas)")
+    parser.add_argument("--modelos", default="RGB,CMY,HSI,YUV", help="modelos separados por vírgula")
+    parser.add_argument("--csv", default="resultados/histogramas.csv", help="arquivo CSV de saída")
+    args = parser.parse_args()
+
+    acumulador = AcumuladorHistogramas(tuple(args.modelos.upper().split(",")))
+    for caminho in args.imagens:
+        img_bgr = cv2.imread(caminho, cv2.IMREAD_COLOR)
+        if img_bgr is None:
+            raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho}")
+        acumulador.adicionar(img_bgr)
+
+    print(f"Histogramas de {acumulador.imagens} imagem(ns), {acumulador.pixels} pixels: {acumulador.exportar_csv(args.csv)}")
@@ -0,0 +1,234 @@
+import os  # variáveis de ambiente e /proc
+import atexit  # relatório automático no fim do processo
+import io  # texto do cProfile
+import sys  # plataforma (unidade do ru_maxrss)
+import json  # relatório
+import time  # parede e CPU
+import argparse  # linha de comando
+
+try:
+    import resource  # pico de RSS (Unix); no Windows fica sem essa medida
+except ImportError:
+    resource = None
+
+# INSTRUMENTAÇÃO DAS ETAPAS (tempo, CPU, bytes, memória) COM RELATÓRIO POR EXECUÇÃO
+#
+# Quando uma execução na area35 fica lenta, é preciso saber se o tempo foi na leitura,
+# na conversão, na montagem, na escrita dos PNGs ou nos gráficos. Cada etapa é
+# envolvida por:
+#     with obter_instrumentacao().etapa("HSI") as etapa:
+#         ...
+#         etapa.escritos += n  # (opcional) bytes que a etapa sabe que gravou/leu
+# e registra:
+#   parede_s     -> tempo de relógio (perf_counter)
+#   cpu_s        -> tempo de CPU do processo (process_time; soma as threads)
+#   lidos/escritos -> bytes de E/S do processo no período (/proc/self/io, Linux) ou,
+#                   sem /proc, o que a etapa informou
+#   pico_rss_mb  -> pico de memória residente do processo até o fim da etapa (resource)
+#
+# Desligada (padrão), etapa() devolve sempre o mesmo objeto que não faz nada: o custo
+# é uma chamada de função. Liga com PDI_INSTRUMENTAR=1 (ou --instrumentar no pipeline).
+# Com PDI_PERFILAR=<etapa> (ou --perfilar), aquela etapa roda dentro do cProfile: o
+# .prof vai ao lado do relatório e as funções mais caras entram no texto.
+#
+# O relatório sai em JSON (uma entrada por ocorrência + totais por etapa) e em texto.
+# Com PDI_RELATORIO=<arquivo.json>, ele é gravado sozinho quando o processo termina
+# (assim os scripts d1..d5, que leem por cache_raster e plotam por graficos, também
+# geram relatório sem mudar nada neles).
+
+PASTA_RELATORIOS = "resultados"
+
+
+class _EtapaInativa:
+    # Objeto único usado quando a instrumentação está desligada
+    lidos = 0
+    escritos = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        return False
+
+    def __setattr__(self, nome, valor):
+        pass  # etapa.escritos += n não muda nada
+
+
+_INATIVA = _EtapaInativa()
+
+
+def _io_do_processo():
+    # (bytes lidos, bytes escritos) acumulados pelo processo, se o SO informar
+    try:
+        with open("/proc/self/io", "r") as f:
+            campos = dict(linha.split(":") for linha in f.read().splitlines() if ":" in linha)
+        return int(campos["rchar"]), int(campos["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def pico_rss_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2 ** 20 if sys.platform == "darwin" else pico / 1024  # macOS: bytes, Linux: KB
+
+
+class _Etapa:
+    def __init__(self, instrumentacao, nome):
+        self._instrumentacao = instrumentacao
+        self.nome = nome
+        self.lidos = 0
+        self.escritos = 0
+        self._perfil = None
+
+    def __enter__(self):
+        self._io = _io_do_processo()
+        if self._instrumentacao.perfilar == self.nome:
+            import cProfile  # só se alguma etapa for perfilada
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        self._cpu = time.process_time()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *erro):
+        parede = time.perf_counter() - self._inicio
+        cpu = time.process_time() - self._cpu
+        if self._perfil is not None:
+            self._perfil.disable()
+        io_fim = _io_do_processo()
+        if self._io is not None and io_fim is not None:
+            self.lidos = max(self.lidos, io_fim[0] - self._io[0])
+            self.escritos = max(self.escritos, io_fim[1] - self._io[1])
+        self._instrumentacao._registrar({
+            "etapa": self.nome,
+            "inicio_s": self._inicio - self._instrumentacao.inicio,
+            "parede_s": parede,
+            "cpu_s": cpu,
+            "lidos": self.lidos,
+            "escritos": self.escritos,
+            "pico_rss_mb": pico_rss_mb(),
+            "erro": erro[0].__name__ if erro[0] is not None else None,
+        }, self._perfil)
+        return False
+
+
+class Instrumentacao:
+    def __init__(self, ativo=None, perfilar=None):
+        if ativo is None:
+            ativo = os.environ.get("PDI_INSTRUMENTAR", "0").strip().lower() in ("1", "sim", "true")
+        self.ativo = ativo
+        self.perfilar = perfilar if perfilar is not None else os.environ.get("PDI_PERFILAR") or None
+        self.inicio = time.perf_counter()
+        self.registros = []
+        self.perfis = {}  # etapa -> pstats.Stats acumulado
+
+    def etapa(self, nome):
+        if not self.ativo:
+            return _INATIVA
+        return _Etapa(self, nome)
+
+    def _registrar(self, registro, perfil):
+        self.registros.append(registro)
+        if perfil is not None:
+            import pstats
+            if registro["etapa"] in self.perfis:
+                self.perfis[registro["etapa"]].add(perfil)
+            else:
+                self.perfis[registro["etapa"]] = pstats.Stats(perfil)
+
+    def totais(self):
+        # Soma por etapa, na ordem da primeira ocorrência
+        totais = {}
+        for r in self.registros:
+            t = totais.setdefault(r["etapa"], {"chamadas": 0, "parede_s": 0.0, "cpu_s": 0.0, "lidos": 0,
+                                               "escritos": 0, "pico_rss_mb": None})
+            t["chamadas"] += 1
+            t["parede_s"] += r["parede_s"]
+            t["cpu_s"] += r["cpu_s"]
+            t["lidos"] += r["lidos"]
+            t["escritos"] += r["escritos"]
+            if r["pico_rss_mb"] is not None:
+                t["pico_rss_mb"] = max(t["pico_rss_mb"] or 0.0, r["pico_rss_mb"])
+        return totais
+
+    def relatorio(self):
+        return {
+            "total_s": time.perf_counter() - self.inicio,
+            "pico_rss_mb": pico_rss_mb(),
+            "perfilada": self.perfilar,
+            "totais": self.totais(),
+            "etapas": self.registros,
+        }
+
+    def texto_perfil(self, etapa, linhas=20):
+        if etapa not in self.perfis:
+            return ""
+        saida = io.StringIO()
+        self.perfis[etapa].stream = saida
+        self.perfis[etapa].sort_stats("cumulative").print_stats(linhas)
+        return saida.getvalue()
+
+    def resumo_texto(self, relatorio=None):
+        # relatorio: um relatório já gravado (padrão: o desta execução)
+        relatorio = relatorio or self.relatorio()
+        total = relatorio["total_s"]
+        linhas = [f"{'etapa':<16} {'n':>4} {'parede ms':>11} {'%':>6} {'CPU ms':>10} {'lidos MB':>10} "
+                  f"{'escritos MB':>12} {'pico RSS MB':>12}"]
+        for nome, t in relatorio["totais"].items():
+            pico = f"{t['pico_rss_mb']:12.1f}" if t["pico_rss_mb"] is not None else f"{'-':>12}"
+            linhas.append(f"{nome:<16} {t['chamadas']:>4} {t['parede_s'] * 1000:>11.1f} "
+                          f"{t['parede_s'] / total if total else 0:>6.1%} {t['cpu_s'] * 1000:>10.1f} "
+                          f"{t['lidos'] / 2 ** 20:>10.2f} {t['escritos'] / 2 ** 20:>12.2f} {pico}")
+        pico = relatorio["pico_rss_mb"]
+        linhas.append(f"total {total * 1000:.1f} ms" + (f", pico RSS {pico:.1f} MB" if pico is not None else ""))
+        if self.perfilar in self.perfis:
+            linhas.append(f"\n--- cProfile da etapa {self.perfilar} ---")
+            linhas.append(self.texto_perfil(self.perfilar))
+        return "\n".join(linhas)
+
+    def salvar(self, caminho_json):
+        # JSON + resumo em texto (.txt) + perfil (.prof) da etapa perfilada, se houver
+        os.makedirs(os.path.dirname(caminho_json) or ".", exist_ok=True)
+        with open(caminho_json, "w", encoding="utf-8") as f:
+            json.dump(self.relatorio(), f, indent=2)
+        base = os.path.splitext(caminho_json)[0]
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(self.resumo_texto() + "\n")
+        salvos = [caminho_json, base + ".txt"]
+        for etapa, estatisticas in self.perfis.items():
+            caminho_perfil = f"{base}.{etapa}.prof"
+            estatisticas.dump_stats(caminho_perfil)
+            salvos.append(caminho_perfil)
+        return salvos
+
+
+_instrumentacao = None
+
+
+def obter_instrumentacao():
+    # Instância do processo (criada na primeira chamada, lendo as variáveis de ambiente)
+    global _instrumentacao
+    if _instrumentacao is None:
+        _instrumentacao = Instrumentacao()
+        if _instrumentacao.ativo and os.environ.get("PDI_RELATORIO"):
+            atexit.register(_instrumentacao.salvar, os.environ["PDI_RELATORIO"])
+    return _instrumentacao
+
+
+def configurar_instrumentacao(ativo=True, perfilar=None):
+    # Troca a instância do processo (ex.: a partir de opções de linha de comando)
+    global _instrumentacao
+    _instrumentacao = Instrumentacao(ativo, perfilar)
+    return _instrumentacao
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mostra o resumo de um relatório de instrumentação (JSON).")
+    parser.add_argument("relatorio", help="arquivo JSON gravado por Instrumentacao.salvar")
+    args = parser.parse_args()
+
+    with open(args.relatorio, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+    print(Instrumentacao(ativo=False).resumo_texto(dados))
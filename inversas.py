@@ -0,0 +1,253 @@
+import os  # pastas e caminhos
+import argparse  # linha de comando
+import numpy as np  # operações vetorizadas
+from conversoes import MATRIZ_YUV
+from blocos import iterar_blocos
+from lut import registrar_modelo_lut, converter_canais_com_lut
+
+# TRANSFORMADAS INVERSAS: HSI -> RGB e YUV -> RGB
+#
+# d4 e d5 só vão "para frente". Aqui estão as voltas, vetorizadas (sem laço por pixel):
+#
+# HSI -> RGB (fórmulas por setor, H em graus, S e I em [0,1]):
+#   setor RG (0 <= H < 120):   B = I(1-S)   R = I[1 + S cos(H)/cos(60-H)]   G = 3I - (R+B)
+#   setor GB (120 <= H < 240): H -= 120, R = I(1-S)   G = I[1 + S cos(H)/cos(60-H)]   B = 3I - (R+G)
+#   setor BR (240 <= H < 360): H -= 240, G = I(1-S)   B = I[1 + S cos(H)/cos(60-H)]   R = 3I - (G+B)
+# Os três setores usam as mesmas 3 expressões (x = I(1-S), y = ..., z = 3I - x - y);
+# só muda qual delas vai para R, G e B. Por isso x, y, z são calculados uma vez para
+# a matriz inteira e distribuídos com np.choose pelo número do setor.
+#
+# YUV -> RGB: inversa da matriz BT.601 de conversoes.MATRIZ_YUV (calculada com
+# np.linalg.inv, então volta exatamente pelo mesmo caminho da ida):
+#   R = Y + 1.13983 V      G = Y - 0.39465 U - 0.58060 V      B = Y + 2.03211 U
+#
+# Entradas:
+# - float: H em graus, S e I em [0,1] (bgr_para_hsi_vetorizado); Y em 0..255 e U, V
+#   com sinal (bgr_para_yuv_float);
+# - 8-bit: os canais salvos em PNG pelos scripts (H_8bit = H/360*255, S*255, I*255;
+#   Y, U+128, V+128). A ida trunca, então cada nível k representa o intervalo
+#   [k, k+1): por padrão a volta usa o centro do intervalo (k + 0.5), o que reduz o
+#   erro médio à metade do que usar k.
+#
+# Saída: R, G, B float32 em 0..255 (sem clip, para quem vai editar) ou BGR uint8
+# (arredondado e com clip, pronto para cv2.imwrite). Os buffers de saída podem ser
+# passados pelo chamador (ex.: recorte de uma imagem maior), então cada bloco é
+# convertido direto no lugar, com temporários só do tamanho do bloco.
+#
+# Caminho com tabela (LUT): para entradas 8-bit a volta também é uma função pura da
+# tripla (H8,S8,I8) ou (Y8,U8,V8), então usa a mesma LUT 256^3 de lut.py (~48 MB em
+# uint8, BGR por linha), calculada uma vez com estas mesmas funções.
+
+_MATRIZ_RGB = np.linalg.inv(MATRIZ_YUV).astype(np.float32)  # linhas R, G, B; colunas Y, U, V
+
+
+def _desquantizar(canal, escala, deslocamento=0.0, centro_do_nivel=True, maximo=None):
+    # uint8 -> float32 na escala da entrada float (nível k -> (k + 0.5) * escala)
+    saida = canal.astype(np.float32)
+    if centro_do_nivel:
+        saida += np.float32(0.5)
+    if deslocamento:
+        saida -= np.float32(deslocamento)
+    saida *= np.float32(escala)
+    if maximo is not None:
+        np.minimum(saida, np.float32(maximo), out=saida)  # nível 255 não passa do topo
+    return saida
+
+
+def hsi_para_rgb(H, S, I, R=None, G=None, B=None, centro_do_nivel=True):
+    # Retorna R, G, B float32 em 0..255 (pode sair um pouco de 0..255 fora do gamut)
+    if H.dtype == np.uint8:  # canais 8-bit dos PNGs
+        H = _desquantizar(H, 360.0 / 255.0, centro_do_nivel=centro_do_nivel)
+        S = _desquantizar(S, 1.0 / 255.0, centro_do_nivel=centro_do_nivel, maximo=1.0)
+        I = _desquantizar(I, 1.0 / 255.0, centro_do_nivel=centro_do_nivel, maximo=1.0)
+
+    if R is None:
+        R = np.empty(H.shape, dtype=np.float32)
+    if G is None:
+        G = np.empty(H.shape, dtype=np.float32)
+    if B is None:
+        B = np.empty(H.shape, dtype=np.float32)
+
+    # 1) Setor (0, 1, 2) e ângulo dentro do setor, em radianos
+    h = np.mod(H, np.float32(360.0), dtype=np.float32)
+    setor = np.minimum(h // np.float32(120.0), 2).astype(np.intp)
+    h -= np.float32(120.0) * setor
+    np.radians(h, out=h)
+
+    # 2) As três expressões comuns aos setores, já na escala 0..255
+    i = np.multiply(I, np.float32(255.0), dtype=np.float32)
+    x = np.subtract(np.float32(1.0), S, dtype=np.float32)
+    x *= i  # I(1-S)
+    y = np.cos(h)
+    h -= np.float32(np.pi / 3.0)
+    np.cos(h, out=h)  # cos(60° - H) = cos(H - 60°), sempre >= 0.5 dentro do setor
+    y /= h
+    y *= S
+    y += np.float32(1.0)
+    y *= i  # I[1 + S cos(H)/cos(60-H)]
+    z = np.multiply(i, np.float32(3.0), out=i)
+    z -= x
+    z -= y  # 3I - (x + y)
+
+    # 3) Distribui x, y, z conforme o setor (RG: R=y G=z B=x | GB: R=x G=y B=z | BR: R=z G=x B=y)
+    np.choose(setor, (y, x, z), out=R)
+    np.choose(setor, (z, y, x), out=G)
+    np.choose(setor, (x, z, y), out=B)
+    return R, G, B
+
+
+def yuv_para_rgb(Y, U, V, R=None, G=None, B=None, centro_do_nivel=True):
+    # Retorna R, G, B float32 em 0..255 (sem clip)
+    if Y.dtype == np.uint8:  # canais 8-bit dos PNGs (U e V com +128)
+        Y = _desquantizar(Y, 1.0, centro_do_nivel=centro_do_nivel)
+        U = _desquantizar(U, 1.0, 128.0, centro_do_nivel=centro_do_nivel)
+        V = _desquantizar(V, 1.0, 128.0, centro_do_nivel=centro_do_nivel)
+
+    saidas = []
+    for canal, linha in zip((R, G, B), _MATRIZ_RGB):
+        if canal is None:
+            canal = np.empty(Y.shape, dtype=np.float32)
+        np.multiply(Y, linha[0], out=canal)
+        canal += linha[1] * U
+        canal += linha[2] * V
+        saidas.append(canal)
+    return tuple(saidas)
+
+
+def rgb_para_8bit(R, G, B, R_8bit=None, G_8bit=None, B_8bit=None):
+    # float 0..255 -> uint8 arredondado e com clip (a ida d1 não tem nada a truncar)
+    saidas = []
+    for canal, destino in zip((R, G, B), (R_8bit, G_8bit, B_8bit)):
+        if destino is None:
+            destino = np.empty(canal.shape, dtype=np.uint8)
+        temporario = np.rint(canal)
+        np.clip(temporario, 0, 255, out=temporario)
+        destino[...] = temporario
+        saidas.append(destino)
+    return tuple(saidas)
+
+
+def _para_bgr(rgb, saida):
+    # R, G, B float -> imagem BGR uint8 (h, w, 3), escrita no buffer do chamador
+    R, G, B = rgb
+    if saida is None:
+        saida = np.empty(R.shape + (3,), dtype=np.uint8)
+    rgb_para_8bit(R, G, B, saida[:, :, 2], saida[:, :, 1], saida[:, :, 0])
+    return saida
+
+
+def hsi_para_bgr(H, S, I, saida=None, centro_do_nivel=True):
+    return _para_bgr(hsi_para_rgb(H, S, I, centro_do_nivel=centro_do_nivel), saida)
+
+
+def yuv_para_bgr(Y, U, V, saida=None, centro_do_nivel=True):
+    return _para_bgr(yuv_para_rgb(Y, U, V, centro_do_nivel=centro_do_nivel), saida)
+
+
+# Tabelas 256^3 das voltas 8-bit. Como em lut.py, a "imagem" de construção tem o
+# byte alto do índice no canal 2 e o baixo no canal 0; cada linha guarda B, G, R.
+
+
+def _tabela_hsi(img, B, G, R):
+    rgb_para_8bit(*hsi_para_rgb(img[:, :, 2], img[:, :, 1], img[:, :, 0]), R, G, B)
+    return B, G, R
+
+
+def _tabela_yuv(img, B, G, R):
+    rgb_para_8bit(*yuv_para_rgb(img[:, :, 2], img[:, :, 1], img[:, :, 0]), R, G, B)
+    return B, G, R
+
+
+registrar_modelo_lut("hsi8_inv", _tabela_hsi, np.uint8)
+registrar_modelo_lut("yuv8_inv", _tabela_yuv, np.uint8)
+
+INVERSAS = {
+    # modelo: (conversão direta para BGR, tabela das entradas 8-bit)
+    "HSI": (hsi_para_bgr, "hsi8_inv"),
+    "YUV": (yuv_para_bgr, "yuv8_inv"),
+}
+
+
+def inversa_para_bgr(modelo, canais, saida=None, tamanho_bloco=1024, usar_lut=False):
+    # Converte (H,S,I) ou (Y,U,V) para BGR uint8 bloco a bloco, escrevendo direto em saida.
+    # usar_lut só vale para canais 8-bit.
+    if modelo not in INVERSAS:
+        raise ValueError(f"Modelo sem inversa: {modelo} (opções: {', '.join(INVERSAS)})")
+    funcao, tabela = INVERSAS[modelo]
+    a, b, c = canais
+    if not (a.shape == b.shape == c.shape):
+        raise ValueError(f"Canais com dimensões diferentes: {a.shape}, {b.shape}, {c.shape}")
+    if usar_lut and a.dtype != np.uint8:
+        raise ValueError(f"LUT só vale para canais 8-bit (recebido {a.dtype})")
+
+    altura, largura = a.shape
+    if saida is None:
+        saida = np.empty((altura, largura, 3), dtype=np.uint8)
+
+    for bloco in iterar_blocos(altura, largura, tamanho_bloco):
+        regiao = (bloco.linhas, bloco.colunas)
+        if usar_lut:
+            saida[regiao] = converter_canais_com_lut(a[regiao], b[regiao], c[regiao], tabela)
+        else:
+            funcao(a[regiao], b[regiao], c[regiao], saida[regiao])
+    return saida
+
+
+def ida_e_volta(img_bgr, modelo, quantizado=True, tamanho_bloco=1024, usar_lut=False, gerar_diferenca=False):
+    # RGB -> modelo -> RGB e a comparação com a original no formato do d3
+    from conversoes import bgr_para_hsi_vetorizado, hsi_para_8bit, bgr_para_yuv, bgr_para_yuv_float
+    from verificacao import comparar_imagens
+
+    if modelo == "HSI":
+        canais = bgr_para_hsi_vetorizado(img_bgr)
+        if quantizado:
+            canais = hsi_para_8bit(*canais)
+    elif modelo == "YUV":
+        canais = bgr_para_yuv(img_bgr) if quantizado else bgr_para_yuv_float(img_bgr)
+    else:
+        raise ValueError(f"Modelo sem inversa: {modelo} (opções: {', '.join(INVERSAS)})")
+
+    recomposta = inversa_para_bgr(modelo, canais, None, tamanho_bloco, usar_lut and quantizado)
+    comparacao = comparar_imagens(img_bgr, recomposta, gerar_diferenca=gerar_diferenca)
+    comparacao["erro_medio"] = comparacao["sum_diff"] / img_bgr.size  # por canal e por pixel
+    comparacao["recomposta"] = recomposta
+    return comparacao
+
+
+if __name__ == "__main__":
+    import time  # tempo de cada volta
+    import cv2  # leitura e escrita
+
+    parser = argparse.ArgumentParser(description="Ida e volta RGB -> HSI/YUV -> RGB (float e 8-bit) com relatório de erro.")
+    parser.add_argument("imagem", nargs="?", default="lena-Color.png", help="imagem de entrada")
+    parser.add_argument("--modelos", default="HSI,YUV", help="modelos separados por vírgula")
+    parser.add_argument("--bloco", type=int, default=1024, help="tamanho do bloco da volta (pixels)")
+    parser.add_argument("--lut", action="store_true", help="volta 8-bit pela tabela 256^3")
+    parser.add_argument("--salvar-diferenca", action="store_true", help="salva |original - volta| em resultados/")
+    args = parser.parse_args()
+
+    img_bgr = cv2.imread(args.imagem)
+    if img_bgr is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {args.imagem}")
+    nome = os.path.splitext(os.path.basename(args.imagem))[0]
+
+    for modelo in args.modelos.upper().split(","):
+        for quantizado in (False, True):
+            forma = "8-bit (PNG)" if quantizado else "float"
+            inicio = time.perf_counter()
+            comparacao = ida_e_volta(img_bgr, modelo, quantizado, args.bloco, args.lut, args.salvar_diferenca)
+            segundos = time.perf_counter() - inicio
+
+            print(f"=== IDA E VOLTA RGB -> {modelo} {forma} -> RGB ({segundos:.2f} s) ===")
+            print(f"Idênticas pixel a pixel? -> {comparacao['iguais']}")
+            print(f"Maior diferença absoluta (max) -> {comparacao['max_diff']}")
+            print(f"Soma total das diferenças -> {comparacao['sum_diff']}")
+            print(f"Erro médio absoluto por canal -> {comparacao['erro_medio']:.4f}")
+            print(f"Número de pixels com alguma diferença -> {comparacao['pixels_diferentes']}")
+
+            if args.salvar_diferenca:
+                os.makedirs("resultados", exist_ok=True)
+                sufixo = "8bit" if quantizado else "float"
+                caminho = os.path.join("resultados", f"{nome}_diferenca_ida_e_volta_{modelo}_{sufixo}.png")
+                cv2.imwrite(caminho, comparacao["diff_abs"])
+                print(f"Imagem de diferença salva em: {caminho}")
@@ -0,0 +1,146 @@
+import os  # caminhos
+import sys  # código de saída
+import glob  # padrões de arquivos
+import time  # tempo por imagem
+import argparse  # linha de comando
+from concurrent.futures import ThreadPoolExecutor  # leitura antecipada em segundo plano
+import cv2  # decodificação
+from escrita import FORMATOS_ESCRITA, ESTRATEGIAS_PNG
+from georreferencia import ler_georreferencia
+from pipeline import ARTEFATOS, ARTEFATOS_PADRAO, ESTAGIOS, executar_pipeline, nome_da_imagem, ativar_lut
+
+# MODO EM LOTE: muitas imagens em um único processo
+#
+# Em vez de um script por imagem (com caminho fixo e o custo de iniciar o Python,
+# importar cv2/numpy etc. a cada vez), recebe uma pasta e/ou padrões glob e roda o
+# pipeline em todas as imagens no mesmo processo. Enquanto uma imagem é processada,
+# a próxima já está sendo decodificada em uma thread (o cv2.imread libera o GIL).
+#
+# As saídas de cada imagem seguem os nomes dos scripts: <saida>/canais<Modelo>_<nome>/...
+#
+# Ex.: python lote.py imagens/ "mosaicos/*.tif" --artefatos RGB,HSI --saida lote_saida
+
+EXTENSOES = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp")
+
+
+def listar_entradas(entradas):
+    # Pastas viram a lista das imagens dentro delas; o resto é tratado como glob
+    caminhos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            caminhos += sorted(
+                os.path.join(entrada, nome) for nome in os.listdir(entrada)
+                if nome.lower().endswith(EXTENSOES)
+            )
+        else:
+            encontrados = sorted(glob.glob(entrada))
+            caminhos += encontrados if encontrados else [entrada]  # deixa o erro aparecer na leitura
+    vistos = set()
+    return [c for c in caminhos if not (c in vistos or vistos.add(c))]  # sem repetidos, mantém a ordem
+
+
+def nomes_unicos(caminhos):
+    # Nome da pasta de cada imagem; se dois arquivos derem o mesmo nome, acrescenta _2, _3...
+    nomes = []
+    usados = {}
+    for caminho in caminhos:
+        nome = nome_da_imagem(caminho)
+        usados[nome] = usados.get(nome, 0) + 1
+        nomes.append(nome if usados[nome] == 1 else f"{nome}_{usados[nome]}")
+    return nomes
+
+
+def _ler(caminho):
+    return cv2.imread(caminho, cv2.IMREAD_COLOR)
+
+
+def processar_lote(caminhos, artefatos=ARTEFATOS_PADRAO, estagios=ESTAGIOS, pasta_base=".",
+                   parar_no_erro=False, ao_terminar=None, escrita=None, parametros=None):
+    # ao_terminar(caminho, nome, dados_ou_erro, segundos) é chamado após cada imagem
+    # parametros: {estágio: {argumento: valor}} do pipeline, iguais para todas as imagens
+    resultados = []
+    nomes = nomes_unicos(caminhos)
+
+    with ThreadPoolExecutor(max_workers=1) as leitor:
+        proxima = leitor.submit(_ler, caminhos[0]) if caminhos else None
+        for i, (caminho, nome) in enumerate(zip(caminhos, nomes)):
+            inicio = time.perf_counter()
+            atual = proxima
+            proxima = leitor.submit(_ler, caminhos[i + 1]) if i + 1 < len(caminhos) else None
+            img_bgr = None
+
+            try:
+                img_bgr = atual.result()  # espera a leitura desta imagem (normalmente já terminou)
+                if img_bgr is None:
+                    raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho}")
+                dados = executar_pipeline(img_bgr, nome, artefatos, estagios, pasta_base, parametros=parametros,
+                                          escrita=escrita, georreferencia=ler_georreferencia(caminho))
+                dados = {k: v for k, v in dados.items() if k in ("gravados", "recomposicao", "histograma")}  # solta os arrays
+                if "recomposicao" in dados:
+                    dados["recomposicao"] = {k: v for k, v in dados["recomposicao"].items() if k != "diff_abs"}
+                erro = None
+            except Exception as exc:  # uma imagem ruim não derruba o lote
+                if parar_no_erro:
+                    raise
+                dados, erro = None, exc
+            del img_bgr
+
+            segundos = time.perf_counter() - inicio
+            resultados.append((caminho, nome, dados if erro is None else erro, segundos))
+            if ao_terminar:
+                ao_terminar(caminho, nome, dados if erro is None else erro, segundos)
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline d1..d5 em lote (uma pasta ou padrões glob, um processo).")
+    parser.add_argument("entradas", nargs="+", help="pastas e/ou padrões glob (ex.: imagens/ \"*.tif\")")
+    parser.add_argument("--artefatos", default=",".join(ARTEFATOS_PADRAO),
+                        help=f"artefatos a gravar, separados por vírgula ({', '.join(ARTEFATOS)})")
+    parser.add_argument("--estagios", default=",".join(ESTAGIOS), help="estágios a executar")
+    parser.add_argument("--saida", default=".", help="pasta base das saídas (canais<Modelo>_<nome> por imagem)")
+    parser.add_argument("--parar-no-erro", action="store_true", help="interrompe o lote na primeira falha")
+    parser.add_argument("--formato", default="png", choices=tuple(FORMATOS_ESCRITA), help="formato das imagens gravadas")
+    parser.add_argument("--nivel-png", type=int, help="compressão PNG 0..9 (0 = mais rápido, maior)")
+    parser.add_argument("--estrategia-png", choices=tuple(ESTRATEGIAS_PNG), help="estratégia do zlib no PNG")
+    parser.add_argument("--escritores", type=int, help="threads de codificação por imagem (padrão: até 4)")
+    parser.add_argument("--histograma-total", help="CSV com os histogramas somados de todas as imagens")
+    parser.add_argument("--lut", action="store_true", help="CMY, HSI e YUV 8-bit pelas tabelas 256^3 (lut.py)")
+    args = parser.parse_args()
+
+    caminhos = listar_entradas(args.entradas)
+    if not caminhos:
+        raise FileNotFoundError(f"Nenhuma imagem encontrada em: {', '.join(args.entradas)}")
+
+    def relatar(caminho, nome, dados, segundos):
+        if isinstance(dados, Exception):
+            print(f"[ERRO] {caminho}: {dados}")
+        else:
+            print(f"[ok] {caminho} -> {nome} ({len(dados['gravados'])} arquivos, {segundos:.2f} s)")
+
+    inicio = time.perf_counter()
+    resultados = processar_lote(
+        caminhos,
+        tuple(a for a in args.artefatos.split(",") if a),
+        tuple(e for e in args.estagios.split(",") if e),
+        args.saida,
+        args.parar_no_erro,
+        relatar,
+        {"trabalhadores": args.escritores, "formato": args.formato, "nivel_png": args.nivel_png,
+         "estrategia_png": args.estrategia_png},  # as mesmas opções de escrita do pipeline.py
+        ativar_lut({}) if args.lut else None,
+    )
+    total = time.perf_counter() - inicio
+    falhas = sum(isinstance(r[2], Exception) for r in resultados)
+
+    if args.histograma_total:
+        acumuladores = [r[2]["histograma"] for r in resultados if isinstance(r[2], dict) and "histograma" in r[2]]
+        if acumuladores:
+            soma = acumuladores[0]
+            for acumulador in acumuladores[1:]:
+                soma.somar(acumulador)
+            print(f"Histogramas somados de {soma.imagens} imagem(ns): {soma.exportar_csv(args.histograma_total)}")
+
+    print(f"Lote concluído: {len(resultados) - falhas} imagem(ns) ok, {falhas} com erro, {total:.2f} s no total.")
+    sys.exit(1 if falhas else 0)
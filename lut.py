@@ -0,0 +1,193 @@
+import os  # pastas e caminhos do cache
+import glob  # tabelas de versões anteriores
+import hashlib  # versão da tabela pelo código das fórmulas
+import inspect  # arquivo de cada função de conversão
+import numpy as np  # tabela e gather
+import conversoes  # o conteúdo do arquivo entra na versão das tabelas
+from conversoes import bgr_para_hsi_vetorizado, bgr_para_yuv, bgr_para_cmy
+
+# TABELA (LUT) 256^3 - RGB 8-bit -> HSI / YUV / CMY
+#
+# Toda entrada dos scripts d1..d5 é 8-bit (cv2.imread -> uint8), então cada
+# conversão é uma função pura da tripla (R,G,B): só existem 256^3 = 16.777.216
+# entradas possíveis. A tabela é calculada uma vez (com as mesmas funções de
+# conversoes.py), salva em disco como .npy e aberta depois com memmap.
+#
+# Índice de um pixel: (R << 16) | (G << 8) | B  -> linha da tabela
+# Cada linha guarda os 3 canais do modelo:
+#   hsi -> float32 (H em graus, S e I em [0,1])   ~192 MB
+#   yuv -> uint8   (Y, U+128, V+128, como os PNGs) ~48 MB
+#   cmy -> uint8   (C, M, Y)                       ~48 MB
+#
+# O nome do arquivo leva uma versão: um hash de conversoes.py e do arquivo da
+# função da tabela (ex.: inversas.py). Se as fórmulas mudarem, a tabela antiga
+# deixa de ser usada (e é apagada quando a nova é construída), sem versão manual.
+#
+# Uso: com_lut(modelo) devolve uma função com a mesma assinatura das de
+# conversoes.py; o pipeline (parametros {"CMY"/"HSI"/"YUV": {"lut": True}}, --lut),
+# o lote, o fluxo de vídeo, o serviço e o blocos.py (--lut) usam por ela.
+
+PASTA_CACHE_LUT = "cache_lut"  # pasta padrão das tabelas (fora do git)
+
+MODELOS_LUT = {
+    # modelo: (função de conversão, dtype da tabela)
+    "hsi": (bgr_para_hsi_vetorizado, np.float32),
+    "yuv": (bgr_para_yuv, np.uint8),
+    "cmy": (bgr_para_cmy, np.uint8),
+}
+
+_tabelas_abertas = {}  # tabelas já abertas neste processo (modelo, pasta) -> memmap
+
+
+def registrar_modelo_lut(modelo, funcao, dtype):
+    # Outros módulos (ex.: inversas.py) registram suas tabelas aqui. A função recebe
+    # uma "imagem" 8-bit cujos canais 2, 1, 0 são os bytes alto, médio e baixo do
+    # índice, e escreve os 3 canais de saída nos buffers passados.
+    MODELOS_LUT[modelo] = (funcao, dtype)
+
+
+def versao_lut(modelo):
+    # Hash de conversoes.py + arquivo da função da tabela
+    funcao = MODELOS_LUT[modelo][0]
+    arquivos = {os.path.abspath(conversoes.__file__), os.path.abspath(inspect.getsourcefile(funcao))}
+    resumo = hashlib.sha1()
+    for arquivo in sorted(arquivos):
+        with open(arquivo, "rb") as f:
+            resumo.update(f.read())
+    return resumo.hexdigest()[:12]
+
+
+def caminho_lut(modelo, pasta=PASTA_CACHE_LUT):
+    return os.path.join(pasta, f"lut_{modelo}_{versao_lut(modelo)}.npy")
+
+
+def construir_lut(modelo, pasta=PASTA_CACHE_LUT):
+    if modelo not in MODELOS_LUT:
+        raise ValueError(f"Modelo sem LUT: {modelo} (opções: {', '.join(MODELOS_LUT)})")
+
+    funcao, dtype = MODELOS_LUT[modelo]
+    os.makedirs(pasta, exist_ok=True)
+    destino = caminho_lut(modelo, pasta)
+    temporario = f"{destino}.{os.getpid()}.tmp.npy"  # escreve em outro nome (por processo) e renomeia no final
+
+    tabela = np.lib.format.open_memmap(temporario, mode="w+", dtype=dtype, shape=(256 ** 3, 3))
+
+    # Uma "imagem" 256x256 por valor de R: linha = G, coluna = B (ordem do índice)
+    G, B = np.meshgrid(np.arange(256, dtype=np.uint8), np.arange(256, dtype=np.uint8), indexing="ij")
+    fatia_bgr = np.empty((256, 256, 3), dtype=np.uint8)
+    fatia_bgr[:, :, 0] = B
+    fatia_bgr[:, :, 1] = G
+
+    for r in range(256):
+        fatia_bgr[:, :, 2] = r
+        saida = tabela[r * 65536:(r + 1) * 65536].reshape(256, 256, 3)  # view da tabela
+        funcao(fatia_bgr, saida[:, :, 0], saida[:, :, 1], saida[:, :, 2])  # escreve direto na tabela
+
+    tabela.flush()
+    del tabela
+    os.replace(temporario, destino)  # só aparece com o nome final quando estiver completa
+    for antiga in glob.glob(os.path.join(pasta, f"lut_{modelo}_*.npy")):
+        if antiga != destino and ".tmp." not in antiga:  # versões anteriores (não as em construção)
+            os.remove(antiga)
+    return destino
+
+
+def obter_lut(modelo, pasta=PASTA_CACHE_LUT):
+    chave = (modelo, os.path.abspath(pasta))
+    if chave in _tabelas_abertas:
+        return _tabelas_abertas[chave]
+
+    destino = caminho_lut(modelo, pasta)
+    if not os.path.exists(destino):  # primeira vez: calcula e salva
+        construir_lut(modelo, pasta)
+
+    tabela = np.load(destino, mmap_mode="r")  # memmap: páginas carregadas sob demanda
+    _tabelas_abertas[chave] = tabela
+    return tabela
+
+
+def indices_canais(alto, medio, baixo, indice=None):
+    # (alto << 16) | (medio << 8) | baixo em uint32, a partir de 3 planos 8-bit
+    if indice is None:
+        indice = np.empty(alto.shape, dtype=np.uint32)
+    np.left_shift(alto, 16, out=indice, dtype=np.uint32)
+    indice |= np.left_shift(medio, 8, dtype=np.uint32)
+    indice |= baixo
+    return indice
+
+
+def indices_rgb(img_bgr, indice=None):
+    # (R << 16) | (G << 8) | B em uint32
+    return indices_canais(img_bgr[:, :, 2], img_bgr[:, :, 1], img_bgr[:, :, 0], indice)
+
+
+def converter_com_lut(img_bgr, modelo, saida=None, pasta=PASTA_CACHE_LUT):
+    # Retorna uma matriz (altura, largura, 3) com os canais do modelo na ordem
+    # das funções de conversoes.py (H,S,I / Y,U,V / C,M,Y); saida[:, :, k] são views.
+    if img_bgr.dtype != np.uint8:
+        raise ValueError(f"LUT só vale para imagens 8-bit (recebido {img_bgr.dtype})")
+
+    tabela = obter_lut(modelo, pasta)
+    altura, largura = img_bgr.shape[:2]
+    if saida is None:
+        saida = np.empty((altura, largura, 3), dtype=tabela.dtype)
+
+    indice = indices_rgb(img_bgr)
+    np.take(tabela, indice, axis=0, out=saida)  # um único gather
+    return saida
+
+
+def com_lut(modelo, pasta=PASTA_CACHE_LUT):
+    # Função com a assinatura das de conversoes.py: (img_bgr, canal_1=None, canal_2=None, canal_3=None)
+    # -> 3 canais; sem saídas, os canais são views de uma matriz (altura, largura, 3)
+    def converter(img_bgr, *saidas):
+        resultado = converter_com_lut(img_bgr, modelo, pasta=pasta)
+        canais = []
+        for k in range(3):
+            destino = saidas[k] if k < len(saidas) else None
+            if destino is None:
+                canais.append(resultado[:, :, k])
+            else:
+                destino[...] = resultado[:, :, k]
+                canais.append(destino)
+        return tuple(canais)
+    return converter
+
+
+def converter_canais_com_lut(alto, medio, baixo, modelo, saida=None, pasta=PASTA_CACHE_LUT):
+    # Mesmo gather, para tabelas indexadas por 3 planos separados (ex.: H, S, I 8-bit)
+    for plano in (alto, medio, baixo):
+        if plano.dtype != np.uint8:
+            raise ValueError(f"LUT só vale para canais 8-bit (recebido {plano.dtype})")
+
+    tabela = obter_lut(modelo, pasta)
+    if saida is None:
+        saida = np.empty(alto.shape + (3,), dtype=tabela.dtype)
+
+    np.take(tabela, indices_canais(alto, medio, baixo), axis=0, out=saida)
+    return saida
+
+
+if __name__ == "__main__":
+    import time  # medir construção e conversão
+    import cv2  # ler imagem de teste
+
+    img_bgr = cv2.imread("lena-Color.png")
+    if img_bgr is None:
+        raise FileNotFoundError("Não foi possível ler a imagem: lena-Color.png")
+
+    for modelo, (funcao, _) in MODELOS_LUT.items():
+        inicio = time.perf_counter()
+        obter_lut(modelo)  # constrói se ainda não existir
+        t_tabela = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        direto = np.dstack(funcao(img_bgr))
+        t_direto = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        via_lut = converter_com_lut(img_bgr, modelo)
+        t_lut = time.perf_counter() - inicio
+
+        print(f"{modelo}: tabela {t_tabela:.2f} s | direto {t_direto * 1000:.1f} ms | "
+              f"LUT {t_lut * 1000:.1f} ms | idênticos? {np.array_equal(direto, via_lut)}")
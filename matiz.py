@@ -0,0 +1,102 @@
+import time  # vazão
+import argparse  # linha de comando
+import numpy as np  # referência float64
+from conversoes import METODOS_MATIZ, ERRO_MAXIMO_MATIZ, bgr_para_hsi_vetorizado, hsi_para_8bit
+
+# PRECISÃO E VELOCIDADE DOS MÉTODOS DE MATIZ (exato, atan2, polinomio)
+#
+# Para cada método de conversoes.bgr_para_hsi_vetorizado:
+# - precisão: percorre TODAS as 256³ cores BGR (em fatias de um valor de B, 65536
+#   cores por vez) e compara o H com o exato (float32, o que os scripts d4 gravam) e
+#   com a conta em float64; a distância é medida no círculo (359.9° e 0.1° estão a
+#   0.2°). Também conta quantas cores mudam de nível no H 8-bit (H/360*255 truncado):
+#   com erro de centésimos de grau, só cores muito perto da fronteira de um nível;
+# - velocidade: melhor de N repetições da conversão HSI inteira (H, S, I) numa
+#   imagem sintética, em megapixels/s.
+# O programa falha (código 1) se algum método passar de ERRO_MAXIMO_MATIZ.
+#
+# Ex.: python matiz.py --lado 2048 --repeticoes 5
+
+
+def _referencia_float64(img_bgr):
+    B, G, R = (img_bgr[:, :, k].astype(np.float64) for k in range(3))
+    H = np.degrees(np.arctan2(np.sqrt(3.0) * (G - B), (R - G) + (R - B)))
+    H[H < 0.0] += 360.0
+    return H
+
+
+def _distancia_circular(a, b):
+    d = np.abs(a.astype(np.float64) - b)
+    return np.minimum(d, 360.0 - d)
+
+
+def relatorio_precisao(metodos=METODOS_MATIZ):
+    # {método: {erro_max_exato, erro_medio_exato, erro_max_float64, niveis_8bit_diferentes}}
+    v = np.arange(256, dtype=np.uint8)
+    g, r = np.meshgrid(v, v, indexing="ij")
+    fatia = np.empty((256, 256, 3), dtype=np.uint8)
+    fatia[:, :, 1], fatia[:, :, 2] = g, r
+
+    resultado = {m: {"erro_max_exato": 0.0, "soma_erro_exato": 0.0, "erro_max_float64": 0.0,
+                     "niveis_8bit_diferentes": 0} for m in metodos}
+    for b in range(256):
+        fatia[:, :, 0] = b
+        H_exato, S, I = bgr_para_hsi_vetorizado(fatia)
+        H_8bit_exato = hsi_para_8bit(H_exato, S, I)[0]
+        referencia = _referencia_float64(fatia)
+        for metodo in metodos:
+            H = H_exato if metodo == "exato" else bgr_para_hsi_vetorizado(fatia, metodo_matiz=metodo)[0]
+            erro = _distancia_circular(H, H_exato)
+            r = resultado[metodo]
+            r["erro_max_exato"] = max(r["erro_max_exato"], float(erro.max()))
+            r["soma_erro_exato"] += float(erro.sum())
+            r["erro_max_float64"] = max(r["erro_max_float64"], float(_distancia_circular(H, referencia).max()))
+            r["niveis_8bit_diferentes"] += int(np.count_nonzero(hsi_para_8bit(H, S, I)[0] != H_8bit_exato))
+
+    for r in resultado.values():
+        r["erro_medio_exato"] = r.pop("soma_erro_exato") / 256 ** 3
+    return resultado
+
+
+def medir_vazao(lado=2048, repeticoes=3, metodos=METODOS_MATIZ):
+    # {método: MP/s} da conversão HSI completa
+    from benchmark import imagem_sintetica
+    img_bgr = imagem_sintetica(lado)
+    H, S, I = (np.empty((lado, lado), dtype=np.float32) for _ in range(3))
+    vazao = {}
+    for metodo in metodos:
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            bgr_para_hsi_vetorizado(img_bgr, H, S, I, metodo_matiz=metodo)
+            tempos.append(time.perf_counter() - inicio)
+        vazao[metodo] = lado * lado / 1e6 / min(tempos)
+    return vazao
+
+
+if __name__ == "__main__":
+    import sys  # código de saída
+
+    parser = argparse.ArgumentParser(description="Precisão (256³ cores) e vazão dos métodos de matiz do HSI.")
+    parser.add_argument("--lado", type=int, default=2048, help="lado da imagem sintética da medida de vazão")
+    parser.add_argument("--repeticoes", type=int, default=3, help="repetições (vale a melhor)")
+    parser.add_argument("--sem-precisao", action="store_true", help="só mede a vazão")
+    args = parser.parse_args()
+
+    vazao = medir_vazao(args.lado, args.repeticoes)
+    precisao = {} if args.sem_precisao else relatorio_precisao()
+
+    print(f"{'método':<10} {'MP/s':>8} {'x exato':>8} {'erro máx °':>11} {'erro médio °':>13} "
+          f"{'máx vs f64 °':>13} {'H 8-bit ≠':>10} {'limite °':>9}")
+    falhou = False
+    for metodo in METODOS_MATIZ:
+        linha = f"{metodo:<10} {vazao[metodo]:>8.1f} {vazao[metodo] / vazao['exato']:>7.2f}x"
+        if precisao:
+            p = precisao[metodo]
+            linha += (f" {p['erro_max_exato']:>11.5f} {p['erro_medio_exato']:>13.6f} {p['erro_max_float64']:>13.5f}"
+                      f" {p['niveis_8bit_diferentes']:>10} {ERRO_MAXIMO_MATIZ[metodo]:>9.3f}")
+            falhou |= p["erro_max_exato"] > ERRO_MAXIMO_MATIZ[metodo]
+        print(linha)
+    if precisao:
+        print(f"(erros sobre as {256 ** 3} cores BGR; 'H 8-bit ≠' = cores cujo nível do H 8-bit muda em relação ao exato)")
+    sys.exit(1 if falhou else 0)
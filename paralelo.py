@@ -0,0 +1,175 @@
+import os  # número de núcleos
+import time  # benchmark
+import argparse  # linha de comando
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor  # pools de trabalhadores
+from multiprocessing import shared_memory  # memória compartilhada entre processos
+import numpy as np  # arrays
+from conversoes import bgr_para_hsi_vetorizado, bgr_para_yuv, bgr_para_cmy
+
+# CONVERSÕES EM PARALELO (várias CPUs)
+#
+# A imagem é dividida em faixas de linhas e cada faixa é convertida por um
+# trabalhador. Entrada e saída ficam em multiprocessing.shared_memory: os
+# processos recebem só o nome do bloco de memória, a forma e o intervalo de
+# linhas (nada de pixels é serializado com pickle) e escrevem a faixa direto na
+# saída compartilhada, então a "costura" das faixas já sai pronta.
+#
+# modo="processos" usa ProcessPoolExecutor (um processo por núcleo);
+# modo="threads" usa ThreadPoolExecutor sobre os mesmos arrays (as ufuncs do
+# NumPy liberam o GIL, e não há custo de iniciar processos).
+#
+# Uso típico (o pool é criado uma vez e reaproveitado em várias imagens):
+#   with EscalonadorParalelo(trabalhadores=8) as esc:
+#       H, S, I = esc.converter(img_bgr, "hsi")
+
+KERNELS = {
+    # modelo: (função de conversoes.py, dtype da saída)
+    "hsi": (bgr_para_hsi_vetorizado, np.float32),
+    "yuv": (bgr_para_yuv, np.uint8),
+    "cmy": (bgr_para_cmy, np.uint8),
+}
+
+def _anexar(nome):
+    # Abre um bloco de memória criado pelo processo principal
+    try:  # quem cria é quem libera (unlink), não o trabalhador
+        return shared_memory.SharedMemory(name=nome, track=False)  # Python >= 3.13
+    except TypeError:
+        return shared_memory.SharedMemory(name=nome)  # usa o resource_tracker do processo principal
+
+
+def _converter_faixa(modelo, nome_entrada, nome_saida, forma, y0, y1):
+    # Roda no trabalhador: converte as linhas y0..y1 e escreve na saída compartilhada
+    funcao, dtype = KERNELS[modelo]
+    mem_entrada = _anexar(nome_entrada)
+    mem_saida = _anexar(nome_saida)
+    try:
+        entrada = np.ndarray(forma, dtype=np.uint8, buffer=mem_entrada.buf)
+        saida = np.ndarray(forma, dtype=dtype, buffer=mem_saida.buf)
+        faixa = saida[y0:y1]
+        funcao(entrada[y0:y1], faixa[:, :, 0], faixa[:, :, 1], faixa[:, :, 2])
+        del entrada, saida, faixa  # libera as views antes de fechar a memória
+    finally:
+        mem_entrada.close()
+        mem_saida.close()
+    return y1 - y0
+
+
+def _converter_faixa_local(funcao, entrada, saida, y0, y1):
+    # Versão com threads: mesmos arrays do processo principal
+    faixa = saida[y0:y1]
+    funcao(entrada[y0:y1], faixa[:, :, 0], faixa[:, :, 1], faixa[:, :, 2])
+    return y1 - y0
+
+
+def dividir_em_faixas(altura, trabalhadores, altura_faixa=None):
+    # Padrão: ~4 faixas por trabalhador (equilibra a carga), com pelo menos 16 linhas
+    if altura_faixa is None:
+        altura_faixa = max(16, -(-altura // (4 * trabalhadores)))
+    return [(y0, min(y0 + altura_faixa, altura)) for y0 in range(0, altura, altura_faixa)]
+
+
+class EscalonadorParalelo:
+    def __init__(self, trabalhadores=None, modo="processos", altura_faixa=None):
+        if modo not in ("processos", "threads"):
+            raise ValueError(f"Modo inválido: {modo} (use 'processos' ou 'threads')")
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        self.modo = modo
+        self.altura_faixa = altura_faixa
+        self._pool = None
+
+    def __enter__(self):
+        if self.modo == "processos":
+            self._pool = ProcessPoolExecutor(max_workers=self.trabalhadores)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.trabalhadores)
+        return self
+
+    def __exit__(self, *exc):
+        self._pool.shutdown()
+        self._pool = None
+
+    def converter(self, img_bgr, modelo):
+        if modelo not in KERNELS:
+            raise ValueError(f"Modelo desconhecido: {modelo} (opções: {', '.join(KERNELS)})")
+        if self._pool is None:
+            raise RuntimeError("Use o escalonador dentro de um bloco 'with'.")
+
+        funcao, dtype = KERNELS[modelo]
+        forma = img_bgr.shape
+        faixas = dividir_em_faixas(forma[0], self.trabalhadores, self.altura_faixa)
+
+        if self.modo == "threads":
+            saida = np.empty(forma, dtype=dtype)
+            futuros = [self._pool.submit(_converter_faixa_local, funcao, img_bgr, saida, y0, y1)
+                       for y0, y1 in faixas]
+            for futuro in futuros:
+                futuro.result()  # propaga erros dos trabalhadores
+            return saida[:, :, 0], saida[:, :, 1], saida[:, :, 2]
+
+        # Processos: entrada e saída em memória compartilhada
+        mem_entrada = shared_memory.SharedMemory(create=True, size=img_bgr.nbytes)
+        mem_saida = shared_memory.SharedMemory(create=True, size=int(np.prod(forma)) * np.dtype(dtype).itemsize)
+        try:
+            entrada = np.ndarray(forma, dtype=np.uint8, buffer=mem_entrada.buf)
+            entrada[...] = img_bgr  # única cópia da entrada
+            futuros = [
+                self._pool.submit(_converter_faixa, modelo, mem_entrada.name, mem_saida.name, forma, y0, y1)
+                for y0, y1 in faixas
+            ]
+            for futuro in futuros:
+                futuro.result()
+            # copia para um array comum antes de liberar a memória compartilhada
+            saida = np.ndarray(forma, dtype=dtype, buffer=mem_saida.buf).copy()
+            del entrada
+        finally:
+            mem_entrada.close()
+            mem_entrada.unlink()
+            mem_saida.close()
+            mem_saida.unlink()
+
+        return saida[:, :, 0], saida[:, :, 1], saida[:, :, 2]
+
+
+def converter_paralelo(img_bgr, modelo, trabalhadores=None, modo="processos", altura_faixa=None):
+    # Atalho para uma imagem só (cria e encerra o pool)
+    with EscalonadorParalelo(trabalhadores, modo, altura_faixa) as esc:
+        return esc.converter(img_bgr, modelo)
+
+
+if __name__ == "__main__":
+    # Benchmark: escalonamento de 1 até N trabalhadores
+    import cv2  # leitura da imagem
+
+    parser = argparse.ArgumentParser(description="Benchmark das conversões em paralelo (1..N núcleos).")
+    parser.add_argument("imagem", nargs="?", default="top_mosaic_09cm_area35.tif", help="imagem de entrada")
+    parser.add_argument("--max-trabalhadores", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--modelos", default="cmy,hsi,yuv", help="modelos separados por vírgula")
+    parser.add_argument("--modo", default="processos", choices=("processos", "threads"))
+    parser.add_argument("--repeticoes", type=int, default=3, help="mede o melhor de N execuções")
+    args = parser.parse_args()
+
+    img_bgr = cv2.imread(args.imagem, cv2.IMREAD_COLOR)
+    if img_bgr is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {args.imagem}")
+
+    contagens = sorted({1, args.max_trabalhadores} | {2 ** k for k in range(1, 8) if 2 ** k < args.max_trabalhadores})
+    megapixels = img_bgr.shape[0] * img_bgr.shape[1] / 1e6
+
+    print(f"=== PARALELO ({args.modo}) - {args.imagem} {img_bgr.shape[1]}x{img_bgr.shape[0]} ===")
+    for modelo in args.modelos.lower().split(","):
+        referencia = None
+        tempo_1 = None
+        for n in contagens:
+            with EscalonadorParalelo(n, args.modo) as esc:
+                esc.converter(img_bgr[:64], modelo)  # aquece o pool (inicia os processos)
+                melhor = float("inf")
+                for _ in range(args.repeticoes):
+                    inicio = time.perf_counter()
+                    canais = esc.converter(img_bgr, modelo)
+                    melhor = min(melhor, time.perf_counter() - inicio)
+            if referencia is None:
+                referencia = canais
+                tempo_1 = melhor
+            iguais = all(np.array_equal(a, b) for a, b in zip(canais, referencia))
+            print(f"{modelo} | {n:3d} trabalhador(es) | {melhor * 1000:8.1f} ms | "
+                  f"{megapixels / melhor:7.1f} MP/s | speedup {tempo_1 / melhor:5.2f}x | igual a 1 núcleo? {iguais}")
@@ -0,0 +1,398 @@
+import os  # pastas e caminhos
+import argparse  # linha de comando
+import cv2  # leitura e escrita
+import numpy as np  # canais contíguos para o codec da recomposição
+from conversoes import METODOS_MATIZ, bgr_para_hsi_vetorizado, hsi_para_8bit, bgr_para_yuv, bgr_para_yuv_inteiro, bgr_para_cmy
+from histogramas import AcumuladorHistogramas
+from verificacao import comparar_com_canais
+from yuv_planar import montar_quadro, gravar_yuv_planar, nome_arquivo_yuv, bgr_para_yuv_planar
+from armazenamento import salvar_canais
+from precisao import PRECISOES, converter_hsi, converter_yuv_float, codificacao_canais
+from cache_raster import ler_imagem
+from canais import alocar_canais, juntar_canais
+from lut import com_lut
+from escrita import EscritorParalelo, FORMATOS_ESCRITA, ESTRATEGIAS_PNG, relatorio_escrita, parametros_codec, opcoes_codec
+from piramide import salvar_piramide, caminho_piramide
+from georreferencia import ler_georreferencia, propagar_georreferencia
+from instrumentacao import obter_instrumentacao, configurar_instrumentacao, PASTA_RELATORIOS
+
+# PIPELINE EM UMA PASSADA (d1 -> d5 sem ida e volta por arquivos)
+#
+# Nos scripts d1..d5 a imagem de entrada é decodificada várias vezes e os canais
+# RGB são gravados em PNG pelo d1 só para o d3 e o d5 lerem de volta. Aqui a
+# imagem é decodificada uma vez e os arrays passam em memória por todos os
+# estágios:
+#   RGB          -> canais R, G, B (views da imagem BGR, sem cópia)
+#   CMY          -> C = 255 - R, M = 255 - G, Y = 255 - B
+#   recomposicao -> passa os canais pelo codec da escrita (encode/decode), recompõe e compara com a original (como o d3)
+#   HSI          -> H, S, I (float) e versões 8-bit
+#   YUV          -> Y, U, V (BT.601, 8-bit; inteiro=True usa o kernel de ponto fixo) e, se pedido, float com sinal;
+#                   com inteiro=True os .yuv planares saem da imagem faixa a faixa (yuv_planar.py), sem Y, U, V cheios
+#   histograma   -> contagens de 256 níveis de todos os canais (histogramas.py)
+# Só os artefatos pedidos são gravados, nos mesmos caminhos dos scripts
+# (canais<Modelo>_<nome>/..., resultados/...), codificados em paralelo (escrita.py).
+# Com --instrumentar (ou PDI_INSTRUMENTAR=1), cada estágio, a leitura e a escrita
+# entram no relatório de tempo/CPU/bytes/memória (instrumentacao.py).
+# Se a entrada for georreferenciada (GeoTIFF/.aux.xml), cada raster gravado ganha
+# world file + .aux.xml (georreferencia.py), sem regravar pixels.
+# Com --piramides, cada imagem gravada ganha também os níveis reduzidos para prévias
+# (<arquivo>.piramide.npz, piramide.py), calculados da matriz já em memória e lidos
+# pelos gráficos dos scripts (ler_para_exibir) sem decodificar e reduzir a imagem cheia.
+
+ESTAGIOS = ("RGB", "CMY", "recomposicao", "HSI", "YUV", "histograma")
+
+# artefato -> estágio de que depende
+ARTEFATOS = {
+    "RGB": "RGB",  # canaisRGB_<nome>/canal_R.png, canal_G.png, canal_B.png
+    "CMY": "CMY",  # canaisCMY_<nome>/canal_C.png, canal_M.png, canal_Y.png
+    "HSI": "HSI",  # canaisHSI_<nome>/canal_H.png, canal_S.png, canal_I.png
+    "HSI_8bit": "HSI",  # canaisHSI_<nome>/imagem_HSI_8bit.png (H,S,I em 3 canais)
+    "HSI_float": "HSI",  # canaisHSI_<nome>/imagem_HSI_float.pdif (float32 ou --precisao, armazenamento.py)
+    "YUV": "YUV",  # canaisYUV_<nome>/canal_Y.png, canal_U.png, canal_V.png
+    "YUV_imagem": "YUV",  # canaisYUV_<nome>/imagem_YUV.png (Y,U,V em 3 canais)
+    "YUV_float": "YUV",  # canaisYUV_<nome>/imagem_YUV_float.pdif (U e V com sinal, sem +128)
+    "YUV_I420": "YUV",  # canaisYUV_<nome>/imagem_YUV_I420_<L>x<A>.yuv (planar 4:2:0 cru)
+    "YUV_NV12": "YUV",  # canaisYUV_<nome>/imagem_YUV_NV12_<L>x<A>.yuv (4:2:0, UV intercalados)
+    "YUV_I422": "YUV",  # canaisYUV_<nome>/imagem_YUV_I422_<L>x<A>.yuv (planar 4:2:2 cru)
+    "diferenca": "recomposicao",  # resultados/<nome>_diferenca_original_vs_recomposta.png
+    "histogramas": "histograma",  # resultados/<nome>_histogramas.csv
+}
+
+ARTEFATOS_PADRAO = ("RGB", "CMY", "HSI", "YUV")
+
+# estágio -> estágio de que depende (None = só a imagem de entrada)
+DEPENDENCIAS = {"RGB": None, "CMY": None, "recomposicao": "RGB", "HSI": None, "YUV": None, "histograma": None}
+
+
+def estagio_rgb(img_bgr):
+    # OpenCV lê em BGR: os canais são só views (nada de cvtColor + split)
+    return {"R": img_bgr[:, :, 2], "G": img_bgr[:, :, 1], "B": img_bgr[:, :, 0]}
+
+
+def estagio_cmy(img_bgr, lut=False):
+    # lut: gather na tabela 256^3 (lut.py) em vez da conta; o resultado é o mesmo
+    C, M, Y = (com_lut("cmy") if lut else bgr_para_cmy)(img_bgr)
+    return {"C": C, "M": M, "Y": Y}
+
+
+def estagio_recomposicao(img_bgr, canais_rgb, gerar_diferenca=False, formato="png", nivel_png=None,
+                         estrategia_png=None):
+    # Como o d3: os canais passam pelo codec em que são gravados (encode + decode em memória,
+    # com as opções da escrita) e a imagem recomposta deles é comparada com a original, em
+    # faixas (verificacao.py). Os canais do estágio RGB são views da própria imagem: comparar
+    # direto com eles seria comparar a imagem com ela mesma. diff_abs (BGR) só se gerar_diferenca
+    extensao = FORMATOS_ESCRITA[formato]
+    parametros = parametros_codec(formato, nivel_png, estrategia_png)
+    lidos = {}
+    for canal in "RGB":
+        ok, codificado = cv2.imencode(extensao, np.ascontiguousarray(canais_rgb[canal]), parametros)
+        if not ok:
+            raise IOError(f"Não foi possível codificar o canal {canal} em {formato}")
+        lidos[canal] = cv2.imdecode(codificado, cv2.IMREAD_GRAYSCALE)
+        del codificado
+    return comparar_com_canais(img_bgr, lidos["R"], lidos["G"], lidos["B"], gerar_diferenca=gerar_diferenca)
+
+
+def estagio_hsi(img_bgr, metodo_matiz="exato", precisao="float32", lut=False, gerar_imagem=False):
+    # precisao: H, S, I em float32, float16 ou uint16 em ponto fixo (precisao.py); o 8-bit não muda
+    # lut: H, S, I float32 pela tabela 256^3 (só método exato)
+    # gerar_imagem: H, S, I 8-bit escritos como views da imagem de 3 canais (canais.py), sem cv2.merge depois
+    dados = {"precisao": precisao}
+    if precisao == "float32" and not lut:
+        H, S, I = bgr_para_hsi_vetorizado(img_bgr, metodo_matiz=metodo_matiz)
+        if gerar_imagem:
+            dados["imagem_8bit"], saidas = alocar_canais(*img_bgr.shape[:2])
+        else:
+            saidas = (None, None, None)
+        H_8bit, S_8bit, I_8bit = hsi_para_8bit(H, S, I, *saidas)
+    else:
+        H, S, I, H_8bit, S_8bit, I_8bit = converter_hsi(img_bgr, precisao, metodo_matiz, lut=lut)
+    dados.update(H=H, S=S, I=I, H_8bit=H_8bit, S_8bit=S_8bit, I_8bit=I_8bit)
+    return dados
+
+
+def estagio_yuv(img_bgr, inteiro=False, gerar_float=False, precisao="float32", lut=False, gerar_planos=True,
+                gerar_imagem=False):
+    # lut: Y, U, V 8-bit pela tabela 256^3 (a do BT.601 em float, não a inteira); o YUV float é sempre calculado
+    # inteiro: os quadros I420/NV12/I422 são montados da imagem (bgr_para_yuv_planar, só a faixa atual em
+    # memória); gerar_planos=False pula Y, U, V em resolução cheia quando nenhum PNG nem o histograma usa
+    # gerar_imagem: Y, U, V escritos como views da imagem de 3 canais (como o d5), sem cv2.merge depois
+    if lut and inteiro:
+        raise ValueError("A LUT do YUV é da conversão em float: não combina com inteiro=True")
+    dados = {"forma": img_bgr.shape[:2], "precisao": precisao}
+    if inteiro:
+        dados["planar"] = lambda formato, saida: bgr_para_yuv_planar(img_bgr, formato, saida)
+    if gerar_planos or not inteiro:
+        if lut:
+            Y, U, V = com_lut("yuv")(img_bgr)
+        else:
+            if gerar_imagem:
+                dados["imagem_8bit"], saidas = alocar_canais(*img_bgr.shape[:2])
+            else:
+                saidas = (None, None, None)
+            Y, U, V = bgr_para_yuv_inteiro(img_bgr, *saidas) if inteiro else bgr_para_yuv(img_bgr, *saidas)
+        dados.update(Y=Y, U=U, V=V)
+    if gerar_float:
+        dados["Y_float"], dados["U_float"], dados["V_float"] = converter_yuv_float(img_bgr, precisao)
+    return dados
+
+
+def ativar_lut(parametros):
+    # Liga a tabela 256^3 (lut.py) nos estágios com tabela compatível: CMY, HSI (método exato)
+    # e YUV (conta em float, não o kernel inteiro)
+    parametros = parametros if parametros is not None else {}
+    for estagio in ("CMY", "HSI", "YUV"):
+        opcoes = parametros.setdefault(estagio, {})
+        if opcoes.get("metodo_matiz", "exato") == "exato" and not opcoes.get("inteiro"):
+            opcoes["lut"] = True
+    return parametros
+
+
+def estagio_histograma(img_bgr, dados, modelos=("RGB", "CMY", "HSI", "YUV")):
+    # HSI/YUV já calculados pelo pipeline só são contados; o resto sai de uma passada na imagem
+    prontos = {"HSI": ("H_8bit", "S_8bit", "I_8bit"), "YUV": ("Y", "U", "V")}
+    prontos = {m: chaves for m, chaves in prontos.items() if m in modelos and chaves[0] in dados.get(m, {})}
+    faltando = tuple(m for m in modelos if m not in prontos)
+
+    acumulador = AcumuladorHistogramas(modelos)
+    if faltando:
+        acumulador.somar(AcumuladorHistogramas(faltando).adicionar(img_bgr))
+    else:
+        acumulador.pixels, acumulador.imagens = img_bgr.shape[0] * img_bgr.shape[1], 1
+    for modelo, chaves in prontos.items():
+        acumulador.adicionar_canais(modelo, [dados[modelo][k] for k in chaves])
+    return acumulador
+
+
+def arquivos_do_artefato(artefato, dados, nome, pasta_base=".", pasta_resultados="resultados"):
+    # Lista (caminho, conteúdo) que o artefato grava: um array pronto para o cv2.imwrite
+    # ou uma função que recebe o caminho e grava o arquivo
+    if artefato == "RGB":
+        pasta = os.path.join(pasta_base, f"canaisRGB_{nome}")
+        return [(os.path.join(pasta, f"canal_{c}.png"), dados["RGB"][c]) for c in "RGB"]
+    if artefato == "CMY":
+        pasta = os.path.join(pasta_base, f"canaisCMY_{nome}")
+        return [(os.path.join(pasta, f"canal_{c}.png"), dados["CMY"][c]) for c in "CMY"]
+    if artefato == "HSI":
+        pasta = os.path.join(pasta_base, f"canaisHSI_{nome}")
+        return [(os.path.join(pasta, f"canal_{c}.png"), dados["HSI"][f"{c}_8bit"]) for c in "HSI"]
+    if artefato == "HSI_8bit":
+        hsi = dados["HSI"]
+        return [(os.path.join(pasta_base, f"canaisHSI_{nome}", "imagem_HSI_8bit.png"),
+                 juntar_canais((hsi["H_8bit"], hsi["S_8bit"], hsi["I_8bit"]), hsi.get("imagem_8bit")))]
+    if artefato == "HSI_float":
+        hsi = dados["HSI"]
+        return [(os.path.join(pasta_base, f"canaisHSI_{nome}", "imagem_HSI_float.pdif"),
+                 lambda destino: salvar_canais(destino, (hsi["H"], hsi["S"], hsi["I"]), ("H", "S", "I"),
+                                               atributos={"H": "graus", "S": "0..1", "I": "0..1"},
+                                               codificacao=codificacao_canais("HSI", hsi["precisao"])))]
+    if artefato == "YUV":
+        pasta = os.path.join(pasta_base, f"canaisYUV_{nome}")
+        return [(os.path.join(pasta, f"canal_{c}.png"), dados["YUV"][c]) for c in "YUV"]
+    if artefato == "YUV_imagem":
+        yuv = dados["YUV"]
+        return [(os.path.join(pasta_base, f"canaisYUV_{nome}", "imagem_YUV.png"),
+                 juntar_canais((yuv["Y"], yuv["U"], yuv["V"]), yuv.get("imagem_8bit")))]
+    if artefato == "YUV_float":
+        yuv = dados["YUV"]
+        return [(os.path.join(pasta_base, f"canaisYUV_{nome}", "imagem_YUV_float.pdif"),
+                 lambda destino: salvar_canais(destino, (yuv["Y_float"], yuv["U_float"], yuv["V_float"]), ("Y", "U", "V"),
+                                               atributos={"Y": "0..255", "U": "com sinal", "V": "com sinal"},
+                                               codificacao=codificacao_canais("YUV", yuv["precisao"])))]
+    if artefato in ("YUV_I420", "YUV_NV12", "YUV_I422"):
+        yuv = dados["YUV"]
+        formato = artefato.split("_")[1]
+        altura, largura = yuv["forma"]
+        caminho = os.path.join(pasta_base, f"canaisYUV_{nome}", nome_arquivo_yuv(altura, largura, formato))
+        if "planar" in yuv:  # kernel inteiro: direto da imagem, faixa a faixa
+            preencher = lambda saida: yuv["planar"](formato, saida)
+        else:
+            preencher = lambda saida: montar_quadro(yuv["Y"], yuv["U"], yuv["V"], formato, saida)
+        return [(caminho, lambda destino: gravar_yuv_planar(destino, altura, largura, formato, preencher))]
+    if artefato == "diferenca":
+        # diff_abs já está em BGR, como o d3 salva
+        return [(os.path.join(pasta_base, pasta_resultados, f"{nome}_diferenca_original_vs_recomposta.png"),
+                 dados["recomposicao"]["diff_abs"])]
+    if artefato == "histogramas":
+        return [(os.path.join(pasta_base, pasta_resultados, f"{nome}_histogramas.csv"),
+                 dados["histograma"].exportar_csv)]
+    raise ValueError(f"Artefato desconhecido: {artefato} (opções: {', '.join(ARTEFATOS)})")
+
+
+def reducao_da_piramide(artefato, caminho):
+    # Como os gráficos reduzem o arquivo: o matiz (circular) por amostragem, a diferença pelo máximo
+    if artefato == "diferenca":
+        return "maximo"
+    if artefato == "HSI_8bit" or (artefato == "HSI" and os.path.basename(caminho).startswith("canal_H")):
+        return "amostragem"
+    return "media"
+
+
+def executar_pipeline(img_bgr, nome, artefatos=ARTEFATOS_PADRAO, estagios=ESTAGIOS, pasta_base=".",
+                      pasta_resultados="resultados", parametros=None, escrita=None, georreferencia=None,
+                      piramides=False):
+    # parametros: {estágio: {argumento: valor}} repassado para a função do estágio
+    # escrita: opções do EscritorParalelo (trabalhadores, formato, nivel_png, estrategia_png)
+    # georreferencia: a da imagem de entrada (georreferencia.ler_georreferencia), propagada às saídas
+    # piramides: grava <arquivo>.piramide.npz (níveis reduzidos) de cada imagem gravada
+    parametros = parametros or {}
+    for artefato in artefatos:
+        if artefato not in ARTEFATOS:
+            raise ValueError(f"Artefato desconhecido: {artefato} (opções: {', '.join(ARTEFATOS)})")
+        if ARTEFATOS[artefato] not in estagios:
+            raise ValueError(f"O artefato {artefato} precisa do estágio {ARTEFATOS[artefato]}")
+
+    # 1) Estágios, em memória (a recomposição usa os canais do estágio RGB)
+    medir = obter_instrumentacao().etapa  # não faz nada se a instrumentação estiver desligada
+    dados = {}
+    if "RGB" in estagios or "recomposicao" in estagios:
+        with medir("RGB"):
+            dados["RGB"] = estagio_rgb(img_bgr, **parametros.get("RGB", {}))
+    if "CMY" in estagios:
+        with medir("CMY"):
+            dados["CMY"] = estagio_cmy(img_bgr, **parametros.get("CMY", {}))
+    if "recomposicao" in estagios:
+        with medir("recomposicao"):
+            dados["recomposicao"] = estagio_recomposicao(img_bgr, dados["RGB"], gerar_diferenca="diferenca" in artefatos,
+                                                         **{**opcoes_codec(escrita), **parametros.get("recomposicao", {})})
+    if "HSI" in estagios:
+        with medir("HSI"):
+            dados["HSI"] = estagio_hsi(img_bgr, gerar_imagem="HSI_8bit" in artefatos, **parametros.get("HSI", {}))
+    if "YUV" in estagios:
+        with medir("YUV"):
+            gerar_planos = "histograma" in estagios or any(a in ("YUV", "YUV_imagem") for a in artefatos)
+            dados["YUV"] = estagio_yuv(img_bgr, gerar_float="YUV_float" in artefatos, gerar_planos=gerar_planos,
+                                       gerar_imagem="YUV_imagem" in artefatos, **parametros.get("YUV", {}))
+    if "histograma" in estagios:
+        with medir("histograma"):
+            dados["histograma"] = estagio_histograma(img_bgr, dados, **parametros.get("histograma", {}))
+
+    # 2) Grava só os artefatos pedidos (todos os arquivos codificam ao mesmo tempo)
+    gravados = []
+    por_artefato = {}  # artefato -> arquivos gravados
+    piramides_pendentes = []  # (artefato, caminho, matriz): gravadas depois das imagens
+    with medir("escrita") as etapa, EscritorParalelo(**(escrita or {})) as escritor:
+        for artefato in artefatos:
+            por_artefato[artefato] = []
+            for caminho, conteudo in arquivos_do_artefato(artefato, dados, nome, pasta_base, pasta_resultados):
+                caminho = escritor.gravar(caminho, conteudo)  # pode trocar a extensão (webp, tiff)
+                gravados.append(caminho)
+                por_artefato[artefato].append(caminho)
+                if piramides and not callable(conteudo):
+                    piramides_pendentes.append((artefato, caminho, conteudo))
+        escritor.aguardar()
+        # O .npz só vale se não for mais antigo que a imagem (piramide_em_dia): com vários
+        # trabalhadores, gravado junto ele podia terminar antes do PNG e nunca ser usado
+        for artefato, caminho, conteudo in piramides_pendentes:
+            reducao = reducao_da_piramide(artefato, caminho)
+            destino = escritor.gravar(caminho_piramide(caminho),
+                                      lambda destino, conteudo=conteudo, reducao=reducao:
+                                      salvar_piramide(destino, conteudo, reducao=reducao))
+            gravados.append(destino)
+            por_artefato[artefato].append(destino)
+        escritor.aguardar()
+        etapa.escritos += sum(r[2] for r in escritor.registros)  # vale quando não há /proc/self/io
+
+    # 3) World file + .aux.xml ao lado de cada raster (o diff do d3 não é um canal, mas está no mesmo lugar)
+    if georreferencia is not None:
+        for artefato, arquivos in por_artefato.items():
+            auxiliares = propagar_georreferencia(georreferencia, list(arquivos))
+            arquivos += auxiliares
+            gravados += auxiliares
+
+    dados["gravados"] = gravados
+    dados["gravados_por_artefato"] = por_artefato
+    dados["escrita"] = escritor.registros  # (caminho, segundos, bytes) de cada arquivo
+    return dados
+
+
+def nome_da_imagem(caminho_imagem):
+    # "lena-Color.png" -> "lena", "top_mosaic_09cm_area35.tif" -> "area35" (nomes usados nas pastas)
+    base = os.path.splitext(os.path.basename(caminho_imagem))[0]
+    if base == "lena-Color":
+        return "lena"
+    if base.startswith("top_mosaic_"):
+        return base.rsplit("_", 1)[-1]
+    return base
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline d1..d5 em uma passada (decodifica a imagem uma vez).")
+    parser.add_argument("imagem", help="imagem de entrada (ex.: lena-Color.png)")
+    parser.add_argument("--nome", help="sufixo das pastas canais<Modelo>_<nome> (padrão: derivado do arquivo)")
+    parser.add_argument("--artefatos", default=",".join(ARTEFATOS_PADRAO),
+                        help=f"artefatos a gravar, separados por vírgula ({', '.join(ARTEFATOS)})")
+    parser.add_argument("--estagios", default=",".join(ESTAGIOS), help="estágios a executar")
+    parser.add_argument("--saida", default=".", help="pasta base das saídas")
+    parser.add_argument("--incremental", action="store_true",
+                        help="pula estágios/artefatos já em dia (cache_incremental.py)")
+    parser.add_argument("--yuv-inteiro", action="store_true", help="YUV pelo kernel inteiro (ponto fixo)")
+    parser.add_argument("--metodo-matiz", default="exato", choices=METODOS_MATIZ,
+                        help="cálculo do H: exato (arccos), atan2 (mesma função, mais rápido) ou polinomio (erro <= 0.035°)")
+    parser.add_argument("--precisao", default="float32", choices=PRECISOES,
+                        help="HSI_float/YUV_float em float32, float16 ou uint16 em ponto fixo (metade do tamanho)")
+    parser.add_argument("--lut", action="store_true", help="CMY, HSI e YUV 8-bit pelas tabelas 256^3 (lut.py)")
+    parser.add_argument("--formato", default="png", choices=tuple(FORMATOS_ESCRITA), help="formato das imagens gravadas")
+    parser.add_argument("--nivel-png", type=int, help="compressão PNG 0..9 (0 = mais rápido, maior)")
+    parser.add_argument("--estrategia-png", choices=tuple(ESTRATEGIAS_PNG), help="estratégia do zlib no PNG")
+    parser.add_argument("--escritores", type=int, help="threads de codificação (padrão: até 4)")
+    parser.add_argument("--relatorio-escrita", action="store_true", help="tempo e tamanho de cada arquivo gravado")
+    parser.add_argument("--piramides", action="store_true", help="grava os níveis reduzidos de cada imagem (prévias)")
+    parser.add_argument("--instrumentar", action="store_true", help="relatório de tempo/CPU/bytes/memória por estágio")
+    parser.add_argument("--perfilar", metavar="ESTAGIO", help="roda o estágio dentro do cProfile (implica --instrumentar)")
+    parser.add_argument("--relatorio", default=os.path.join(PASTA_RELATORIOS, "instrumentacao.json"),
+                        help="JSON do relatório de instrumentação (o resumo vai para .txt ao lado)")
+    args = parser.parse_args()
+
+    if args.instrumentar or args.perfilar:
+        configurar_instrumentacao(True, args.perfilar)
+
+    nome = args.nome or nome_da_imagem(args.imagem)
+    artefatos = tuple(a for a in args.artefatos.split(",") if a)
+    estagios = tuple(e for e in args.estagios.split(",") if e)
+    parametros = {}
+    if args.yuv_inteiro:
+        parametros["YUV"] = {"inteiro": True}
+    if args.metodo_matiz != "exato":
+        parametros["HSI"] = {"metodo_matiz": args.metodo_matiz}
+    if args.precisao != "float32":
+        parametros.setdefault("HSI", {})["precisao"] = args.precisao
+        parametros.setdefault("YUV", {})["precisao"] = args.precisao
+    if args.lut:
+        ativar_lut(parametros)
+    escrita = {"trabalhadores": args.escritores, "formato": args.formato, "nivel_png": args.nivel_png,
+               "estrategia_png": args.estrategia_png}
+
+    if args.incremental:
+        from cache_incremental import executar_incremental  # importado aqui: o módulo depende deste
+        dados = executar_incremental(args.imagem, nome, artefatos, estagios, parametros, pasta_base=args.saida,
+                                     escrita=escrita, georreferencia=ler_georreferencia(args.imagem),
+                                     piramides=args.piramides)
+    else:
+        img_bgr = ler_imagem(args.imagem, cv2.IMREAD_COLOR)  # única decodificação (ou memmap do cache); etapa "leitura"
+        if img_bgr is None:
+            raise FileNotFoundError(f"Não foi possível ler a imagem: {args.imagem}")
+        dados = executar_pipeline(img_bgr, nome, artefatos, estagios, args.saida, parametros=parametros, escrita=escrita,
+                                  georreferencia=ler_georreferencia(args.imagem), piramides=args.piramides)
+
+    if dados.get("recomposicao"):
+        rec = dados["recomposicao"]
+        print(f"=== COMPARAÇÃO ({nome}) ORIGINAL vs RECOMPOSTA ===")
+        print(f"Idênticas pixel a pixel? -> {rec['iguais']}")
+        print(f"Maior diferença absoluta (max) -> {rec['max_diff']}")
+        print(f"Soma total das diferenças -> {rec['sum_diff']}")
+        print(f"Número de pixels com alguma diferença -> {rec['pixels_diferentes']}")
+
+    print(f"Pipeline concluído ({nome}): {len(dados['gravados'])} arquivo(s) gravado(s).")
+    if dados.get("reaproveitados"):
+        print(f"Em dia (não recalculados): {', '.join(dados['reaproveitados'])}")
+    if args.relatorio_escrita and dados.get("escrita"):
+        print(relatorio_escrita(dados["escrita"]))
+    else:
+        for caminho in dados["gravados"]:
+            print(f"- {caminho}")
+
+    instrumentacao = obter_instrumentacao()
+    if instrumentacao.ativo:
+        print(instrumentacao.resumo_texto())
+        print(f"Relatório de instrumentação: {', '.join(instrumentacao.salvar(args.relatorio))}")
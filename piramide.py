@@ -0,0 +1,191 @@
+import os  # caminhos e datas
+import argparse  # linha de comando
+import weakref  # cache em memória sem prender a imagem original
+from collections import OrderedDict  # LRU do cache em memória
+import cv2  # redução por média de área
+import numpy as np  # .npz dos níveis
+
+# PIRÂMIDE DE NÍVEIS REDUZIDOS (overviews) PARA GRÁFICOS E PRÉVIAS
+#
+# Os plots fazem plt.imshow do canal em resolução cheia, mas cada subplot tem umas
+# poucas centenas de pixels na tela: na area35 o matplotlib reamostra milhões de
+# pixels (e guarda cópias deles) para desenhar uma figura de 1200 px. Aqui:
+# - construir_piramide reduz a imagem pela metade, nível a nível (INTER_AREA = média
+#   de área, cada nível calculado a partir do anterior), até o maior lado caber em
+#   MENOR_LADO; o nível 0 é a própria imagem (sem cópia);
+# - para_exibir(img, lado) devolve o menor nível que ainda tem pelo menos `lado`
+#   pixels no maior lado (nunca amplia); lado_exibicao calcula esse tamanho a partir
+#   do figsize e da grade de subplots;
+# - a pirâmide é calculada uma vez: em memória (LRU, pela matriz de origem, que não
+#   fica presa no cache: quando ela é liberada, o callback do weakref tira os níveis
+#   do cache) e, para arquivos, em <arquivo>.piramide.npz ao lado (o pipeline com
+#   --piramides grava uma para cada canal de saída); ler_para_exibir usa o .npz em
+#   dia sem decodificar a imagem cheia, a menos que o nível 0 seja o escolhido.
+# Canais circulares (matiz H em graus) não podem ser somados: reducao="amostragem"
+# reduz por amostragem (view com passo, sem cópia). Mapas de diferença usam
+# reducao="maximo" (máximo de cada bloco 2x2): na média, um pixel diferente
+# sumiria da prévia, e mostrá-lo é o motivo do gráfico.
+#
+# Ex.: python piramide.py canaisRGB_area35/canal_R.png
+
+MENOR_LADO = 256  # o último nível tem o maior lado <= isso
+MAX_CACHE = 16  # pirâmides mantidas em memória
+SUFIXO_PIRAMIDE = ".piramide.npz"
+REDUCOES = ("media", "amostragem", "maximo")
+
+_cache = OrderedDict()  # chave -> (weakref da matriz de origem, níveis 1..n)
+
+
+def reduzir_pela_metade(img, reducao="media"):
+    altura, largura = img.shape[:2]
+    if reducao == "media":
+        return cv2.resize(img, ((largura + 1) // 2, (altura + 1) // 2), interpolation=cv2.INTER_AREA)
+    if reducao == "amostragem":
+        return img[::2, ::2]
+    if reducao == "maximo":
+        # dilate com âncora no canto: cada pixel vira o máximo do bloco 2x2 que ele abre
+        # (a borda não entra no máximo); depois fica um pixel por bloco
+        return cv2.dilate(img, np.ones((2, 2), np.uint8), anchor=(0, 0))[::2, ::2]
+    raise ValueError(f"Redução desconhecida: {reducao} (opções: {', '.join(REDUCOES)})")
+
+
+def construir_piramide(img, menor_lado=MENOR_LADO, reducao="media"):
+    # [nível 0 (a própria img), 1/2, 1/4, ...]
+    niveis = [img]
+    while max(niveis[-1].shape[:2]) > menor_lado:
+        niveis.append(reduzir_pela_metade(niveis[-1], reducao))
+    return niveis
+
+
+def escolher_nivel(niveis, lado):
+    # Menor nível com maior lado >= lado (o nível 0 se nenhum for grande o bastante)
+    for nivel in reversed(niveis):
+        if max(nivel.shape[:2]) >= lado:
+            return nivel
+    return niveis[0]
+
+
+def _raiz(img):
+    # Matriz que é dona da memória (as views apontam para ela)
+    while isinstance(img.base, np.ndarray):
+        img = img.base
+    return img
+
+
+def _ao_liberar(chave):
+    # Callback do weakref: a matriz de origem foi liberada, os níveis dela saem do cache
+    def descartar(referencia):
+        registro = _cache.get(chave)
+        if registro is not None and registro[0] is referencia:
+            del _cache[chave]
+    return descartar
+
+
+def piramide_em_memoria(img, menor_lado=MENOR_LADO, reducao="media"):
+    if reducao == "amostragem":  # níveis por amostragem são views da origem: refazer é de graça, e no cache a prenderiam
+        return construir_piramide(img, menor_lado, reducao)
+    raiz = _raiz(img)
+    chave = (id(raiz), img.__array_interface__["data"][0], img.shape, img.strides, img.dtype.str, menor_lado, reducao)
+    registro = _cache.get(chave)
+    if registro is not None and registro[0]() is raiz:  # mesma matriz, ainda viva
+        _cache.move_to_end(chave)
+        return [img] + registro[1]
+    niveis = construir_piramide(img, menor_lado, reducao)
+    _cache[chave] = (weakref.ref(raiz, _ao_liberar(chave)), niveis[1:])
+    while len(_cache) > MAX_CACHE:
+        _cache.popitem(last=False)
+    return niveis
+
+
+def para_exibir(img, lado, reducao="media"):
+    # Nível da pirâmide para desenhar em ~lado pixels (imagem pequena volta como está)
+    if max(img.shape[:2]) <= lado:
+        return img
+    return escolher_nivel(piramide_em_memoria(img, reducao=reducao), lado)
+
+
+def lado_exibicao(figsize, linhas=1, colunas=1, dpi=100):
+    # Pixels do maior lado de um subplot numa figura figsize (polegadas) com a grade linhas x colunas
+    return int(max(figsize[0] / colunas, figsize[1] / linhas) * dpi)
+
+
+def caminho_piramide(caminho):
+    return caminho + SUFIXO_PIRAMIDE
+
+
+def salvar_piramide(destino, img, menor_lado=MENOR_LADO, reducao="media"):
+    # Níveis 1..n em .npz (o nível 0 é o próprio arquivo de origem) e a redução usada
+    niveis = construir_piramide(img, menor_lado, reducao)[1:]
+    temporario = f"{destino}.{os.getpid()}.tmp.npz"
+    np.savez(temporario, reducao=np.array(reducao), **{f"nivel_{k + 1}": nivel for k, nivel in enumerate(niveis)})
+    os.replace(temporario, destino)
+    return destino
+
+
+def _numero_de_niveis(arquivo):
+    return sum(1 for nome in arquivo.files if nome.startswith("nivel_"))
+
+
+def piramide_em_dia(caminho, reducao="media"):
+    # O .npz existe, não é mais antigo que o arquivo e foi reduzido do mesmo jeito
+    destino = caminho_piramide(caminho)
+    if not (os.path.exists(destino) and os.path.getmtime(destino) >= os.path.getmtime(caminho)):
+        return False
+    with np.load(destino) as arquivo:
+        return "reducao" in arquivo.files and str(arquivo["reducao"]) == reducao
+
+
+def _ler_nivel_0(caminho, flags):
+    # cv2.imread direto: pelo cache_raster cada saída ganharia uma cópia .npy inteira
+    img = cv2.imread(caminho, flags)
+    if img is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho}")
+    return img
+
+
+def ler_piramide(caminho, flags=cv2.IMREAD_UNCHANGED, menor_lado=MENOR_LADO, reducao="media"):
+    # [imagem, níveis...] de um arquivo; o .npz ao lado é refeito se não existir, for mais
+    # antigo ou tiver outra redução
+    img = _ler_nivel_0(caminho, flags)
+    destino = caminho_piramide(caminho)
+    if not piramide_em_dia(caminho, reducao):
+        salvar_piramide(destino, img, menor_lado, reducao)
+    with np.load(destino) as arquivo:
+        niveis = [arquivo[f"nivel_{k + 1}"] for k in range(_numero_de_niveis(arquivo))]
+    return [img] + niveis
+
+
+def ler_para_exibir(caminho, lado, flags=cv2.IMREAD_UNCHANGED, reducao="media"):
+    # Prévia de um arquivo sem reduzir a imagem cheia de novo a cada gráfico. Com o .npz em dia,
+    # carrega só os níveis do menor para o maior até achar o escolhido, e decodifica a
+    # imagem cheia apenas se ela própria for o nível escolhido
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {caminho}")
+    if not piramide_em_dia(caminho, reducao):
+        return escolher_nivel(ler_piramide(caminho, flags, reducao=reducao), lado)
+    with np.load(caminho_piramide(caminho)) as arquivo:
+        for k in range(_numero_de_niveis(arquivo), 0, -1):
+            nivel = arquivo[f"nivel_{k}"]
+            if max(nivel.shape[:2]) >= lado:
+                return nivel
+    return _ler_nivel_0(caminho, flags)
+
+
+if __name__ == "__main__":
+    import time  # tempo de construção
+
+    parser = argparse.ArgumentParser(description="Pirâmide de níveis reduzidos de imagens.")
+    parser.add_argument("imagens", nargs="+", help="imagens (a pirâmide vai para <imagem>.piramide.npz)")
+    parser.add_argument("--lado", type=int, default=400, help="lado de exibição para escolher o nível")
+    parser.add_argument("--reducao", choices=REDUCOES, default="media",
+                        help="media (INTER_AREA), amostragem (canal H) ou maximo (mapas de diferença)")
+    args = parser.parse_args()
+
+    for caminho in args.imagens:
+        inicio = time.perf_counter()
+        niveis = ler_piramide(caminho, reducao=args.reducao)
+        segundos = time.perf_counter() - inicio
+        escolhido = escolher_nivel(niveis, args.lado)
+        tamanhos = ", ".join(f"{n.shape[1]}x{n.shape[0]}" for n in niveis)
+        print(f"{caminho}: {tamanhos} ({segundos * 1000:.1f} ms); para {args.lado}px: "
+              f"{escolhido.shape[1]}x{escolhido.shape[0]}")
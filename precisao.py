@@ -0,0 +1,150 @@
+import argparse  # linha de comando
+import numpy as np  # codificação dos canais
+from conversoes import bgr_para_hsi_vetorizado, hsi_para_8bit, bgr_para_yuv_float
+from lut import com_lut
+
+# PRECISÃO DAS SAÍDAS FLOAT (HSI e YUV com sinal): float32, float16 ou uint16 em ponto fixo
+#
+# O HSI float sai em 3 matrizes float32 (12 bytes por pixel), e os PNGs 8-bit truncam
+# H/360*255 (passo de 1.4° no H). Há dois formatos intermediários de 16 bits, com
+# metade da memória e do disco do float32:
+#   float16 -> meia precisão; passo relativo de 2^-11 (H perto de 360°: 0.25°; S e I: <= 0.0005)
+#   uint16  -> ponto fixo: v = minimo + k * (maximo - minimo) / 65535, com a faixa fixa de
+#              cada canal (FAIXAS); passo uniforme (H: 0.0055°; S e I: 1.5e-5)
+# Os canais compactos saem direto do kernel: a conversão roda em faixas de linhas com
+# temporários float32 do tamanho da faixa, e só a versão codificada da imagem inteira
+# existe em memória. As versões 8-bit (PNGs) são feitas na mesma faixa, a partir do
+# float32, então continuam idênticas às de antes.
+#
+# A codificação vai junto no .pdif (armazenamento.salvar_canais(..., codificacao=...));
+# ArquivoCanais.ler_regiao / ler_canal devolvem float32 já decodificado, então quem lê
+# não precisa saber como o arquivo foi gravado.
+#
+# Ex.: python precisao.py lena-Color.png
+
+PRECISOES = ("float32", "float16", "uint16")
+MAXIMO_UINT16 = 65535
+
+# modelo -> canal -> (mínimo, máximo) possíveis para entradas 8-bit
+FAIXAS = {
+    "HSI": {"H": (0.0, 360.0), "S": (0.0, 1.0), "I": (0.0, 1.0)},
+    "YUV": {"Y": (0.0, 255.0), "U": (-0.436 * 255.0, 0.436 * 255.0), "V": (-0.615 * 255.0, 0.615 * 255.0)},
+}
+
+
+def _validar(precisao):
+    if precisao not in PRECISOES:
+        raise ValueError(f"Precisão desconhecida: {precisao} (opções: {', '.join(PRECISOES)})")
+
+
+def codificacao_canais(modelo, precisao):
+    # {canal: {"precisao", "faixa"}} para o cabeçalho do .pdif (None se float32: nada a decodificar)
+    _validar(precisao)
+    if precisao == "float32":
+        return None
+    return {canal: {"precisao": precisao, "faixa": list(faixa)} for canal, faixa in FAIXAS[modelo].items()}
+
+
+def codificar(valores, precisao, faixa=None, saida=None):
+    # float -> float32/float16/uint16 (faixa obrigatória para uint16)
+    _validar(precisao)
+    if saida is None:
+        saida = np.empty(valores.shape, dtype=np.dtype(precisao))
+    if precisao != "uint16":
+        saida[...] = valores
+        return saida
+    minimo, maximo = faixa
+    escalado = np.subtract(valores, np.float32(minimo), dtype=np.float32)
+    escalado *= np.float32(MAXIMO_UINT16 / (maximo - minimo))
+    np.rint(escalado, out=escalado)
+    np.clip(escalado, 0, MAXIMO_UINT16, out=escalado)
+    saida[...] = escalado
+    return saida
+
+
+def decodificar(codificado, codificacao=None):
+    # Inverso de codificar, em float32 (codificacao: uma entrada de codificacao_canais)
+    if codificacao is None or codificacao["precisao"] != "uint16":
+        return codificado.astype(np.float32, copy=False)
+    minimo, maximo = codificacao["faixa"]
+    valores = codificado.astype(np.float32)
+    valores *= np.float32((maximo - minimo) / MAXIMO_UINT16)
+    valores += np.float32(minimo)
+    return valores
+
+
+def converter_hsi(img_bgr, precisao="float16", metodo_matiz="exato", linhas_por_faixa=256, lut=False):
+    # (H, S, I na precisão pedida, H_8bit, S_8bit, I_8bit); lut: float32 pela tabela 256^3 (lut.py)
+    _validar(precisao)
+    if lut and metodo_matiz != "exato":
+        raise ValueError(f"A LUT do HSI é do método exato (pedido: {metodo_matiz})")
+    converter = com_lut("hsi") if lut else (lambda img, *saidas: bgr_para_hsi_vetorizado(img, *saidas, metodo_matiz=metodo_matiz))
+    altura, largura = img_bgr.shape[:2]
+    if precisao == "float32":
+        H, S, I = converter(img_bgr)
+        return (H, S, I) + hsi_para_8bit(H, S, I)
+
+    compactos = [np.empty((altura, largura), dtype=np.dtype(precisao)) for _ in range(3)]
+    oito_bits = [np.empty((altura, largura), dtype=np.uint8) for _ in range(3)]
+    faixa_float = [np.empty((min(linhas_por_faixa, altura), largura), dtype=np.float32) for _ in range(3)]
+    for y0 in range(0, altura, linhas_por_faixa):
+        y1 = min(y0 + linhas_por_faixa, altura)
+        H, S, I = (f[:y1 - y0] for f in faixa_float)
+        converter(img_bgr[y0:y1], H, S, I)
+        hsi_para_8bit(H, S, I, *(c[y0:y1] for c in oito_bits))
+        for canal, valores, destino in zip("HSI", (H, S, I), compactos):
+            codificar(valores, precisao, FAIXAS["HSI"][canal], destino[y0:y1])
+    return tuple(compactos) + tuple(oito_bits)
+
+
+def converter_yuv_float(img_bgr, precisao="float16", linhas_por_faixa=256):
+    # Y, U, V com sinal (como bgr_para_yuv_float) na precisão pedida
+    _validar(precisao)
+    if precisao == "float32":
+        return bgr_para_yuv_float(img_bgr)
+    altura, largura = img_bgr.shape[:2]
+    compactos = [np.empty((altura, largura), dtype=np.dtype(precisao)) for _ in range(3)]
+    faixa_float = [np.empty((min(linhas_por_faixa, altura), largura), dtype=np.float32) for _ in range(3)]
+    for y0 in range(0, altura, linhas_por_faixa):
+        y1 = min(y0 + linhas_por_faixa, altura)
+        Y, U, V = (f[:y1 - y0] for f in faixa_float)
+        bgr_para_yuv_float(img_bgr[y0:y1], Y, U, V)
+        for canal, valores, destino in zip("YUV", (Y, U, V), compactos):
+            codificar(valores, precisao, FAIXAS["YUV"][canal], destino[y0:y1])
+    return tuple(compactos)
+
+
+if __name__ == "__main__":
+    import os  # arquivos de teste
+    import cv2  # leitura
+    from armazenamento import salvar_canais, abrir_canais
+
+    parser = argparse.ArgumentParser(description="Erro e tamanho do HSI/YUV float em float32, float16 e uint16.")
+    parser.add_argument("imagem", nargs="?", default="lena-Color.png", help="imagem de entrada")
+    parser.add_argument("--saida", default="resultados", help="pasta dos .pdif de teste")
+    args = parser.parse_args()
+
+    img_bgr = cv2.imread(args.imagem, cv2.IMREAD_COLOR)
+    if img_bgr is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {args.imagem}")
+    nome = os.path.splitext(os.path.basename(args.imagem))[0]
+    referencia = {"HSI": bgr_para_hsi_vetorizado(img_bgr), "YUV": bgr_para_yuv_float(img_bgr)}
+    oito_bits = hsi_para_8bit(*referencia["HSI"])
+
+    print(f"{'modelo':<6} {'precisão':<9} {'MB mem.':>8} {'KB .pdif':>9}  erro máximo por canal (após gravar e ler)")
+    for modelo in ("HSI", "YUV"):
+        for precisao in PRECISOES:
+            if modelo == "HSI":
+                resultado = converter_hsi(img_bgr, precisao)
+                canais = resultado[:3]
+                assert all(np.array_equal(a, b) for a, b in zip(resultado[3:], oito_bits)), "8-bit mudou"
+            else:
+                canais = converter_yuv_float(img_bgr, precisao)
+            caminho = os.path.join(args.saida, f"{nome}_{modelo}_{precisao}.pdif")
+            salvar_canais(caminho, canais, tuple(FAIXAS[modelo]), codificacao=codificacao_canais(modelo, precisao))
+            with abrir_canais(caminho) as arquivo:
+                erros = [float(np.abs(arquivo.ler_canal(k) - ref).max()) for k, ref in enumerate(referencia[modelo])]
+            memoria = sum(c.nbytes for c in canais) / 2 ** 20
+            texto = ", ".join(f"{c} {e:.2e}" for c, e in zip(FAIXAS[modelo], erros))
+            print(f"{modelo:<6} {precisao:<9} {memoria:>8.2f} {os.path.getsize(caminho) / 1024:>9.1f}  {texto}")
+    print("(HSI 8-bit dos PNGs, para comparar: erro de até 1.41° no H e 3.9e-3 em S e I)")
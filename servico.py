@@ -0,0 +1,389 @@
+import os  # caminhos
+import json  # pedidos e respostas
+import time  # latência e janela dos lotes
+import queue  # pedidos à espera do lote
+import argparse  # linha de comando
+import threading  # thread dos lotes
+from concurrent.futures import Future  # resposta de cada pedido do lote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import cv2  # decodificação
+import numpy as np  # lotes
+from cache_raster import ler_imagem
+from escrita import EscritorParalelo
+from pipeline import arquivos_do_artefato, nome_da_imagem, ativar_lut
+from lut import obter_lut
+from video import ESTAGIOS_QUADRO, estagios_necessarios, converter_quadro
+
+# SERVIÇO LOCAL DE CONVERSÃO (processo "quente" + micro-lotes)
+#
+# Cada script/conversão inicia um Python novo e importa cv2 e numpy (e às vezes o
+# matplotlib) para converter uma imagem: em miniaturas, a partida custa muito mais
+# que a conversão. Aqui um processo fica no ar em 127.0.0.1 (HTTP), com as bibliotecas
+# importadas, os kernels já executados uma vez, o cache de leitura (cache_raster.py)
+# aberto e, com --lut, as tabelas 256^3 (lut.py) abertas e carregadas na memória, e
+# atende pedidos de conversão:
+#   POST /converter  JSON {"caminho": "...", "modelo": "HSI"}
+#                    -> corpo binário com os canais 8-bit do modelo, planares (X-Canais,
+#                       X-Altura, X-Largura nos cabeçalhos)
+#                    JSON {"caminho": "...", "artefatos": ["HSI", "HSI_float"], "saida": "pasta",
+#                          "nome": "...", "parametros": {...}, "escrita": {...}}
+#                    -> grava os artefatos como o pipeline e responde JSON com os arquivos
+#                    "lut": true (ou {"HSI": {"lut": true}} nos parametros) usa as tabelas 256^3;
+#                    com --lut esse é o padrão dos pedidos sem "parametros"
+#   POST /converter?modelo=HSI  corpo = imagem codificada (PNG, JPEG...) ou, com
+#                    &largura=L&altura=A, BGR cru (A*L*3 bytes) -> canais como acima
+#   GET  /estado     -> contadores (pedidos, lotes, imagens por lote, latência média)
+# Micro-lotes: imagens pequenas (até PIXELS_PEQUENA) que chegam juntas com o mesmo
+# pedido de conversão são concatenadas numa única linha de pixels e convertidas numa
+# chamada só (as conversões são pixel a pixel, então os tamanhos podem ser
+# diferentes); depois cada pedido recebe a sua parte (views). O lote só espera (até
+# JANELA_MS) se houver outros pedidos já recebidos e ainda lendo a imagem: um pedido
+# sozinho não paga a janela. Imagens maiores são convertidas direto na thread do pedido.
+# Só escuta em 127.0.0.1: não é para ficar exposto na rede.
+#
+# Ex.: python servico.py --porta 8765 &
+#      python servico.py --cliente miniaturas/*.png --modelo HSI
+
+PORTA_PADRAO = 8765
+JANELA_MS = 2.0  # espera máxima por outros pedidos para o mesmo lote
+PIXELS_PEQUENA = 256 * 256  # acima disso a imagem não entra em lote
+PIXELS_LOTE = 4 * 2 ** 20  # tamanho máximo de um lote
+ESPERA_LOTE = 0.0002  # segundos entre verificações enquanto o lote espera pedidos a caminho
+MODELOS_LUT_SERVICO = ("cmy", "hsi", "yuv")  # tabelas que o aquecimento abre (as de ativar_lut)
+PAGINA = 4096  # bytes: um acesso por página carrega a tabela inteira
+CANAIS_8BIT = {
+    # modelo: chaves dos canais 8-bit nos dados do estágio
+    "RGB": ("R", "G", "B"),
+    "CMY": ("C", "M", "Y"),
+    "HSI": ("H_8bit", "S_8bit", "I_8bit"),
+    "YUV": ("Y", "U", "V"),
+}
+
+
+def _dividir(dados, formas):
+    # Dados de um estágio calculado numa linha (1, n) -> um dict por imagem, com views (altura, largura)
+    partes = [{} for _ in formas]
+    inicio = 0
+    for k, (altura, largura) in enumerate(formas):
+        fim = inicio + altura * largura
+        for chave, valor in dados.items():
+            partes[k][chave] = valor[0, inicio:fim].reshape(altura, largura) if isinstance(valor, np.ndarray) else valor
+        inicio = fim
+    return partes
+
+
+def converter_em_lote(imagens, estagios, parametros=None, gerar_float=False):
+    # Várias imagens BGR 8-bit -> [{estágio: dados}] com uma chamada de cada estágio para todas
+    formas = [img.shape[:2] for img in imagens]
+    linha = np.concatenate([img.reshape(1, -1, 3) for img in imagens], axis=1)
+    dados = converter_quadro(linha, estagios, parametros, gerar_float)
+    por_imagem = [{} for _ in imagens]
+    for estagio, valores in dados.items():
+        for destino, parte in zip(por_imagem, _dividir(valores, formas)):
+            destino[estagio] = parte
+    return por_imagem
+
+
+class AgrupadorLotes:
+    # Junta pedidos pequenos que chegam juntos e converte cada grupo numa chamada só
+    def __init__(self, janela_ms=JANELA_MS, pixels_pequena=PIXELS_PEQUENA, pixels_lote=PIXELS_LOTE):
+        self.janela = janela_ms / 1000
+        self.pixels_pequena = pixels_pequena
+        self.pixels_lote = pixels_lote
+        self.lotes = 0
+        self.imagens_em_lote = 0
+        self._a_caminho = 0  # pedidos recebidos que ainda não chegaram à fila
+        self._trava = threading.Lock()
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._laco, name="lotes", daemon=True)
+        self._thread.start()
+
+    def _avisar(self, quantidade):
+        with self._trava:
+            self._a_caminho += quantidade
+
+    def pedido_chegando(self):
+        # Chamado assim que o pedido é recebido (antes de ler a imagem); converter(avisado=True) desconta
+        self._avisar(1)
+
+    def pedido_desistiu(self):
+        # Pedido avisado que não vai chegar a converter (erro na leitura)
+        self._avisar(-1)
+
+    def converter(self, img_bgr, estagios, parametros=None, gerar_float=False, avisado=False):
+        # avisado: pedido_chegando já foi chamado para este pedido
+        if img_bgr.shape[0] * img_bgr.shape[1] > self.pixels_pequena:
+            if avisado:
+                self._avisar(-1)
+            return converter_quadro(img_bgr, estagios, parametros, gerar_float)
+        futuro = Future()
+        chave = (estagios, json.dumps(parametros or {}, sort_keys=True), gerar_float)
+        self._fila.put((chave, img_bgr, parametros, futuro))
+        if avisado:
+            self._avisar(-1)
+        return futuro.result()
+
+    def fechar(self):
+        self._fila.put(None)
+        self._thread.join()
+
+    def _laco(self):
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            lote = [item]
+            pixels = item[1].shape[0] * item[1].shape[1]
+            prazo = time.perf_counter() + self.janela
+            while pixels < self.pixels_lote:
+                restante = prazo - time.perf_counter()
+                try:
+                    if self._a_caminho > 0 and restante > 0:  # há pedidos para chegar: vale esperar
+                        item = self._fila.get(timeout=min(restante, ESPERA_LOTE))
+                    else:
+                        item = self._fila.get_nowait()  # só o que já está na fila
+                except queue.Empty:
+                    if self._a_caminho > 0 and restante > 0:
+                        continue
+                    break
+                if item is None:
+                    self._fila.put(None)  # termina depois deste lote
+                    break
+                lote.append(item)
+                pixels += item[1].shape[0] * item[1].shape[1]
+
+            grupos = {}
+            for item in lote:
+                grupos.setdefault(item[0], []).append(item)
+            for (estagios, _, gerar_float), grupo in grupos.items():
+                self._converter_grupo(grupo, estagios, grupo[0][2], gerar_float)
+
+    def _converter_grupo(self, grupo, estagios, parametros, gerar_float):
+        try:
+            resultados = converter_em_lote([item[1] for item in grupo], estagios, parametros, gerar_float)
+        except Exception as erro:
+            for item in grupo:
+                item[3].set_exception(erro)
+            return
+        self.lotes += 1
+        self.imagens_em_lote += len(grupo)
+        for item, resultado in zip(grupo, resultados):
+            item[3].set_result(resultado)
+
+
+def aquecer(lut=False):
+    # Primeira chamada de cada estágio (alocação, carga de código do cv2/numpy) antes do primeiro pedido;
+    # com lut, abre as tabelas (constrói as que faltarem) e lê uma posição por página, para
+    # o primeiro gather já achar a tabela inteira na memória
+    img = np.zeros((16, 16, 3), dtype=np.uint8)
+    converter_quadro(img, tuple(ESTAGIOS_QUADRO), gerar_float=True)
+    if lut:
+        for modelo in MODELOS_LUT_SERVICO:
+            tabela = obter_lut(modelo)
+            int(tabela.reshape(-1).view(np.uint8)[::PAGINA].sum())
+        converter_quadro(img, tuple(ESTAGIOS_QUADRO), ativar_lut({}), gerar_float=True)
+    cv2.imencode(".png", img)
+
+
+def _imagem_do_corpo(corpo, largura=None, altura=None):
+    if largura and altura:
+        if len(corpo) != largura * altura * 3:
+            raise ValueError(f"Corpo de {len(corpo)} bytes não é BGR {largura}x{altura}")
+        return np.frombuffer(corpo, dtype=np.uint8).reshape(altura, largura, 3)
+    img = cv2.imdecode(np.frombuffer(corpo, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Corpo não é uma imagem que o OpenCV decodifique")
+    return img
+
+
+class Servico:
+    def __init__(self, agrupador=None, parametros=None):
+        # parametros: padrão dos pedidos que não trazem os seus (ex.: ativar_lut({}) com --lut)
+        self.agrupador = agrupador or AgrupadorLotes()
+        self.parametros = parametros
+        self.inicio = time.time()
+        self.pedidos = 0
+        self.erros = 0
+        self.segundos = 0.0
+        self._trava = threading.Lock()
+
+    def converter(self, pedido, corpo=None):
+        # pedido: dict (JSON); corpo: imagem enviada no pedido (bytes) em vez de pedido["caminho"]
+        # -> (tipo, resposta): ("canais", (nomes, matriz planar)) ou ("json", dict)
+        self.agrupador.pedido_chegando()  # o lote em formação pode esperar por este
+        try:
+            if corpo is not None:
+                img_bgr = _imagem_do_corpo(corpo, pedido.get("largura"), pedido.get("altura"))
+            elif "caminho" not in pedido:
+                raise ValueError("Pedido sem 'caminho' nem imagem no corpo")
+            else:
+                img_bgr = ler_imagem(pedido["caminho"], cv2.IMREAD_COLOR)
+                if img_bgr is None:
+                    raise FileNotFoundError(f"Não foi possível ler a imagem: {pedido['caminho']}")
+            modelo = pedido.get("modelo")
+            artefatos = tuple(pedido.get("artefatos") or (modelo,))
+            if "saida" not in pedido and modelo not in CANAIS_8BIT:
+                raise ValueError(f"Modelo desconhecido: {modelo} (opções: {', '.join(CANAIS_8BIT)})")
+            estagios = estagios_necessarios(artefatos) if "saida" in pedido else (modelo,)
+            parametros = pedido.get("parametros", self.parametros)
+            if pedido.get("lut"):
+                parametros = ativar_lut(json.loads(json.dumps(parametros or {})))  # cópia: não altera o padrão
+        except BaseException:
+            self.agrupador.pedido_desistiu()
+            raise
+        dados = self.agrupador.converter(img_bgr, estagios, parametros,
+                                         gerar_float="YUV_float" in artefatos, avisado=True)
+
+        if "saida" not in pedido:
+            return "canais", (CANAIS_8BIT[modelo], np.stack([dados[modelo][c] for c in CANAIS_8BIT[modelo]]))
+        nome = pedido.get("nome") or nome_da_imagem(pedido.get("caminho", "imagem"))
+        with EscritorParalelo(**pedido.get("escrita", {})) as escritor:
+            for artefato in artefatos:
+                for caminho, conteudo in arquivos_do_artefato(artefato, dados, nome, pedido["saida"]):
+                    escritor.gravar(caminho, conteudo)
+            registros = escritor.aguardar()
+        return "json", {"gravados": [r[0] for r in registros]}
+
+    def registrar(self, segundos, erro=False):
+        with self._trava:
+            self.pedidos += 1
+            self.erros += erro
+            self.segundos += segundos
+
+    def estado(self):
+        lotes = self.agrupador.lotes
+        return {"pedidos": self.pedidos, "erros": self.erros, "lotes": lotes,
+                "imagens_em_lote": self.agrupador.imagens_em_lote,
+                "imagens_por_lote": self.agrupador.imagens_em_lote / lotes if lotes else 0.0,
+                "ms_medio": self.segundos * 1000 / self.pedidos if self.pedidos else 0.0,
+                "no_ar_s": time.time() - self.inicio, "pid": os.getpid()}
+
+
+class _Tratador(BaseHTTPRequestHandler):
+    servico = None  # definido em criar_servidor
+    protocol_version = "HTTP/1.1"  # conexão reaproveitada entre pedidos do mesmo cliente
+    disable_nagle_algorithm = True  # cabeçalho e corpo saem em escritas separadas: sem isso, ~40 ms de ACK atrasado
+
+    def log_message(self, formato, *args):
+        pass  # sem uma linha no terminal por pedido
+
+    def _responder(self, codigo, corpo, tipo="application/json", cabecalhos=None):
+        self.send_response(codigo)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _json(self, codigo, dados):
+        self._responder(codigo, json.dumps(dados, ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/estado":
+            self._json(200, self.servico.estado())
+        else:
+            self._json(404, {"erro": f"Caminho desconhecido: {self.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if url.path != "/converter":
+            self._json(404, {"erro": f"Caminho desconhecido: {self.path}"})
+            return
+        inicio = time.perf_counter()
+        try:
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                tipo, resposta = self.servico.converter(json.loads(corpo))
+            else:
+                consulta = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                pedido = {"modelo": consulta.get("modelo"), "largura": int(consulta.get("largura", 0)),
+                          "altura": int(consulta.get("altura", 0))}
+                tipo, resposta = self.servico.converter(pedido, corpo)
+        except (ValueError, KeyError, FileNotFoundError) as erro:
+            self.servico.registrar(time.perf_counter() - inicio, erro=True)
+            self._json(400, {"erro": str(erro)})
+            return
+        except Exception as erro:
+            self.servico.registrar(time.perf_counter() - inicio, erro=True)
+            self._json(500, {"erro": f"{type(erro).__name__}: {erro}"})
+            return
+        self.servico.registrar(time.perf_counter() - inicio)
+        if tipo == "json":
+            self._json(200, resposta)
+            return
+        nomes, canais = resposta
+        self._responder(200, canais.tobytes(), "application/octet-stream",
+                        {"X-Canais": ",".join(nomes), "X-Altura": str(canais.shape[1]),
+                         "X-Largura": str(canais.shape[2])})
+
+
+class _Servidor(ThreadingHTTPServer):
+    request_queue_size = 128  # rajadas de clientes (o padrão, 5, faz conexões esperarem 1 s pelo SYN de novo)
+
+
+def criar_servidor(porta=PORTA_PADRAO, servico=None):
+    tratador = type("Tratador", (_Tratador,), {"servico": servico or Servico()})
+    return _Servidor(("127.0.0.1", porta), tratador)
+
+
+def converter_remoto(pedido=None, imagem=None, modelo="HSI", porta=PORTA_PADRAO, conexao=None):
+    # Cliente: pedido (dict JSON) ou imagem (bytes codificados) -> (nomes, canais (3, A, L)) ou dict
+    import http.client
+    conexao = conexao or http.client.HTTPConnection("127.0.0.1", porta)
+    if imagem is not None:
+        conexao.request("POST", f"/converter?modelo={modelo}", imagem, {"Content-Type": "application/octet-stream"})
+    else:
+        conexao.request("POST", "/converter", json.dumps(pedido).encode("utf-8"), {"Content-Type": "application/json"})
+    resposta = conexao.getresponse()
+    corpo = resposta.read()
+    if resposta.status != 200:
+        raise RuntimeError(f"Serviço respondeu {resposta.status}: {corpo.decode('utf-8', 'replace')}")
+    if resposta.getheader("Content-Type") == "application/json":
+        return json.loads(corpo)
+    altura, largura = int(resposta.getheader("X-Altura")), int(resposta.getheader("X-Largura"))
+    canais = np.frombuffer(corpo, dtype=np.uint8).reshape(-1, altura, largura)
+    return resposta.getheader("X-Canais").split(","), canais
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço local de conversão (processo quente, micro-lotes).")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help="porta em 127.0.0.1")
+    parser.add_argument("--janela-ms", type=float, default=JANELA_MS, help="espera máxima para juntar um lote")
+    parser.add_argument("--cliente", nargs="+", metavar="IMAGEM",
+                        help="em vez de servir, envia as imagens (em paralelo) e mede a latência")
+    parser.add_argument("--modelo", default="HSI", choices=tuple(CANAIS_8BIT), help="modelo pedido pelo --cliente")
+    parser.add_argument("--paralelos", type=int, default=8, help="pedidos simultâneos do --cliente")
+    parser.add_argument("--lut", action="store_true",
+                        help="abre as tabelas 256^3 ao iniciar e as usa nos pedidos sem parametros")
+    args = parser.parse_args()
+
+    if args.cliente:
+        from concurrent.futures import ThreadPoolExecutor
+
+        def pedir(caminho):
+            inicio = time.perf_counter()
+            converter_remoto({"caminho": os.path.abspath(caminho), "modelo": args.modelo, "lut": args.lut}, porta=args.porta)
+            return time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.paralelos) as pool:
+            latencias = sorted(pool.map(pedir, args.cliente))
+        total = time.perf_counter() - inicio
+        print(f"{len(latencias)} pedidos em {total * 1000:.1f} ms; latência mediana "
+              f"{latencias[len(latencias) // 2] * 1000:.2f} ms, máxima {latencias[-1] * 1000:.2f} ms")
+        import http.client
+        conexao = http.client.HTTPConnection("127.0.0.1", args.porta)
+        conexao.request("GET", "/estado")
+        print(json.loads(conexao.getresponse().read()))
+    else:
+        aquecer(args.lut)
+        servidor = criar_servidor(args.porta, Servico(AgrupadorLotes(args.janela_ms), ativar_lut({}) if args.lut else None))
+        print(f"Serviço de conversão em http://127.0.0.1:{args.porta} (pid {os.getpid()}); Ctrl+C para sair")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
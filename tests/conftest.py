@@ -0,0 +1,5 @@
+import os  # caminho da raiz
+import sys  # os módulos do trabalho ficam na raiz, fora de um pacote
+
+# Os testes importam os módulos da raiz (conversoes, d4lena_transformarHSI...) como os scripts fazem
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,36 @@
+import os  # arquivos da pasta
+import multiprocessing  # escritores em processos separados, como o lote
+import numpy as np  # canais de teste
+from armazenamento import salvar_canais, abrir_canais
+
+# ARQUIVO DE CANAIS (armazenamento.py)
+#
+# Rodar da raiz: python -m pytest -q tests
+
+
+def canais_de_teste(semente):
+    rng = np.random.default_rng(semente)
+    return [rng.random((300, 200), dtype=np.float32) for _ in range(3)]
+
+
+def _gravar(caminho, semente, repeticoes):
+    for _ in range(repeticoes):
+        salvar_canais(caminho, canais_de_teste(semente), ("H", "S", "I"))
+
+
+def test_escritores_em_paralelo_no_mesmo_caminho(tmp_path):
+    # Cada processo grava o mesmo arquivo várias vezes: o resultado é sempre um arquivo
+    # inteiro de algum deles (nenhum escreve no temporário do outro) e não sobra temporário
+    caminho = str(tmp_path / "imagem_HSI_float.pdif")
+    contexto = multiprocessing.get_context("spawn")
+    processos = [contexto.Process(target=_gravar, args=(caminho, semente, 5)) for semente in range(4)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join()
+    assert all(processo.exitcode == 0 for processo in processos)
+
+    assert os.listdir(tmp_path) == ["imagem_HSI_float.pdif"]
+    with abrir_canais(caminho) as arquivo:
+        lidos = [arquivo.ler_canal(nome) for nome in "HSI"]
+    assert any(all(np.array_equal(a, b) for a, b in zip(lidos, canais_de_teste(semente))) for semente in range(4))
@@ -0,0 +1,51 @@
+import os  # caminhos
+import json  # manifesto
+from cache_incremental import NOME_MANIFESTO, chaves_dos_estagios, executar_incremental
+
+# CACHE INCREMENTAL (cache_incremental.py)
+#
+# Rodar da raiz: python -m pytest -q tests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LENA = os.path.join(RAIZ, "lena-Color.png")
+
+
+def test_codec_entra_na_chave_da_recomposicao():
+    # A recomposição faz a ida e volta pelo codec da escrita: outro codec, outra recomposição
+    png = chaves_dos_estagios("entrada", versao="v", escrita={"formato": "png"})
+    for escrita in ({"formato": "webp"}, {"formato": "png", "nivel_png": 0}, {"formato": "png", "estrategia_png": "rle"}):
+        outras = chaves_dos_estagios("entrada", versao="v", escrita=escrita)
+        assert outras["recomposicao"] != png["recomposicao"]
+        assert outras["HSI"] == png["HSI"]  # quem não passa pelo codec não muda
+    # trabalhadores não mudam o conteúdo
+    assert chaves_dos_estagios("entrada", versao="v", escrita={"formato": "png", "trabalhadores": 4}) == png
+
+
+def test_manifesto_relativo_a_pasta_base(tmp_path, monkeypatch):
+    base = tmp_path / "saida"
+    artefatos = ("RGB", "HSI")
+    estagios = ("RGB", "recomposicao", "HSI")
+    monkeypatch.chdir(tmp_path)
+    primeira = executar_incremental(LENA, "lena", artefatos, estagios, pasta_base="saida")
+    assert primeira["gravados"]
+    with open(base / NOME_MANIFESTO, encoding="utf-8") as f:
+        arquivos = json.load(f)["lena"]["artefatos"]["RGB"]["arquivos"]
+    assert sorted(arquivos) == [os.path.join("canaisRGB_lena", f"canal_{c}.png") for c in "BGR"]
+
+    # de outra pasta, com a mesma pasta base: tudo em dia
+    outra = tmp_path / "outra"
+    outra.mkdir()
+    monkeypatch.chdir(outra)
+    segunda = executar_incremental(LENA, "lena", artefatos, estagios, pasta_base=str(base))
+    assert segunda["gravados"] == []
+    assert sorted(segunda["reaproveitados"]) == sorted(artefatos)
+
+    # só a recomposição pedida, com outro codec: é refeita (antes a chave antiga era reaproveitada)
+    def chave_da_recomposicao():
+        with open(base / NOME_MANIFESTO, encoding="utf-8") as f:
+            return json.load(f)["lena"]["recomposicao"]["chave"]
+
+    antes = chave_da_recomposicao()
+    executar_incremental(LENA, "lena", (), ("RGB", "recomposicao"), pasta_base=str(base),
+                         escrita={"formato": "png", "nivel_png": 1})
+    assert chave_da_recomposicao() != antes
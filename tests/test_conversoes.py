@@ -0,0 +1,117 @@
+import os  # caminho da lena
+import cv2  # leitura da lena
+import numpy as np  # imagens de teste
+import pytest  # parametrização
+from conversoes import METODOS_MATIZ, bgr_para_hsi_vetorizado, hsi_para_8bit
+from d4lena_transformarHSI import bgr_para_hsi  # laço pixel a pixel (referência)
+
+# HSI VETORIZADO (conversoes.py) x LAÇO PIXEL A PIXEL (d4lena_transformarHSI.py)
+#
+# Rodar da raiz: python -m pytest -q tests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOLERANCIA_H = {"exato": 1e-3, "atan2": 1e-3, "polinomio": 0.035}  # graus (polinômio: erro máx. 0.0349°)
+
+# (B, G, R) e (H, S, I) esperados
+CASOS_DE_BORDA = [
+    ((0, 0, 0), (0.0, 0.0, 0.0)),  # preto: soma 0 -> S = 0, den 0 -> H = 0
+    ((255, 255, 255), (0.0, 0.0, 1.0)),  # branco
+    ((128, 128, 128), (0.0, 0.0, 128 / 255)),  # cinza: den 0 -> H = 0
+    ((1, 1, 1), (0.0, 0.0, 1 / 255)),  # cinza quase preto
+    ((10, 10, 200), (0.0, 1.0 - 3 * 10 / 220, 220 / 765)),  # vermelho
+    ((10, 200, 10), (120.0, 1.0 - 3 * 10 / 220, 220 / 765)),  # verde
+    ((200, 10, 10), (240.0, 1.0 - 3 * 10 / 220, 220 / 765)),  # azul: B > G -> 360 - theta
+    ((255, 0, 0), (240.0, 1.0, 1 / 3)),  # azul puro: B > G
+    ((255, 0, 255), (300.0, 1.0, 2 / 3)),  # magenta: B > G
+    ((200, 100, 150), None),  # B > G com os três canais diferentes
+]
+
+
+def diferenca_circular(a, b):
+    # 359.99° e 0.01° estão a 0.02° de distância
+    dif = np.abs(a - b)
+    return np.minimum(dif, 360.0 - dif)
+
+
+def imagem_de_teste():
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)  # pixels aleatórios
+    img[0, :len(CASOS_DE_BORDA)] = [bgr for bgr, _ in CASOS_DE_BORDA]
+    return img
+
+
+@pytest.mark.parametrize("metodo_matiz", METODOS_MATIZ)
+def test_vetorizado_confere_com_o_laco(metodo_matiz):
+    img = imagem_de_teste()
+    H_ref, S_ref, I_ref = bgr_para_hsi(img)
+    H, S, I = bgr_para_hsi_vetorizado(img, metodo_matiz=metodo_matiz)
+
+    assert diferenca_circular(H, H_ref).max() <= TOLERANCIA_H[metodo_matiz]
+    np.testing.assert_allclose(S, S_ref, atol=1e-6)
+    np.testing.assert_allclose(I, I_ref, atol=1e-6)
+
+
+@pytest.mark.parametrize("bgr, esperado", CASOS_DE_BORDA)
+def test_casos_de_borda(bgr, esperado):
+    pixel = np.array([[bgr]], dtype=np.uint8)
+    H_ref, S_ref, I_ref = bgr_para_hsi(pixel)
+    H, S, I = bgr_para_hsi_vetorizado(pixel)
+
+    assert diferenca_circular(H, H_ref).max() <= TOLERANCIA_H["exato"]
+    np.testing.assert_allclose(S, S_ref, atol=1e-6)
+    np.testing.assert_allclose(I, I_ref, atol=1e-6)
+    if bgr[0] > bgr[1]:  # B > G: matiz na metade de baixo do círculo
+        assert H[0, 0] > 180.0
+    if esperado is not None:
+        assert diferenca_circular(H[0, 0], esperado[0]) <= 1e-3
+        assert S[0, 0] == pytest.approx(esperado[1], abs=1e-6)
+        assert I[0, 0] == pytest.approx(esperado[2], abs=1e-6)
+
+
+def test_escreve_nos_buffers_do_chamador():
+    img = imagem_de_teste()
+    H_vet, S_vet, I_vet = bgr_para_hsi_vetorizado(img)
+
+    # Recorte de uma matriz maior: escreve só ali, com o mesmo resultado
+    altura, largura = img.shape[:2]
+    buffers = [np.full((altura, 3 * largura), -1.0, dtype=np.float32) for _ in range(3)]
+    recortes = [b[:, largura:2 * largura] for b in buffers]
+    bgr_para_hsi_vetorizado(img, *recortes)
+
+    for buffer, recorte, referencia in zip(buffers, recortes, (H_vet, S_vet, I_vet)):
+        np.testing.assert_array_equal(recorte, referencia)
+        assert np.all(buffer[:, :largura] == -1.0) and np.all(buffer[:, 2 * largura:] == -1.0)
+
+
+def imagem_cubo(passo=5):
+    # Amostra do cubo RGB 256^3 (inclui 0 e 255 em cada canal): uma linha por valor de R
+    valores = np.arange(0, 256, passo, dtype=np.uint8)
+    B, G, R = np.meshgrid(valores, valores, valores, indexing="ij")
+    return np.dstack((B.reshape(len(valores), -1), G.reshape(len(valores), -1), R.reshape(len(valores), -1)))
+
+
+@pytest.mark.parametrize("metodo_matiz", METODOS_MATIZ)
+def test_8bit_identico_ao_laco_no_cubo(metodo_matiz):
+    # Os PNGs são o resultado que importa: depois do truncamento, nenhum nível pode mudar.
+    # O polinômio é uma aproximação do H (até 0.035°), então nele só S e I precisam ser idênticos
+    img = imagem_cubo()
+    referencia = hsi_para_8bit(*bgr_para_hsi(img))
+    vetorizado = hsi_para_8bit(*bgr_para_hsi_vetorizado(img, metodo_matiz=metodo_matiz))
+    canais = "SI" if metodo_matiz == "polinomio" else "HSI"
+    for canal, ref, vet in zip("HSI", referencia, vetorizado):
+        if canal not in canais:
+            continue
+        assert np.count_nonzero(ref != vet) == 0, f"canal {canal}_8bit difere do laço"
+
+
+def test_8bit_identico_ao_laco_na_lena():
+    img = cv2.imread(os.path.join(RAIZ, "lena-Color.png"), cv2.IMREAD_COLOR)
+    if img is None:
+        pytest.skip("lena-Color.png não encontrada")
+    referencia = hsi_para_8bit(*bgr_para_hsi(img))
+    vetorizado = hsi_para_8bit(*bgr_para_hsi_vetorizado(img))
+    for canal, ref, vet in zip("HSI", referencia, vetorizado):
+        np.testing.assert_array_equal(vet, ref, err_msg=f"canal {canal}_8bit difere do laço")
+        salvo = cv2.imread(os.path.join(RAIZ, "canaisHSI_lena", f"canal_{canal}.png"), cv2.IMREAD_GRAYSCALE)
+        if salvo is not None:  # PNG versionado do d4lena
+            np.testing.assert_array_equal(vet, salvo, err_msg=f"canal_{canal}.png do d4lena difere")
@@ -0,0 +1,42 @@
+import os  # caminhos das saídas
+import sys  # interpretador atual
+import subprocess  # roda as linhas de comando como o usuário
+import pytest  # parametrização
+
+# LOTE (lote.py) x IMAGEM ÚNICA (pipeline.py): as mesmas opções dão os mesmos arquivos
+#
+# Rodar da raiz: python -m pytest -q tests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTEFATOS = "RGB,HSI,YUV_imagem"
+
+
+def rodar(script, *argumentos):
+    subprocess.run([sys.executable, os.path.join(RAIZ, script), *argumentos], cwd=RAIZ, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def arquivos(pasta):
+    # caminho relativo -> bytes de cada imagem gravada
+    conteudo = {}
+    for raiz, _, nomes in os.walk(pasta):
+        for nome in nomes:
+            caminho = os.path.join(raiz, nome)
+            with open(caminho, "rb") as f:
+                conteudo[os.path.relpath(caminho, pasta)] = f.read()
+    return conteudo
+
+
+@pytest.mark.parametrize("opcoes", [
+    ["--estrategia-png", "fixa"],  # bytes diferentes do padrão (nesse build o padrão já sai igual ao rle)
+    ["--estrategia-png", "huffman", "--nivel-png", "1"],
+    ["--formato", "tiff"],
+])
+def test_lote_igual_ao_pipeline(tmp_path, opcoes):
+    entrada = os.path.join(RAIZ, "lena-Color.png")
+    rodar("pipeline.py", entrada, "--artefatos", ARTEFATOS, "--saida", str(tmp_path / "unica"), *opcoes)
+    rodar("lote.py", entrada, "--artefatos", ARTEFATOS, "--saida", str(tmp_path / "lote"), *opcoes)
+    unica, lote = arquivos(tmp_path / "unica"), arquivos(tmp_path / "lote")
+    assert unica and sorted(unica) == sorted(lote)
+    for caminho in unica:
+        assert unica[caminho] == lote[caminho], f"{caminho} difere entre lote.py e pipeline.py"
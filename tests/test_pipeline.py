@@ -0,0 +1,52 @@
+import os  # caminhos das saídas
+import cv2  # leitura dos PNGs
+import numpy as np  # comparação pixel a pixel
+import pytest  # parametrização
+from conversoes import METODOS_MATIZ
+from pipeline import executar_pipeline
+
+# PIPELINE (pipeline.py) x SAÍDAS COMMITADAS DOS SCRIPTS d1..d5 (lena)
+#
+# Rodar da raiz: python -m pytest -q tests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# artefato -> PNGs que o d1/d2/d4/d5 da lena gravaram (pipeline -> commitado)
+SAIDAS_DOS_SCRIPTS = {
+    "RGB": [(f"canaisRGB_lena/canal_{c}.png", f"canaisRGB_lena/canal_{c}.png") for c in "RGB"],
+    "CMY": [(f"canaisCMY_lena/canal_{c}.png", f"canaisCMY_lena/canal_{c}.png") for c in "CMY"],
+    "HSI": [(f"canaisHSI_lena/canal_{c}.png", f"canaisHSI_lena/canal_{c}.png") for c in "HSI"],
+    "HSI_8bit": [("canaisHSI_lena/imagem_HSI_8bit.png", "canaisHSI_lena/imagem_8bit_HSI.png")],
+    "YUV": [(f"canaisYUV_lena/canal_{c}.png", f"canaisYUV_lena/canal_{c}.png") for c in "YUV"],
+    "YUV_imagem": [("canaisYUV_lena/imagem_YUV.png", "canaisYUV_lena/imagem_YUV.png")],
+}
+
+
+def comparar_com_os_scripts(pasta):
+    for pares in SAIDAS_DOS_SCRIPTS.values():
+        for gerado, commitado in pares:
+            novo = cv2.imread(os.path.join(pasta, gerado), cv2.IMREAD_UNCHANGED)
+            referencia = cv2.imread(os.path.join(RAIZ, commitado), cv2.IMREAD_UNCHANGED)
+            assert novo is not None, gerado
+            assert np.array_equal(novo, referencia), f"{gerado} difere de {commitado}"
+
+
+@pytest.mark.parametrize("metodo_matiz", [m for m in METODOS_MATIZ if m != "polinomio"])
+def test_canais_da_lena_identicos_aos_scripts(tmp_path, metodo_matiz):
+    # O polinômio aproxima o H (até 0.035°) e pode mudar um nível do canal_H: fica de fora
+    img = cv2.imread(os.path.join(RAIZ, "lena-Color.png"))
+    executar_pipeline(img, "lena", artefatos=tuple(SAIDAS_DOS_SCRIPTS), pasta_base=str(tmp_path),
+                      parametros={"HSI": {"metodo_matiz": metodo_matiz}})
+    comparar_com_os_scripts(str(tmp_path))
+
+
+def test_imagens_de_3_canais_sem_merge(tmp_path):
+    # H, S, I e Y, U, V 8-bit são views da imagem de 3 canais gravada (canais.py)
+    img = cv2.imread(os.path.join(RAIZ, "lena-Color.png"))
+    dados = executar_pipeline(img, "lena", artefatos=("HSI_8bit", "YUV_imagem"), estagios=("HSI", "YUV"),
+                              pasta_base=str(tmp_path))
+    for modelo, canais in (("HSI", ("H_8bit", "S_8bit", "I_8bit")), ("YUV", ("Y", "U", "V"))):
+        imagem = dados[modelo]["imagem_8bit"]
+        for k, canal in enumerate(canais):
+            assert np.shares_memory(dados[modelo][canal], imagem)
+            assert np.array_equal(dados[modelo][canal], imagem[:, :, k])
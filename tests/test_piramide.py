@@ -0,0 +1,46 @@
+import os  # datas dos arquivos
+import cv2  # gravação dos PNGs de teste
+import numpy as np  # imagens de teste
+from piramide import (construir_piramide, caminho_piramide, ler_para_exibir, piramide_em_dia, salvar_piramide,
+                      para_exibir)
+
+# PIRÂMIDE DE PRÉVIAS (piramide.py)
+#
+# Rodar da raiz: python -m pytest -q tests
+
+
+def test_maximo_mantem_pixel_isolado():
+    # O mapa de diferença do d3: um único pixel diferente tem que aparecer na prévia
+    diferenca = np.zeros((1000, 1000, 3), dtype=np.uint8)
+    diferenca[777, 333, 1] = 1
+    previa = para_exibir(diferenca, 200, reducao="maximo")
+    assert max(previa.shape[:2]) < 1000
+    assert previa.max() == 1
+    assert para_exibir(diferenca, 200).max() == 0  # na média de área ele some
+
+
+def test_ler_para_exibir_usa_o_npz_em_dia(tmp_path):
+    caminho = str(tmp_path / "canal.png")
+    img = np.random.default_rng(0).integers(0, 256, size=(1024, 768), dtype=np.uint8)
+    cv2.imwrite(caminho, img)
+    salvar_piramide(caminho_piramide(caminho), img)
+    assert piramide_em_dia(caminho)
+    # o .npz é o que foi lido: trocando um nível, a prévia muda junto
+    with np.load(caminho_piramide(caminho)) as arquivo:
+        niveis = {nome: arquivo[nome] for nome in arquivo.files}
+    niveis["nivel_2"] = np.full_like(niveis["nivel_2"], 7)
+    np.savez(caminho_piramide(caminho), **niveis)
+    assert (ler_para_exibir(caminho, 200, cv2.IMREAD_GRAYSCALE) == 7).all()
+
+
+def test_outra_reducao_refaz_o_npz(tmp_path):
+    caminho = str(tmp_path / "canal_H.png")
+    img = np.random.default_rng(1).integers(0, 256, size=(1024, 1024), dtype=np.uint8)
+    cv2.imwrite(caminho, img)
+    salvar_piramide(caminho_piramide(caminho), img)  # média de área
+    assert not piramide_em_dia(caminho, reducao="amostragem")
+    previa = ler_para_exibir(caminho, 200, cv2.IMREAD_GRAYSCALE, reducao="amostragem")
+    esperado = [n for n in construir_piramide(img, reducao="amostragem") if max(n.shape) >= 200][-1]
+    assert np.array_equal(previa, esperado)
+    assert piramide_em_dia(caminho, reducao="amostragem")
+    assert os.path.getmtime(caminho_piramide(caminho)) >= os.path.getmtime(caminho)
@@ -0,0 +1,54 @@
+import numpy as np  # imagens de teste
+import pytest  # parametrização
+from conversoes import COEFICIENTES_YUV_INTEIROS, BITS_YUV_INTEIRO, bgr_para_yuv_inteiro
+from yuv_planar import (FORMATOS_PLANARES, bgr_para_yuv_planar, montar_quadro, ler_yuv_planar, nome_arquivo_yuv,
+                        planos_do_quadro)
+from pipeline import executar_pipeline
+
+# KERNEL YUV INTEIRO EM FAIXAS (conversoes.py) E QUADROS PLANARES (yuv_planar.py)
+#
+# Rodar da raiz: python -m pytest -q tests
+
+
+def imagem_de_teste(altura=37, largura=29):
+    # dimensões ímpares: a última faixa e a croma ficam incompletas
+    return np.random.default_rng(0).integers(0, 256, size=(altura, largura, 3), dtype=np.uint8)
+
+
+def yuv_inteiro_de_referencia(img_bgr):
+    # A conta em int64 na imagem inteira, sem faixas
+    rgb = img_bgr[:, :, ::-1].astype(np.int64)
+    saidas = []
+    for linha, deslocamento in zip(COEFICIENTES_YUV_INTEIROS, (0, 128, 128)):
+        soma = rgb @ linha.astype(np.int64) + (deslocamento << BITS_YUV_INTEIRO)
+        saidas.append(np.clip(soma >> BITS_YUV_INTEIRO, 0, 255).astype(np.uint8))
+    return saidas
+
+
+@pytest.mark.parametrize("linhas_por_faixa", [1, 8, 256])
+def test_kernel_inteiro_em_faixas(linhas_por_faixa):
+    img = imagem_de_teste()
+    for canal, ref in zip(bgr_para_yuv_inteiro(img, linhas_por_faixa=linhas_por_faixa), yuv_inteiro_de_referencia(img)):
+        np.testing.assert_array_equal(canal, ref)
+
+
+@pytest.mark.parametrize("formato", tuple(FORMATOS_PLANARES))
+def test_planar_igual_a_montar_quadro(formato):
+    img = imagem_de_teste()
+    esperado = montar_quadro(*bgr_para_yuv_inteiro(img), formato)
+    np.testing.assert_array_equal(bgr_para_yuv_planar(img, formato, linhas_por_faixa=8), esperado)
+
+
+def test_pipeline_inteiro_grava_o_quadro_planar(tmp_path):
+    # Só os .yuv pedidos: o estágio não calcula Y, U, V cheios, e o arquivo é o mesmo
+    img = imagem_de_teste()
+    dados = executar_pipeline(img, "teste", artefatos=("YUV_I420", "YUV_NV12", "YUV_I422"), estagios=("YUV",),
+                              pasta_base=str(tmp_path), parametros={"YUV": {"inteiro": True}})
+    assert "Y" not in dados["YUV"]
+    altura, largura = img.shape[:2]
+    for formato in ("I420", "NV12", "I422"):
+        caminho = tmp_path / "canaisYUV_teste" / nome_arquivo_yuv(altura, largura, formato)
+        gravado = ler_yuv_planar(str(caminho), altura, largura, formato)
+        quadro = montar_quadro(*bgr_para_yuv_inteiro(img), formato)
+        for plano, ref in zip(gravado, planos_do_quadro(quadro, altura, largura, formato)):
+            np.testing.assert_array_equal(plano, ref)
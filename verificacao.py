@@ -0,0 +1,90 @@
+import hashlib  # hash de cada faixa
+import cv2  # absdiff e merge por faixa
+import numpy as np  # estatísticas
+
+# VERIFICAÇÃO ORIGINAL x RECOMPOSTA EM FAIXAS (d3 sem cópias do tamanho da imagem)
+#
+# O d3 cria cópias int16 da original e da recomposta e um diff_abs inteiro só para
+# responder 4 perguntas. Aqui as duas imagens são comparadas em faixas de linhas:
+# - caminho rápido: cada faixa é resumida por um hash (blake2b direto no buffer,
+#   sem cópia); faixas com o mesmo hash são iguais e não custam mais nada. Se as
+#   imagens forem idênticas, só os hashes são calculados;
+# - faixas diferentes: cv2.absdiff em uint8 (|a - b| sem underflow, temporário do
+#   tamanho da faixa) e as mesmas estatísticas do d3:
+#     iguais, max_diff, sum_diff, pixels_diferentes (algum canal com diferença)
+# - a imagem de diferença só é criada se pedida (gerar_diferenca=True).
+#
+# Os hashes da original podem ser guardados (hashes_por_faixa) e passados depois em
+# hashes_referencia: aí as faixas iguais nem precisam ser hasheadas de novo na original.
+
+LINHAS_POR_FAIXA = 256
+
+
+def _hash_faixa(faixa):
+    if not faixa.flags.c_contiguous:
+        faixa = np.ascontiguousarray(faixa)  # só acontece com views "estranhas"
+    return hashlib.blake2b(faixa.data, digest_size=16).hexdigest()
+
+
+def hashes_por_faixa(img, linhas_por_faixa=LINHAS_POR_FAIXA):
+    return [_hash_faixa(img[y0:y0 + linhas_por_faixa]) for y0 in range(0, img.shape[0], linhas_por_faixa)]
+
+
+def comparar_faixas(original, obter_faixa, forma, linhas_por_faixa=LINHAS_POR_FAIXA, usar_hash=True,
+                    gerar_diferenca=False, hashes_referencia=None):
+    # original: imagem (altura, largura[, canais]) uint8
+    # obter_faixa(y0, y1): devolve as linhas y0..y1 da outra imagem (array ou recomposição sob demanda)
+    if tuple(forma) != original.shape:
+        raise ValueError(f"Dimensões não batem: original={original.shape}, recomposta={tuple(forma)}")
+
+    resultado = {"iguais": True, "max_diff": 0, "sum_diff": 0, "pixels_diferentes": 0, "faixas_diferentes": 0}
+    diff_abs = np.zeros(original.shape, dtype=np.uint8) if gerar_diferenca else None
+
+    for i, y0 in enumerate(range(0, original.shape[0], linhas_por_faixa)):
+        y1 = min(y0 + linhas_por_faixa, original.shape[0])
+        faixa_a = original[y0:y1]
+        faixa_b = obter_faixa(y0, y1)
+
+        if usar_hash:
+            hash_a = hashes_referencia[i] if hashes_referencia is not None else _hash_faixa(faixa_a)
+            if hash_a == _hash_faixa(faixa_b):
+                continue  # faixa idêntica: nada a calcular (diff já é zero)
+        elif np.array_equal(faixa_a, faixa_b):
+            continue
+
+        diff = cv2.absdiff(np.ascontiguousarray(faixa_a), np.ascontiguousarray(faixa_b))  # |a - b| em uint8
+        if not diff.any():  # colisão de hash impossível na prática, mas não custa conferir
+            continue
+        por_pixel = diff.max(axis=2) if diff.ndim == 3 else diff  # maior diferença entre os canais
+        resultado["iguais"] = False
+        resultado["faixas_diferentes"] += 1
+        resultado["max_diff"] = max(resultado["max_diff"], int(por_pixel.max()))
+        resultado["sum_diff"] += int(diff.sum(dtype=np.int64))
+        resultado["pixels_diferentes"] += int(np.count_nonzero(por_pixel))
+        if diff_abs is not None:
+            diff_abs[y0:y1] = diff
+
+    if diff_abs is not None:
+        resultado["diff_abs"] = diff_abs
+    return resultado
+
+
+def comparar_imagens(original, recomposta, linhas_por_faixa=LINHAS_POR_FAIXA, usar_hash=True,
+                     gerar_diferenca=False, hashes_referencia=None):
+    return comparar_faixas(
+        original, lambda y0, y1: recomposta[y0:y1], recomposta.shape, linhas_por_faixa, usar_hash,
+        gerar_diferenca, hashes_referencia,
+    )
+
+
+def comparar_com_canais(img_bgr, r, g, b, linhas_por_faixa=LINHAS_POR_FAIXA, usar_hash=True,
+                        gerar_diferenca=False, hashes_referencia=None):
+    # Como o d3: recompõe a imagem a partir dos canais R, G, B, mas uma faixa por vez
+    # (em BGR, a ordem da original lida pelo OpenCV). A diferença, se pedida, sai em BGR.
+    if not (r.shape == g.shape == b.shape):
+        raise ValueError(f"Canais com dimensões diferentes: R={r.shape}, G={g.shape}, B={b.shape}")
+    forma = r.shape + (3,)
+    return comparar_faixas(
+        img_bgr, lambda y0, y1: cv2.merge((b[y0:y1], g[y0:y1], r[y0:y1])), forma, linhas_por_faixa, usar_hash,
+        gerar_diferenca, hashes_referencia,
+    )
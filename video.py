@@ -0,0 +1,394 @@
+import os  # caminhos
+import time  # fps e tempo de cada etapa
+import queue  # filas limitadas entre as etapas
+import argparse  # linha de comando
+import threading  # leitura, conversão e escrita ao mesmo tempo
+import cv2  # VideoCapture e leitura dos quadros
+from escrita import EscritorParalelo, FORMATOS_ESCRITA
+from yuv_planar import montar_quadro, nome_arquivo_yuv
+from instrumentacao import pico_rss_mb
+from lote import EXTENSOES, listar_entradas
+from pipeline import (ARTEFATOS, estagio_rgb, estagio_cmy, estagio_hsi, estagio_yuv, arquivos_do_artefato,
+                      nome_da_imagem, ativar_lut)
+
+# MODO DE FLUXO: VÍDEO, CÂMERA OU SEQUÊNCIA DE QUADROS
+#
+# As mesmas conversões do pipeline (RGB, CMY, HSI, YUV), quadro a quadro, para um
+# vídeo (cv2.VideoCapture), uma câmera (índice: 0, 1, ...) ou uma sequência de
+# imagens (pasta ou glob, como no lote.py). Três etapas rodam ao mesmo tempo,
+# ligadas por filas de tamanho fixo:
+#   leitura (1 thread) -> fila -> conversão (N threads) -> fila -> escrita (thread principal)
+# O cv2 e o numpy liberam o GIL nas contas grandes, então as threads se sobrepõem de
+# verdade. Um semáforo limita os quadros em andamento (da leitura até o fim da
+# escrita) a fila + N: mesmo que um quadro demore na conversão e os seguintes fiquem
+# esperando a vez da escrita, a leitura para, e a memória não cresce com o fluxo.
+# - A escrita sai na ordem da fonte (os conversores podem terminar fora de ordem).
+# - Cada arquivo por imagem do pipeline vira um por quadro: canal_R.png ->
+#   canaisRGB_<nome>/canal_R_000123.png (123 = número do quadro na fonte).
+# - YUV_I420 / YUV_NV12 / YUV_I422 viram UM arquivo .yuv com os quadros em sequência
+#   (canaisYUV_<nome>/video_YUV_I420_<L>x<A>.yuv), pronto para o ffmpeg codificar.
+# - Fonte ao vivo (câmera): se a fila de entrada estiver cheia, o quadro é descartado
+#   em vez de atrasar a captura (--descartar/--sem-descartar mudam isso). Vídeos e
+#   sequências esperam por padrão, sem perder quadros.
+# O relatório traz os fps sustentados (sem a latência do primeiro quadro), os quadros
+# descartados, o tempo médio de cada etapa, a ocupação máxima das filas e o pico de RSS.
+#
+# Ex.: python video.py entrada.mp4 --artefatos HSI,YUV_I420 --max-quadros 300
+#      python video.py 0 --artefatos YUV_I420 --max-quadros 600   (câmera)
+#      python video.py "quadros/*.png" --artefatos RGB,CMY
+
+ESTAGIOS_QUADRO = {"RGB": estagio_rgb, "CMY": estagio_cmy, "HSI": estagio_hsi, "YUV": estagio_yuv}
+ARTEFATOS_FLUXO = tuple(a for a, estagio in ARTEFATOS.items() if estagio in ESTAGIOS_QUADRO)
+ARTEFATOS_CONTINUOS = {f"YUV_{formato}": formato for formato in ("I420", "NV12", "I422")}  # um .yuv para o fluxo todo
+ARTEFATOS_PADRAO_FLUXO = ("RGB", "CMY", "HSI", "YUV")
+TAMANHO_FILA = 4  # quadros em cada fila
+ESPERA = 0.1  # segundos entre verificações de parada nas filas
+
+_FIM = None  # sentinela: a etapa anterior terminou
+
+
+def quadros_de_captura(fonte):
+    # (número, quadro BGR) de um vídeo ou câmera
+    captura = cv2.VideoCapture(fonte)
+    if not captura.isOpened():
+        raise FileNotFoundError(f"Não foi possível abrir o vídeo/câmera: {fonte}")
+    try:
+        numero = 0
+        while True:
+            ok, quadro = captura.read()
+            if not ok:
+                return
+            yield numero, quadro
+            numero += 1
+    finally:
+        captura.release()
+
+
+def quadros_de_arquivos(caminhos):
+    # (número, quadro BGR) de uma sequência de imagens; arquivo ilegível vira quadro None
+    for numero, caminho in enumerate(caminhos):
+        yield numero, cv2.imread(caminho, cv2.IMREAD_COLOR)
+
+
+def abrir_fonte(entrada):
+    # (iterador de quadros, nome das pastas de saída, ao_vivo)
+    if entrada.isdigit():
+        return quadros_de_captura(int(entrada)), f"camera{entrada}", True
+    if os.path.isfile(entrada) and not entrada.lower().endswith(EXTENSOES):
+        return quadros_de_captura(entrada), nome_da_imagem(entrada), False
+    caminhos = listar_entradas([entrada])
+    if not caminhos or not os.path.exists(caminhos[0]):
+        raise FileNotFoundError(f"Nenhum quadro encontrado em: {entrada}")
+    nome = os.path.basename(os.path.normpath(entrada)) if os.path.isdir(entrada) else "sequencia"
+    return quadros_de_arquivos(caminhos), nome, False
+
+
+def estagios_necessarios(artefatos):
+    for artefato in artefatos:
+        if artefato not in ARTEFATOS_FLUXO:
+            raise ValueError(f"Artefato não disponível em fluxo: {artefato} (opções: {', '.join(ARTEFATOS_FLUXO)})")
+    return tuple(e for e in ESTAGIOS_QUADRO if any(ARTEFATOS[a] == e for a in artefatos))
+
+
+def converter_quadro(img_bgr, estagios, parametros=None, gerar_float=False):
+    # {estágio: dados} como no pipeline, para um quadro
+    parametros = parametros or {}
+    dados = {}
+    for estagio in estagios:
+        extras = {"gerar_float": gerar_float} if estagio == "YUV" else {}
+        dados[estagio] = ESTAGIOS_QUADRO[estagio](img_bgr, **extras, **parametros.get(estagio, {}))
+    return dados
+
+
+def caminho_do_quadro(caminho, numero):
+    base, extensao = os.path.splitext(caminho)
+    return f"{base}_{numero:06d}{extensao}"
+
+
+class _SaidaContinua:
+    # Um .yuv planar com todos os quadros, um atrás do outro (buffer do quadro reaproveitado)
+    def __init__(self, pasta, formato, altura, largura):
+        os.makedirs(pasta, exist_ok=True)
+        self.formato = formato
+        self.forma = (altura, largura)
+        self.caminho = os.path.join(pasta, nome_arquivo_yuv(altura, largura, formato, "video_YUV"))
+        self.buffer = None
+        self._arquivo = open(self.caminho, "wb")
+
+    def gravar(self, yuv):
+        if yuv["Y"].shape != self.forma:
+            raise ValueError(f"Quadro {yuv['Y'].shape[1]}x{yuv['Y'].shape[0]} num fluxo .yuv de "
+                             f"{self.forma[1]}x{self.forma[0]}: {self.caminho}")
+        self.buffer = montar_quadro(yuv["Y"], yuv["U"], yuv["V"], self.formato, self.buffer)
+        self._arquivo.write(self.buffer)
+        return self.buffer.size
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+def _colocar(fila, item, parar):
+    # put que desiste se outra etapa falhou
+    while True:
+        try:
+            fila.put(item, timeout=ESPERA)
+            return True
+        except queue.Full:
+            if parar.is_set():
+                return False
+
+
+def _retirar(fila, parar):
+    while True:
+        try:
+            return fila.get(timeout=ESPERA)
+        except queue.Empty:
+            if parar.is_set():
+                return _FIM
+
+
+def processar_fluxo(quadros, nome, artefatos=ARTEFATOS_PADRAO_FLUXO, pasta_base=".", parametros=None, escrita=None,
+                    conversores=2, tamanho_fila=TAMANHO_FILA, descartar=False, max_quadros=None, ao_progresso=None,
+                    intervalo_progresso=2.0):
+    # quadros: iterável de (número, quadro BGR) (quadros_de_captura, quadros_de_arquivos)
+    # descartar: fila de entrada cheia -> o quadro é descartado (fontes ao vivo) em vez de esperar
+    # ao_progresso(relatorio_parcial) é chamado a cada intervalo_progresso segundos
+    estagios = estagios_necessarios(artefatos)
+    continuos = [a for a in artefatos if a in ARTEFATOS_CONTINUOS]
+    por_quadro = [a for a in artefatos if a not in ARTEFATOS_CONTINUOS]
+    gerar_float = "YUV_float" in artefatos
+
+    fila_entrada = queue.Queue(tamanho_fila)
+    fila_saida = queue.Queue(tamanho_fila)
+    parar = threading.Event()
+    trava = threading.Lock()
+    erros = []
+    contagem = {"lidos": 0, "ilegiveis": 0, "descartados": 0, "convertidos": 0, "gravados": 0, "arquivos": 0,
+                "bytes": 0}
+    tempos = {"leitura": 0.0, "conversao": 0.0, "escrita": 0.0}  # somados em todas as threads
+    ocupacao = {"entrada": 0, "saida": 0}
+    em_andamento = threading.Semaphore(tamanho_fila + conversores)  # quadros lidos e ainda não gravados
+
+    def reservar():
+        # Vaga para mais um quadro; espera a escrita liberar uma (ou desiste se outra etapa falhou)
+        while not em_andamento.acquire(timeout=ESPERA):
+            if parar.is_set():
+                return False
+        return True
+
+    def ler():
+        sequencia = 0  # ordem dos quadros aceitos (a numeração da fonte tem buracos se houver descarte)
+        iterador = None
+        try:
+            iterador = iter(quadros)
+            while not parar.is_set() and (max_quadros is None or contagem["lidos"] < max_quadros):
+                inicio = time.perf_counter()
+                item = next(iterador, None)
+                tempos["leitura"] += time.perf_counter() - inicio
+                if item is None:
+                    break
+                numero, quadro = item
+                contagem["lidos"] += 1
+                if quadro is None:
+                    contagem["ilegiveis"] += 1
+                    continue
+                if descartar:
+                    if not em_andamento.acquire(blocking=False):  # tudo ocupado: não atrasa a captura
+                        contagem["descartados"] += 1
+                        continue
+                    try:
+                        fila_entrada.put_nowait((sequencia, numero, quadro))
+                    except queue.Full:
+                        em_andamento.release()
+                        contagem["descartados"] += 1
+                        continue
+                elif not reservar():
+                    break
+                elif not _colocar(fila_entrada, (sequencia, numero, quadro), parar):
+                    em_andamento.release()
+                    break
+                ocupacao["entrada"] = max(ocupacao["entrada"], fila_entrada.qsize())
+                sequencia += 1
+        except BaseException as erro:
+            erros.append(erro)
+            parar.set()
+        finally:
+            if hasattr(iterador, "close"):  # max_quadros/parada antes do fim: o finally do gerador (release) roda já
+                iterador.close()
+            for _ in range(conversores):
+                _colocar(fila_entrada, _FIM, parar)
+
+    def converter():
+        try:
+            while True:
+                item = _retirar(fila_entrada, parar)
+                if item is _FIM:
+                    break
+                sequencia, numero, quadro = item
+                inicio = time.perf_counter()
+                dados = converter_quadro(quadro, estagios, parametros, gerar_float)
+                with trava:
+                    tempos["conversao"] += time.perf_counter() - inicio
+                    contagem["convertidos"] += 1
+                if not _colocar(fila_saida, (sequencia, numero, dados), parar):
+                    break
+                ocupacao["saida"] = max(ocupacao["saida"], fila_saida.qsize())
+        except BaseException as erro:
+            erros.append(erro)
+            parar.set()
+        finally:
+            _colocar(fila_saida, _FIM, parar)
+
+    def parcial():
+        segundos = time.perf_counter() - inicio_total
+        relatorio = dict(contagem, segundos=segundos, conversores=conversores, tamanho_fila=tamanho_fila,
+                         ocupacao_maxima=dict(ocupacao), pico_rss_mb=pico_rss_mb())
+        relatorio["fps"] = contagem["gravados"] / segundos if segundos else 0.0
+        gravados_depois = contagem["gravados"] - 1
+        relatorio["fps_sustentado"] = (gravados_depois / (ultimo - primeiro)
+                                       if primeiro is not None and ultimo > primeiro else relatorio["fps"])
+        relatorio["ms_por_quadro"] = {etapa: segundos_etapa * 1000 / max(1, contagem[n]) for (etapa, segundos_etapa), n
+                                      in zip(tempos.items(), ("lidos", "convertidos", "gravados"))}
+        return relatorio
+
+    inicio_total = time.perf_counter()
+    primeiro = ultimo = None  # instantes do primeiro e do último quadro gravados
+    threads = [threading.Thread(target=ler, name="leitura", daemon=True)]
+    threads += [threading.Thread(target=converter, name=f"conversao_{k}", daemon=True) for k in range(conversores)]
+    for thread in threads:
+        thread.start()
+
+    saidas = {}  # artefato contínuo -> _SaidaContinua
+    pendentes = {}  # sequência -> (número, dados) que chegaram antes da vez (limitado pelo semáforo)
+    proximo = 0
+    terminados = 0
+    ultimo_progresso = inicio_total
+    try:
+        with EscritorParalelo(**(escrita or {})) as escritor:
+            while terminados < conversores:
+                item = _retirar(fila_saida, parar)
+                if item is _FIM:
+                    if parar.is_set():
+                        break
+                    terminados += 1
+                    continue
+                pendentes[item[0]] = item[1:]
+                while proximo in pendentes:
+                    numero, dados = pendentes.pop(proximo)
+                    inicio = time.perf_counter()
+                    for artefato in por_quadro:
+                        for caminho, conteudo in arquivos_do_artefato(artefato, dados, nome, pasta_base):
+                            escritor.gravar(caminho_do_quadro(caminho, numero), conteudo)
+                    for artefato in continuos:
+                        if artefato not in saidas:
+                            altura, largura = dados["YUV"]["Y"].shape
+                            saidas[artefato] = _SaidaContinua(os.path.join(pasta_base, f"canaisYUV_{nome}"),
+                                                              ARTEFATOS_CONTINUOS[artefato], altura, largura)
+                        contagem["bytes"] += saidas[artefato].gravar(dados["YUV"])
+                    registros = escritor.aguardar()  # os arquivos do quadro codificam em paralelo
+                    contagem["arquivos"] += len(registros)
+                    contagem["bytes"] += sum(r[2] for r in registros)
+                    escritor.registros = []  # a lista não cresce com o fluxo
+                    tempos["escrita"] += time.perf_counter() - inicio
+                    contagem["gravados"] += 1
+                    ultimo = time.perf_counter()
+                    primeiro = ultimo if primeiro is None else primeiro
+                    proximo += 1
+                    em_andamento.release()  # libera a leitura de mais um quadro
+                if ao_progresso and time.perf_counter() - ultimo_progresso >= intervalo_progresso:
+                    ultimo_progresso = time.perf_counter()
+                    ao_progresso(parcial())
+    except BaseException:
+        parar.set()
+        raise
+    finally:
+        parar.set()  # solta a leitura se a escrita parou antes do fim
+        for thread in threads:
+            thread.join()
+        for saida in saidas.values():
+            saida.fechar()
+    if erros:
+        raise erros[0]
+
+    relatorio = parcial()
+    relatorio["arquivos_continuos"] = [s.caminho for s in saidas.values()]
+    return relatorio
+
+
+def resumo_fluxo(relatorio):
+    ms = relatorio["ms_por_quadro"]
+    linhas = [
+        f"quadros: {relatorio['lidos']} lidos, {relatorio['gravados']} gravados, "
+        f"{relatorio['descartados']} descartados, {relatorio['ilegiveis']} ilegíveis",
+        f"tempo: {relatorio['segundos']:.2f} s -> {relatorio['fps']:.1f} fps "
+        f"(sustentado: {relatorio['fps_sustentado']:.1f} fps)",
+        f"ms/quadro: leitura {ms['leitura']:.1f}, conversão {ms['conversao']:.1f} "
+        f"({relatorio['conversores']} threads), escrita {ms['escrita']:.1f}",
+        f"saída: {relatorio['arquivos']} arquivos, {relatorio['bytes'] / 2 ** 20:.1f} MB",
+        f"filas (máx. {relatorio['tamanho_fila']}): entrada {relatorio['ocupacao_maxima']['entrada']}, "
+        f"saída {relatorio['ocupacao_maxima']['saida']}",
+    ]
+    if relatorio["pico_rss_mb"] is not None:
+        linhas.append(f"pico de RSS: {relatorio['pico_rss_mb']:.1f} MB")
+    for caminho in relatorio.get("arquivos_continuos", ()):
+        linhas.append(f"fluxo .yuv: {caminho}")
+    return "\n".join(linhas)
+
+
+if __name__ == "__main__":
+    import json  # relatório
+    from conversoes import METODOS_MATIZ
+    from precisao import PRECISOES
+
+    parser = argparse.ArgumentParser(description="Conversões RGB/CMY/HSI/YUV em vídeo, câmera ou sequência de quadros.")
+    parser.add_argument("entrada", help="vídeo, índice da câmera (0, 1...), pasta ou glob de imagens")
+    parser.add_argument("--artefatos", default=",".join(ARTEFATOS_PADRAO_FLUXO),
+                        help=f"artefatos por quadro, separados por vírgula ({', '.join(ARTEFATOS_FLUXO)})")
+    parser.add_argument("--saida", default=".", help="pasta base das saídas")
+    parser.add_argument("--nome", help="nome das pastas de saída (padrão: o da entrada)")
+    parser.add_argument("--conversores", type=int, default=2, help="threads de conversão")
+    parser.add_argument("--fila", type=int, default=TAMANHO_FILA, help="quadros em cada fila entre as etapas")
+    parser.add_argument("--max-quadros", type=int, help="para depois de ler tantos quadros")
+    descarte = parser.add_mutually_exclusive_group()
+    descarte.add_argument("--descartar", action="store_true", default=None,
+                          help="descarta quadros com a fila cheia (padrão só para câmera)")
+    descarte.add_argument("--sem-descartar", dest="descartar", action="store_false", help="espera sempre")
+    parser.add_argument("--yuv-inteiro", action="store_true", help="YUV pelo kernel inteiro (ponto fixo)")
+    parser.add_argument("--metodo-matiz", default="exato", choices=METODOS_MATIZ, help="cálculo do H")
+    parser.add_argument("--precisao", default="float32", choices=PRECISOES, help="precisão de HSI_float/YUV_float")
+    parser.add_argument("--lut", action="store_true", help="CMY, HSI e YUV 8-bit pelas tabelas 256^3 (lut.py)")
+    parser.add_argument("--formato", default="png", choices=tuple(FORMATOS_ESCRITA), help="formato das imagens gravadas")
+    parser.add_argument("--nivel-png", type=int, help="compressão PNG 0..9 (0 = mais rápido, maior)")
+    parser.add_argument("--escritores", type=int, help="threads de codificação dos arquivos de cada quadro")
+    parser.add_argument("--relatorio", help="grava o relatório em JSON")
+    args = parser.parse_args()
+
+    quadros, nome, ao_vivo = abrir_fonte(args.entrada)
+    parametros = {}
+    if args.yuv_inteiro:
+        parametros["YUV"] = {"inteiro": True}
+    if args.metodo_matiz != "exato":
+        parametros["HSI"] = {"metodo_matiz": args.metodo_matiz}
+    if args.precisao != "float32":
+        parametros.setdefault("HSI", {})["precisao"] = args.precisao
+        parametros.setdefault("YUV", {})["precisao"] = args.precisao
+    if args.lut:
+        ativar_lut(parametros)
+
+    def progresso(parcial):
+        print(f"  {parcial['gravados']} quadros, {parcial['fps']:.1f} fps, {parcial['descartados']} descartados")
+
+    relatorio = processar_fluxo(
+        quadros, args.nome or nome, tuple(a for a in args.artefatos.split(",") if a), args.saida, parametros,
+        {"trabalhadores": args.escritores, "formato": args.formato, "nivel_png": args.nivel_png},
+        conversores=args.conversores, tamanho_fila=args.fila,
+        descartar=ao_vivo if args.descartar is None else args.descartar,
+        max_quadros=args.max_quadros, ao_progresso=progresso)
+
+    print(f"=== FLUXO ({args.entrada}) ===")
+    print(resumo_fluxo(relatorio))
+    if args.relatorio:
+        os.makedirs(os.path.dirname(args.relatorio) or ".", exist_ok=True)
+        with open(args.relatorio, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"Relatório: {args.relatorio}")
@@ -0,0 +1,206 @@
+import os  # pastas e caminhos
+import argparse  # linha de comando
+import numpy as np  # planos e memmap do arquivo
+from conversoes import bgr_para_yuv_inteiro
+
+# YUV PLANAR COM CROMA SUBAMOSTRADA (.yuv "cru" para encoders)
+#
+# O d5 guarda Y, U, V como um PNG 4:4:4 (imagem_YUV.png): lento de gravar e 3 bytes
+# por pixel. Encoders de vídeo (ffmpeg, x264...) leem quadros planares crus, com a
+# croma (U, V) em resolução menor:
+#   I420 (4:2:0) -> plano Y, depois U e V em (altura/2, largura/2)        1,5 byte/pixel
+#   NV12 (4:2:0) -> plano Y, depois um plano UV intercalado (U0 V0 U1 V1 ...) 1,5 byte/pixel
+#   I422 (4:2:2) -> plano Y, depois U e V em (altura, largura/2)          2 bytes/pixel
+#   I444 (4:4:4) -> Y, U, V inteiros, sem subamostragem                   3 bytes/pixel
+# Dimensão ímpar: a croma tem ceil(dimensão/2) amostras (última coluna/linha repetida).
+#
+# A croma subamostrada é a média (arredondada) de cada bloco 2x2 (ou 1x2 no 4:2:2),
+# feita em inteiros. O quadro é montado em faixas de linhas direto no arquivo de
+# saída (memmap): só a faixa atual existe em memória, e a conversão usa o kernel
+# inteiro de conversoes.py (bgr_para_yuv_inteiro), sem nenhuma matriz float.
+#
+# O arquivo não tem cabeçalho: largura, altura e formato vão no nome
+# (ex.: imagem_YUV_I420_512x512.yuv) e são passados ao encoder, por exemplo:
+#   ffmpeg -f rawvideo -pix_fmt yuv420p -s 512x512 -i imagem_YUV_I420_512x512.yuv ...
+
+FORMATOS_PLANARES = {
+    # formato: (fator horizontal da croma, fator vertical, U/V intercalados, pix_fmt do ffmpeg)
+    "I420": (2, 2, False, "yuv420p"),
+    "NV12": (2, 2, True, "nv12"),
+    "I422": (2, 1, False, "yuv422p"),
+    "I444": (1, 1, False, "yuv444p"),
+}
+
+LINHAS_POR_FAIXA = 256  # par, para não partir um bloco 2x2 entre duas faixas
+
+
+def _formato(formato):
+    if formato not in FORMATOS_PLANARES:
+        raise ValueError(f"Formato desconhecido: {formato} (opções: {', '.join(FORMATOS_PLANARES)})")
+    return FORMATOS_PLANARES[formato]
+
+
+def dimensoes_croma(altura, largura, formato):
+    fh, fv = _formato(formato)[:2]
+    return -(-altura // fv), -(-largura // fh)  # arredonda para cima
+
+
+def tamanho_quadro(altura, largura, formato):
+    altura_c, largura_c = dimensoes_croma(altura, largura, formato)
+    return altura * largura + 2 * altura_c * largura_c  # bytes
+
+
+def planos_do_quadro(buffer, altura, largura, formato):
+    # Views Y, U, V (2D) dentro de um buffer 1D uint8 com um quadro (array, memmap...)
+    intercalado = _formato(formato)[2]
+    altura_c, largura_c = dimensoes_croma(altura, largura, formato)
+    if buffer.size != tamanho_quadro(altura, largura, formato):
+        raise ValueError(f"Buffer de {buffer.size} bytes não é um quadro {formato} {largura}x{altura}")
+
+    Y = buffer[:altura * largura].reshape(altura, largura)
+    resto = buffer[altura * largura:]
+    if intercalado:  # NV12: UV UV UV ... (U e V são views com passo 2)
+        uv = resto.reshape(altura_c, largura_c, 2)
+        return Y, uv[:, :, 0], uv[:, :, 1]
+    tamanho_c = altura_c * largura_c
+    return Y, resto[:tamanho_c].reshape(altura_c, largura_c), resto[tamanho_c:].reshape(altura_c, largura_c)
+
+
+def subamostrar(plano, fator_h, fator_v, destino=None):
+    # Média arredondada de cada bloco fator_v x fator_h de um plano uint8
+    if fator_h == 1 and fator_v == 1:
+        if destino is None:
+            return plano.copy()
+        destino[...] = plano
+        return destino
+
+    altura, largura = plano.shape
+    falta_v, falta_h = -altura % fator_v, -largura % fator_h
+    if falta_v or falta_h:  # dimensão ímpar: repete a última linha/coluna
+        plano = np.pad(plano, ((0, falta_v), (0, falta_h)), mode="edge")
+
+    soma = plano[0::fator_v, 0::fator_h].astype(np.uint16)  # no máximo 4 * 255, cabe em uint16
+    for dy in range(fator_v):
+        for dx in range(fator_h):
+            if dy or dx:
+                soma += plano[dy::fator_v, dx::fator_h]
+    n = fator_h * fator_v
+    soma += n // 2  # arredonda
+    soma >>= n.bit_length() - 1  # divide por 2 ou 4
+
+    if destino is None:
+        destino = np.empty(soma.shape, dtype=np.uint8)
+    destino[...] = soma
+    return destino
+
+
+def montar_quadro(Y, U, V, formato, saida=None, linhas_por_faixa=LINHAS_POR_FAIXA):
+    # Y, U, V 8-bit em resolução cheia (ex.: saída do pipeline) -> quadro planar 1D
+    altura, largura = Y.shape
+    fh, fv = _formato(formato)[:2]
+    if saida is None:
+        saida = np.empty(tamanho_quadro(altura, largura, formato), dtype=np.uint8)
+    Y_q, U_q, V_q = planos_do_quadro(saida, altura, largura, formato)
+
+    for y0 in range(0, altura, linhas_por_faixa):
+        y1 = min(y0 + linhas_por_faixa, altura)
+        c0, c1 = y0 // fv, -(-y1 // fv)
+        Y_q[y0:y1] = Y[y0:y1]
+        subamostrar(U[y0:y1], fh, fv, U_q[c0:c1])
+        subamostrar(V[y0:y1], fh, fv, V_q[c0:c1])
+    return saida
+
+
+def bgr_para_yuv_planar(img_bgr, formato="I420", saida=None, linhas_por_faixa=LINHAS_POR_FAIXA):
+    # Imagem BGR 8-bit -> quadro planar, faixa a faixa com o kernel inteiro
+    altura, largura = img_bgr.shape[:2]
+    fh, fv = _formato(formato)[:2]
+    if linhas_por_faixa % fv:
+        raise ValueError(f"linhas_por_faixa precisa ser múltiplo de {fv} no formato {formato}")
+    if saida is None:
+        saida = np.empty(tamanho_quadro(altura, largura, formato), dtype=np.uint8)
+    Y_q, U_q, V_q = planos_do_quadro(saida, altura, largura, formato)
+
+    U_faixa = np.empty((linhas_por_faixa, largura), dtype=np.uint8)  # croma cheia só da faixa
+    V_faixa = np.empty((linhas_por_faixa, largura), dtype=np.uint8)
+    for y0 in range(0, altura, linhas_por_faixa):
+        y1 = min(y0 + linhas_por_faixa, altura)
+        n = y1 - y0
+        c0, c1 = y0 // fv, -(-y1 // fv)
+        bgr_para_yuv_inteiro(img_bgr[y0:y1], Y_q[y0:y1], U_faixa[:n], V_faixa[:n])  # Y vai direto para o quadro
+        subamostrar(U_faixa[:n], fh, fv, U_q[c0:c1])
+        subamostrar(V_faixa[:n], fh, fv, V_q[c0:c1])
+    return saida
+
+
+def nome_arquivo_yuv(altura, largura, formato, prefixo="imagem_YUV"):
+    return f"{prefixo}_{formato}_{largura}x{altura}.yuv"
+
+
+def gravar_yuv_planar(caminho, altura, largura, formato, preencher):
+    # Abre o .yuv como memmap do tamanho exato do quadro e deixa preencher(saida) escrever nele
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    saida = np.memmap(caminho, dtype=np.uint8, mode="w+", shape=(tamanho_quadro(altura, largura, formato),))
+    preencher(saida)
+    saida.flush()
+    del saida
+    return caminho
+
+
+def ler_yuv_planar(caminho, altura, largura, formato, quadro=0):
+    # Views Y, U, V de um quadro de um arquivo .yuv (memmap, sem ler o arquivo inteiro)
+    tamanho = tamanho_quadro(altura, largura, formato)
+    buffer = np.memmap(caminho, dtype=np.uint8, mode="r", offset=quadro * tamanho, shape=(tamanho,))
+    return planos_do_quadro(buffer, altura, largura, formato)
+
+
+if __name__ == "__main__":
+    import time  # tempo de cada formato
+    import cv2  # leitura e PNG de comparação
+    from conversoes import bgr_para_yuv
+
+    parser = argparse.ArgumentParser(description="Imagem -> quadros YUV planares crus (I420, NV12, I422, I444).")
+    parser.add_argument("imagem", nargs="?", default="lena-Color.png", help="imagem de entrada")
+    parser.add_argument("--formatos", default="I420,NV12,I422", help="formatos separados por vírgula")
+    parser.add_argument("--saida", default="resultados", help="pasta dos arquivos .yuv")
+    parser.add_argument("--conferir", action="store_true",
+                        help="compara o kernel inteiro com o float nas 256^3 cores possíveis")
+    args = parser.parse_args()
+
+    img_bgr = cv2.imread(args.imagem, cv2.IMREAD_COLOR)
+    if img_bgr is None:
+        raise FileNotFoundError(f"Não foi possível ler a imagem: {args.imagem}")
+    altura, largura = img_bgr.shape[:2]
+    nome = os.path.splitext(os.path.basename(args.imagem))[0]
+
+    # Referência: o PNG 4:4:4 do d5
+    inicio = time.perf_counter()
+    png = cv2.imencode(".png", cv2.merge(bgr_para_yuv(img_bgr)))[1]
+    print(f"PNG 4:4:4 (d5): {png.size} bytes, {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    for formato in args.formatos.upper().split(","):
+        caminho = os.path.join(args.saida, nome_arquivo_yuv(altura, largura, formato, f"{nome}_YUV"))
+        inicio = time.perf_counter()
+        gravar_yuv_planar(caminho, altura, largura, formato, lambda saida: bgr_para_yuv_planar(img_bgr, formato, saida))
+        segundos = time.perf_counter() - inicio
+        tamanho = os.path.getsize(caminho)
+        print(f"{formato} ({FORMATOS_PLANARES[formato][3]}): {tamanho} bytes "
+              f"({tamanho / (3 * altura * largura):.0%} do 4:4:4 cru), {segundos * 1000:.1f} ms -> {caminho}")
+
+    if args.conferir:
+        # Todas as cores: uma "imagem" 4096x4096 com cada tripla (R,G,B) uma vez
+        indice = np.arange(256 ** 3, dtype=np.uint32).reshape(4096, 4096)
+        todas = np.empty((4096, 4096, 3), dtype=np.uint8)
+        todas[:, :, 0] = indice & 255
+        todas[:, :, 1] = (indice >> 8) & 255
+        todas[:, :, 2] = indice >> 16
+        del indice
+        diferentes = 0
+        maior = 0
+        for y0 in range(0, 4096, 512):
+            faixa = todas[y0:y0 + 512]
+            for a, b in zip(bgr_para_yuv_inteiro(faixa), bgr_para_yuv(faixa)):
+                diff = np.abs(a.astype(np.int16) - b)
+                diferentes += int(np.count_nonzero(diff))
+                maior = max(maior, int(diff.max()))
+        print(f"Kernel inteiro x float (256^3 cores, 3 canais): {diferentes} amostras diferentes, maior diferença {maior}")